@@ -0,0 +1,165 @@
+"""Admission control: per-route-class concurrency limits with bounded queues.
+
+API requests are sorted into classes. Each class has a limit on requests in
+progress and a bounded FIFO queue of waiting ones. A request that finds the
+queue full, or waits longer than ``admission_queue_timeout_seconds``, gets a
+fast 503 with ``Retry-After`` instead of piling onto the connection pool.
+
+Analytics (aggregates, full response listings, change feeds, exports,
+cross-survey comparisons, portfolios, batch lookups) get a
+small limit and are shed outright while interactive requests are queueing,
+so cheap reads and submissions keep priority during launches.
+"""
+import asyncio
+import re
+from collections import deque
+
+from starlette.responses import JSONResponse
+
+from app.config import settings
+
+INTERACTIVE = "interactive"
+SUBMIT = "submit"
+ANALYTICS = "analytics"
+
+# (method, path pattern, class); first match wins, anything else is interactive
+ROUTE_CLASSES = [
+    ("POST", re.compile(r"^/api/surveys/[^/]+/responses$"), SUBMIT),
+    ("GET", re.compile(r"^/api/surveys/[^/]+/responses(/aggregate)?$"), ANALYTICS),
+    ("GET", re.compile(r"^/api/(surveys/[^/]+/)?changes$"), ANALYTICS),
+    ("POST", re.compile(r"^/api/surveys/[^/]+/jobs$"), ANALYTICS),
+    ("GET", re.compile(r"^/api/jobs/[^/]+/download$"), ANALYTICS),
+    ("POST", re.compile(r"^/api/surveys/compare$"), ANALYTICS),
+    ("GET", re.compile(r"^/api/surveys/portfolio$"), ANALYTICS),
+    ("POST", re.compile(r"^/api/batch/(surveys|responses)$"), ANALYTICS),
+]
+
+
+class Gate:
+    """Concurrency limit with a bounded FIFO wait queue for one route class."""
+
+    def __init__(self, name: str, limit: int, queue_size: int):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, queueing for at most ``timeout`` seconds."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            return False
+        except asyncio.CancelledError:
+            # A slot handed over just before the client went away goes to the next waiter
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        # release() handed its slot straight to this waiter
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class AdmissionController:
+    def __init__(self):
+        self.gates = {
+            INTERACTIVE: Gate(
+                INTERACTIVE, settings.admission_interactive_limit, settings.admission_interactive_queue
+            ),
+            SUBMIT: Gate(SUBMIT, settings.admission_submit_limit, settings.admission_submit_queue),
+            ANALYTICS: Gate(
+                ANALYTICS, settings.admission_analytics_limit, settings.admission_analytics_queue
+            ),
+        }
+
+    def classify(self, method: str, path: str) -> str:
+        for route_method, pattern, route_class in ROUTE_CLASSES:
+            if method == route_method and pattern.match(path):
+                return route_class
+        return INTERACTIVE
+
+    async def admit(self, gate: Gate) -> bool:
+        if gate.name == ANALYTICS and (
+            self.gates[INTERACTIVE].waiting or self.gates[SUBMIT].waiting
+        ):
+            gate.rejected += 1
+            return False
+        return await gate.acquire(settings.admission_queue_timeout_seconds)
+
+    def stats(self) -> dict:
+        return {name: gate.stats() for name, gate in self.gates.items()}
+
+
+admission = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying admission control to ``/api`` requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.admission_enabled
+            or not scope["path"].startswith("/api/")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        gate = admission.gates[admission.classify(scope["method"], scope["path"])]
+        if not await admission.admit(gate):
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(settings.admission_retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
@@ -7,6 +7,75 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 class Settings(BaseSettings):
     database_url: str = f"sqlite+aiosqlite:///{os.path.join(BASE_DIR, 'survey.db')}"
+
+    # Read/write routing (see app/database.py): read-only routes use their own
+    # pool. On PostgreSQL point READ_DATABASE_URL at a replica; on SQLite the
+    # reader pool opens the same file read-only (WAL lets it read during writes).
+    read_database_url: str | None = None
+    read_pool_size: int = 5
+
+    # Optional response shards (see app/shards.py), e.g.
+    # RESPONSE_SHARD_URLS='["sqlite+aiosqlite:///shard0.db", "sqlite+aiosqlite:///shard1.db"]'
+    response_shard_urls: list[str] = []
+    # Sharded submissions batch survey response counters into one write per interval
+    response_count_flush_seconds: float = 1.0
+
+    # Archival of closed surveys
+    archive_dir: str = os.path.join(BASE_DIR, "archive")
+    archive_after_days: int = 90
+    archive_segment_responses: int = 20000
+
+    # Short-lived cache behind coalesced expensive reads (0 disables it)
+    read_cache_ttl_seconds: float = 2.0
+
+    # Admin portfolio (see app/services/portfolio.py)
+    portfolio_trend_days: int = 14
+    # Cached per admin until any of their surveys changes, and at most this long
+    portfolio_cache_ttl_seconds: float = 300.0
+
+    # Start-up warm-up (see app/startup.py): caches and pools are warmed for
+    # this many of the most recently answered published surveys before /ready
+    warmup_enabled: bool = True
+    warmup_surveys: int = 200
+
+    # In-memory catalog of published surveys served to answerers
+    catalog_enabled: bool = True
+    catalog_max_bytes: int = 64 * 1024 * 1024
+    catalog_poll_interval_seconds: float = 2.0
+    # Rebuilt at least this often, as a safety net for missed generation bumps
+    catalog_max_age_seconds: float = 60.0
+
+    # Cross-worker cache invalidation (see app/services/invalidation.py)
+    invalidation_poll_interval_seconds: float = 1.0
+    invalidation_retention_seconds: int = 3600
+
+    # Admission control (see app/admission.py): concurrent requests and
+    # queued requests allowed per route class
+    admission_enabled: bool = True
+    admission_interactive_limit: int = 64
+    admission_interactive_queue: int = 256
+    admission_submit_limit: int = 16
+    admission_submit_queue: int = 512
+    admission_analytics_limit: int = 4
+    admission_analytics_queue: int = 64
+    admission_queue_timeout_seconds: float = 5.0
+    admission_retry_after_seconds: int = 2
+
+    # Request tracing (see app/tracing.py)
+    tracing_enabled: bool = True
+    trace_slow_ms: float = 250.0
+    trace_sample_rate: float = 0.01
+    trace_buffer_size: int = 500
+    trace_file: str | None = None
+
+    # Background jobs
+    job_results_dir: str = os.path.join(BASE_DIR, "job_results")
+    job_workers: int = 2
+    job_process_workers: int = 2
+    job_max_active_per_user: int = 5
+    job_poll_interval_seconds: float = 1.0
+    # Running jobs heartbeat three times per period (see job_runner.heartbeat_interval)
+    job_stale_after_seconds: int = 60
     
     class Config:
         env_file = ".env"
@@ -1,5 +1,17 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import hashlib
+from datetime import datetime
+
+from fastapi import Depends, Request
+from sqlalchemy import (
+    Column, DateTime, MetaData, String, Table, Uuid, bindparam, delete, event, func, insert, inspect,
+    literal, select, update,
+)
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
+from sqlalchemy.sql.functions import FunctionElement
 
 from app.config import settings
 
@@ -7,14 +19,231 @@ engine = create_async_engine(settings.database_url, echo=True)
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Separate pool for read-only routes (see get_read_db): a replica when
+# READ_DATABASE_URL is set, otherwise the primary database
+read_engine = create_async_engine(
+    settings.read_database_url or settings.database_url,
+    echo=True,
+    pool_size=settings.read_pool_size,
+)
+
+read_session = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
+# Request header making read-only routes read from the primary, for clients
+# that must see their own writes before a replica catches up
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+
+def use_wal(sqlite_engine) -> None:
+    """Put SQLite databases in WAL mode, so readers and the writer don't block each other."""
+    if sqlite_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sqlite_engine.sync_engine, "connect")
+    def _set_wal(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+
+use_wal(engine)
+
+if read_engine.dialect.name == "sqlite":
+    @event.listens_for(read_engine.sync_engine, "connect")
+    def _set_query_only(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
 
 class Base(DeclarativeBase):
     pass
 
 
+class new_uuid(FunctionElement):
+    """A random UUID generated by the database, for ``INSERT ... SELECT``."""
+
+    type = Uuid()
+    inherit_cache = True
+
+
+@compiles(new_uuid)
+def _new_uuid_default(element, compiler, **kw):
+    return "gen_random_uuid()"
+
+
+@compiles(new_uuid, "sqlite")
+def _new_uuid_sqlite(element, compiler, **kw):
+    # Same 32-digit hex form SQLAlchemy uses for UUID columns on SQLite
+    return "lower(hex(randomblob(16)))"
+
+
+# Fingerprint of the schema each database was created with (see ensure_schema)
+_version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _version_metadata,
+    Column("fingerprint", String(64), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def schema_fingerprint(metadata: MetaData, dialect) -> str:
+    """Hash of the DDL ``metadata`` compiles to on ``dialect``."""
+    digest = hashlib.sha256()
+    for table in metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()
+
+
+def _backfill_response_counts(conn, tables) -> None:
+    surveys, responses = tables["surveys"], tables["responses"]
+    conn.execute(update(surveys).values(
+        response_count=select(func.count())
+        .where(responses.c.survey_id == surveys.c.id)
+        .scalar_subquery()
+    ))
+
+
+def _backfill_last_response_at(conn, tables) -> None:
+    surveys, responses = tables["surveys"], tables["responses"]
+    conn.execute(update(surveys).values(
+        last_response_at=select(func.max(responses.c.submitted_at))
+        .where(responses.c.survey_id == surveys.c.id)
+        .scalar_subquery()
+    ))
+
+
+def _backfill_response_seqs(conn, tables) -> None:
+    # In submission order, as they would have been handed out
+    responses = tables["responses"]
+    ids = conn.execute(
+        select(responses.c.id).order_by(responses.c.submitted_at, responses.c.id)
+    ).scalars().all()
+    if ids:
+        conn.execute(
+            update(responses).where(responses.c.id == bindparam("_id")).values(seq=bindparam("_seq")),
+            [{"_id": response_id, "_seq": seq} for seq, response_id in enumerate(ids, 1)],
+        )
+
+
+# Values for columns added to tables of an older schema, by (table, column),
+# with the tables they read from; other added columns keep their default
+_BACKFILLS = {
+    ("surveys", "response_count"): (("surveys", "responses"), _backfill_response_counts),
+    ("surveys", "last_response_at"): (("surveys", "responses"), _backfill_last_response_at),
+    ("responses", "seq"): (("responses",), _backfill_response_seqs),
+}
+
+
+def _add_column(conn, table: Table, column: Column) -> None:
+    ddl = str(CreateColumn(column).compile(dialect=conn.dialect))
+    if not column.nullable and column.server_default is None:
+        # Existing rows need a value: the model default, or a placeholder
+        # the column's backfill replaces
+        default = column.default.arg if column.default is not None and column.default.is_scalar else 0
+        ddl += " DEFAULT " + str(
+            literal(default, column.type).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        )
+    name = conn.dialect.identifier_preparer.format_table(table)
+    conn.exec_driver_sql(f"ALTER TABLE {name} ADD COLUMN {ddl}")
+
+
+def _upgrade(conn, metadata: MetaData) -> None:
+    """Create missing tables, then bring tables created by an older schema up
+    to date: add their missing columns, backfill them and create their
+    missing indexes.
+
+    Upgrades are additive; changed column types and constraints on existing
+    columns are left as they are.
+    """
+    existing = set(inspect(conn).get_table_names())
+    metadata.create_all(conn)
+
+    inspector = inspect(conn)
+    added = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        present = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in present:
+                _add_column(conn, table, column)
+                added.append((table.name, column.name))
+
+    for key in added:
+        if key in _BACKFILLS:
+            needs, backfill = _BACKFILLS[key]
+            if all(name in metadata.tables for name in needs):
+                backfill(conn, metadata.tables)
+
+    # After the backfills, so unique indexes see the final values
+    for table in metadata.sorted_tables:
+        if table.name in existing:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+async def ensure_schema(target: AsyncEngine, metadata: MetaData) -> bool:
+    """Create or upgrade the schema unless the database already has this
+    one; returns whether the schema work ran.
+
+    ``create_all`` reflects every table, so instead each database records
+    the fingerprint of the schema it was last brought to, and a worker whose
+    models compile to the same DDL skips the schema work with one query.
+    Otherwise missing tables are created and existing ones upgraded (see
+    ``_upgrade``) in one transaction with the new fingerprint, so a failed
+    upgrade leaves the old fingerprint and is retried on the next start.
+    """
+    fingerprint = schema_fingerprint(metadata, target.dialect)
+    try:
+        async with target.connect() as conn:
+            result = await conn.execute(select(schema_version.c.fingerprint))
+            current = result.scalar_one_or_none()
+    except DBAPIError:
+        # First start: no schema_version table yet
+        current = None
+    if current == fingerprint:
+        return False
+
+    async with target.begin() as conn:
+        if target.dialect.name == "sqlite":
+            # The driver only opens transactions for DML; without this the
+            # ALTER TABLEs would commit on their own
+            await conn.exec_driver_sql("BEGIN")
+        await conn.run_sync(_upgrade, metadata)
+        await conn.run_sync(_version_metadata.create_all)
+        await conn.execute(delete(schema_version))
+        await conn.execute(
+            insert(schema_version).values(fingerprint=fingerprint, applied_at=datetime.utcnow())
+        )
+    return True
+
+
 async def get_db():
     async with async_session() as session:
         try:
             yield session
         finally:
             await session.close()
+
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db)):
+    """Session from the reader pool, for routes that only read.
+
+    The primary session (shared with the auth dependencies) is committed so
+    its connection goes back to the pool while the route reads; declare this
+    dependency after the access checks. With the ``X-Read-Your-Writes``
+    header the primary session is used instead.
+    """
+    if request.headers.get(READ_YOUR_WRITES_HEADER):
+        yield db
+        return
+    await db.commit()
+    async with read_session() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -6,10 +6,12 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
+from app.tracing import traced
 from app.models.user import User, UserRole
 from app.models.survey import Survey, SurveyAccess
 
 
+@traced(kind="dependency")
 async def get_current_user(
     x_user_id: Annotated[str, Header()],
     db: AsyncSession = Depends(get_db),
@@ -35,6 +37,7 @@ async def get_current_user(
     return user
 
 
+@traced(kind="dependency")
 async def require_admin(
     user: User = Depends(get_current_user),
 ) -> User:
@@ -47,6 +50,7 @@ async def require_admin(
     return user
 
 
+@traced(kind="dependency")
 async def require_answerer(
     user: User = Depends(get_current_user),
 ) -> User:
@@ -59,6 +63,7 @@ async def require_answerer(
     return user
 
 
+@traced(kind="dependency")
 async def get_survey_with_access(
     survey_id: UUID,
     user: User = Depends(require_admin),
@@ -96,6 +101,7 @@ async def get_survey_with_access(
     return survey
 
 
+@traced(kind="dependency")
 async def get_owned_survey(
     survey_id: UUID,
     user: User = Depends(require_admin),
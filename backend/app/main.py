@@ -1,18 +1,58 @@
+import asyncio
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.database import engine, Base
-from app.routers import users_router, surveys_router, questions_router, responses_router
+from app.database import engine, read_engine, Base, ensure_schema
+from app.routers import (
+    users_router,
+    surveys_router,
+    questions_router,
+    responses_router,
+    jobs_router,
+    batch_router,
+    traces_router,
+    changes_router,
+    metrics_router,
+)
+from app.services.catalog import catalog
+from app.services.invalidation import invalidations
+from app.services.job_runner import job_runner
+from app.services.response_service import response_counts
+from app.shards import create_shard_tables, shard_engines
+from app.admission import AdmissionMiddleware
+from app.startup import startup
+from app.tracing import TracingMiddleware, instrument_engine, trace_buffer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Create tables on startup
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Create tables unless the databases already have this schema version
+    started = time.monotonic()
+    await ensure_schema(engine, Base.metadata)
+    await create_shard_tables()
+    startup.record("schema", started)
+
+    started = time.monotonic()
+    await invalidations.start()
+    await catalog.start()
+    startup.record("catalog", started)
+
+    await response_counts.start()
+    await job_runner.start()
+    # Serving starts now; /ready waits for the warm-up
+    startup.start_warmup()
     yield
+    await startup.stop()
+    await job_runner.stop()
+    await response_counts.stop()
+    await catalog.stop()
+    await invalidations.stop()
+    # Flush queued trace file writes off the event loop
+    await asyncio.to_thread(trace_buffer.close)
 
 
 app = FastAPI(
@@ -22,6 +62,16 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Admission control: sheds load per route class before it reaches the pool
+app.add_middleware(AdmissionMiddleware)
+
+# Request tracing: per-request traces with SQL statement spans
+instrument_engine(engine)
+instrument_engine(read_engine)
+for shard_engine in shard_engines:
+    instrument_engine(shard_engine)
+app.add_middleware(TracingMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +79,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
 
 # Include routers
@@ -36,6 +87,11 @@ app.include_router(users_router)
 app.include_router(surveys_router)
 app.include_router(questions_router)
 app.include_router(responses_router)
+app.include_router(jobs_router)
+app.include_router(batch_router)
+app.include_router(traces_router)
+app.include_router(changes_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -46,3 +102,14 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Ready once start-up and the cache warm-up have finished (503 before)."""
+    body = {
+        "status": "ready" if startup.ready else "starting",
+        "warmed_surveys": startup.warmed_surveys,
+        "startup_ms": startup.timings_ms,
+    }
+    return JSONResponse(body, status_code=200 if startup.ready else 503)
@@ -1,6 +1,11 @@
 from app.models.user import User
-from app.models.survey import Survey, SurveyAccess
+from app.models.survey import Survey, SurveyAccess, AnswerStorage
 from app.models.question import Question, QuestionType
-from app.models.response import Response, Answer
+from app.models.response import Response, Answer, ResponseSeq
+from app.models.archive import ArchiveSegment, SurveyRollup
+from app.models.job import Job, JobKind, JobStatus
+from app.models.catalog import CatalogState
+from app.models.invalidation import CacheInvalidation
+from app.models.snapshot import SurveySnapshot
 
-__all__ = ["User", "Survey", "SurveyAccess", "Question", "QuestionType", "Response", "Answer"]
+__all__ = ["User", "Survey", "SurveyAccess", "AnswerStorage", "Question", "QuestionType", "Response", "Answer", "ResponseSeq", "ArchiveSegment", "SurveyRollup", "Job", "JobKind", "JobStatus", "CatalogState", "CacheInvalidation", "SurveySnapshot"]
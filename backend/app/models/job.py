@@ -0,0 +1,53 @@
+import uuid
+from datetime import datetime
+from enum import Enum as PyEnum
+
+from sqlalchemy import DateTime, Enum, Float, ForeignKey, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class JobKind(str, PyEnum):
+    EXPORT = "export"
+    AGGREGATE_REBUILD = "aggregate_rebuild"
+    CROSSTAB = "crosstab"
+    SURVEY_DELETE = "survey_delete"
+
+
+class JobStatus(str, PyEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    kind: Mapped[JobKind] = mapped_column(Enum(JobKind), nullable=False)
+    status: Mapped[JobStatus] = mapped_column(
+        Enum(JobStatus), nullable=False, default=JobStatus.QUEUED, index=True
+    )
+    owner_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True
+    )
+    survey_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("surveys.id"), nullable=True
+    )
+    # JSON-encoded job parameters
+    params: Mapped[str] = mapped_column(Text, nullable=False, default="{}")
+    progress: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    result_path: Mapped[str] = mapped_column(String(1024), nullable=True)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    # Refreshed while running so stale jobs of a dead worker can be requeued
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
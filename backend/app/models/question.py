@@ -21,12 +21,16 @@ class Question(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     survey_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("surveys.id"), nullable=False
+        UUID(as_uuid=True), ForeignKey("surveys.id"), nullable=False, index=True
     )
     text: Mapped[str] = mapped_column(Text, nullable=False)
     type: Mapped[QuestionType] = mapped_column(Enum(QuestionType), nullable=False)
     rank_max: Mapped[int] = mapped_column(Integer, nullable=True)  # Only for rank type
     order_index: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Root template question this one was copied from (see SurveyService.clone_survey)
+    template_question_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("questions.id"), nullable=True, index=True
+    )
 
     # Relationships
     survey = relationship("Survey", back_populates="questions")
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Boolean, Integer, Text
+from sqlalchemy import DateTime, ForeignKey, String, Boolean, Integer, Text, Index, LargeBinary
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -10,6 +10,17 @@ from app.database import Base
 
 class Response(Base):
     __tablename__ = "responses"
+    __table_args__ = (
+        # One response per user per survey
+        Index("ix_responses_survey_answerer", "survey_id", "answerer_id", unique=True),
+        # Change feed cursors (see ResponseService.list_changes)
+        Index("ix_responses_seq", "seq", unique=True),
+        Index("ix_responses_survey_seq", "survey_id", "seq"),
+        # Recent activity per survey (see services/portfolio.py)
+        Index("ix_responses_survey_submitted", "survey_id", "submitted_at"),
+        # Purging one answerer's responses (see services/purge_service.py)
+        Index("ix_responses_answerer", "answerer_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -23,6 +34,10 @@ class Response(Base):
     submitted_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, nullable=False
     )
+    # Monotonic submission sequence, assigned on insert
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Set when the survey uses packed answer storage (see services/answer_codec.py)
+    packed_answers: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
 
     # Relationships
     survey = relationship("Survey", back_populates="responses")
@@ -30,6 +45,19 @@ class Response(Base):
     answers = relationship("Answer", back_populates="response", cascade="all, delete-orphan")
 
 
+class ResponseSeq(Base):
+    """Single row holding the last change feed seq handed out.
+
+    Only ever incremented, so a seq is never reused after the response holding
+    it is archived or purged. With sharded storage each shard has its own.
+    """
+
+    __tablename__ = "response_seq"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    value: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
 class Answer(Base):
     __tablename__ = "answers"
 
@@ -37,7 +65,7 @@ class Answer(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     response_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("responses.id"), nullable=False
+        UUID(as_uuid=True), ForeignKey("responses.id"), nullable=False, index=True
     )
     question_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("questions.id"), nullable=False
@@ -0,0 +1,32 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, LargeBinary, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class SurveySnapshot(Base):
+    """Serialized definition of a published survey, addressed by its hash.
+
+    Written once per distinct definition and never updated; the survey's
+    current one is ``Survey.snapshot_hash``.
+    """
+
+    __tablename__ = "survey_snapshots"
+
+    # sha256 of ``body``
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    survey_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("surveys.id"), nullable=False, index=True
+    )
+    # SurveyResponse JSON, and the same pre-compressed
+    body: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    gzip_body: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # Only when the brotli package is installed
+    brotli_body: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
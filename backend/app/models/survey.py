@@ -1,13 +1,19 @@
 import uuid
 from datetime import datetime
+from enum import Enum as PyEnum
 
-from sqlalchemy import String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import String, Boolean, DateTime, Enum, ForeignKey, Index, Integer, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 
 
+class AnswerStorage(str, PyEnum):
+    ROWS = "rows"  # One answers row per answer
+    PACKED = "packed"  # All answers packed into responses.packed_answers
+
+
 class Survey(Base):
     __tablename__ = "surveys"
 
@@ -20,19 +26,43 @@ class Survey(Base):
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=True)
     is_published: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    answer_storage: Mapped[AnswerStorage] = mapped_column(
+        Enum(AnswerStorage), default=AnswerStorage.ROWS, nullable=False
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, nullable=False
     )
+    closed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    # Maintained on submission, so listings need not count responses
+    response_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_response_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    # Set once responses have been moved to archive segment files
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    # Current SurveySnapshot of a published survey (see services/snapshots.py)
+    snapshot_hash: Mapped[str] = mapped_column(String(64), nullable=True)
+    # Root survey this one was cloned from, shared by all copies of a template
+    template_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("surveys.id"), nullable=True, index=True
+    )
 
     # Relationships
     owner = relationship("User", back_populates="owned_surveys")
-    questions = relationship("Question", back_populates="survey", cascade="all, delete-orphan")
+    questions = relationship(
+        "Question",
+        back_populates="survey",
+        cascade="all, delete-orphan",
+        order_by="Question.order_index",
+    )
     responses = relationship("Response", back_populates="survey", cascade="all, delete-orphan")
     shared_access = relationship("SurveyAccess", back_populates="survey", cascade="all, delete-orphan")
 
 
 class SurveyAccess(Base):
     __tablename__ = "survey_access"
+    __table_args__ = (
+        # Access checks look up (survey, admin) pairs
+        Index("ix_survey_access_survey_admin", "survey_id", "admin_id", unique=True),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -2,5 +2,20 @@ from app.routers.users import router as users_router
 from app.routers.surveys import router as surveys_router
 from app.routers.questions import router as questions_router
 from app.routers.responses import router as responses_router
+from app.routers.jobs import router as jobs_router
+from app.routers.batch import router as batch_router
+from app.routers.traces import router as traces_router
+from app.routers.changes import router as changes_router
+from app.routers.metrics import router as metrics_router
 
-__all__ = ["users_router", "surveys_router", "questions_router", "responses_router"]
+__all__ = [
+    "users_router",
+    "surveys_router",
+    "questions_router",
+    "responses_router",
+    "jobs_router",
+    "batch_router",
+    "traces_router",
+    "changes_router",
+    "metrics_router",
+]
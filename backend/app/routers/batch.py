@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db
+from app.dependencies import get_current_user, require_admin
+from app.models.user import User
+from app.schemas.batch import (
+    BatchGetRequest,
+    BatchError,
+    SurveyBatchResponse,
+    ResponseBatchResponse,
+)
+from app.services.survey_service import SurveyService
+from app.services.response_service import ResponseService
+
+router = APIRouter(prefix="/api/batch", tags=["batch"])
+
+
+@router.post("/surveys", response_model=SurveyBatchResponse)
+async def batch_get_surveys(
+    request: BatchGetRequest,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Get many surveys with questions in one call.
+
+    Ids that are missing or not accessible are reported in ``errors``.
+    """
+    service = SurveyService(db)
+    found = await service.get_surveys_for_user(request.ids, user)
+
+    results, errors = [], []
+    for survey_id in dict.fromkeys(request.ids):
+        if survey_id not in found:
+            errors.append(BatchError(
+                id=survey_id,
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Survey not found",
+            ))
+            continue
+        survey, allowed = found[survey_id]
+        if not allowed:
+            errors.append(BatchError(
+                id=survey_id,
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have access to this survey",
+            ))
+            continue
+        results.append(survey)
+
+    return SurveyBatchResponse(results=results, errors=errors)
+
+
+@router.post("/responses", response_model=ResponseBatchResponse)
+async def batch_get_responses(
+    request: BatchGetRequest,
+    user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Get many responses with answers in one call (Admin with access only).
+
+    Ids that are missing or belong to surveys the admin cannot access are
+    reported in ``errors``.
+    """
+    service = ResponseService(db)
+    found = await service.get_responses_for_admin(request.ids, user.id)
+
+    results, errors = [], []
+    for response_id in dict.fromkeys(request.ids):
+        response, allowed = found.get(response_id, (None, False))
+        # Do not reveal whether inaccessible responses exist
+        if response is None or not allowed:
+            errors.append(BatchError(
+                id=response_id,
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Response not found",
+            ))
+            continue
+        results.append(response)
+
+    return ResponseBatchResponse(results=results, errors=errors)
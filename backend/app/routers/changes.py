@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db
+from app.dependencies import require_admin, get_survey_with_access
+from app.models.survey import Survey
+from app.models.user import User
+from app.schemas.response import ChangeFeedResponse
+from app.services.response_service import ResponseService
+
+router = APIRouter(tags=["changes"])
+
+
+@router.get("/api/surveys/{survey_id}/changes", response_model=ChangeFeedResponse)
+async def get_survey_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
+    survey: Survey = Depends(get_survey_with_access),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Responses to a survey submitted after the ``since`` cursor (Admin with access only)."""
+    service = ResponseService(db)
+    changes, next_cursor, has_more = await service.list_changes(
+        since, limit, survey_id=survey.id
+    )
+    return ChangeFeedResponse(changes=changes, next_cursor=next_cursor, has_more=has_more)
+
+
+@router.get("/api/changes", response_model=ChangeFeedResponse)
+async def get_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
+    user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Responses to every survey the admin can access, submitted after ``since``."""
+    service = ResponseService(db)
+    try:
+        changes, next_cursor, has_more = await service.list_changes(
+            since, limit, admin_id=user.id
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return ChangeFeedResponse(changes=changes, next_cursor=next_cursor, has_more=has_more)
@@ -0,0 +1,91 @@
+import os
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.dependencies import require_admin, get_survey_with_access
+from app.models.job import JobStatus
+from app.models.survey import Survey
+from app.models.user import User
+from app.schemas.job import JobCreate, JobResponse
+from app.services.job_service import JobService
+from app.services.job_runner import job_runner
+
+router = APIRouter(tags=["jobs"])
+
+MEDIA_TYPES = {".csv": "text/csv", ".json": "application/json"}
+
+
+@router.post(
+    "/api/surveys/{survey_id}/jobs",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_job(
+    job_data: JobCreate,
+    survey: Survey = Depends(get_survey_with_access),
+    user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Queue an export, aggregate rebuild or cross-tab for a survey (Admin with access only)."""
+    service = JobService(db)
+    try:
+        job = await service.create_job(
+            owner_id=user.id,
+            survey_id=survey.id,
+            kind=job_data.kind,
+            params=job_data.params,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+        )
+    job_runner.notify()
+    return job
+
+
+async def get_own_job(
+    job_id: UUID,
+    user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a job, ensuring the admin submitted it."""
+    job = await JobService(db).get_job(job_id)
+    if not job or job.owner_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    return job
+
+
+@router.get("/api/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job=Depends(get_own_job)):
+    """Poll a job's status and progress (Submitter only)."""
+    return job
+
+
+@router.get("/api/jobs/{job_id}/download")
+async def download_job_result(job=Depends(get_own_job)):
+    """Download the result of a finished job (Submitter only)."""
+    if job.status != JobStatus.SUCCEEDED or not job.result_path:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job has not finished successfully",
+        )
+    if not os.path.exists(job.result_path):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Job result is no longer available",
+        )
+
+    extension = os.path.splitext(job.result_path)[1]
+    return FileResponse(
+        job.result_path,
+        media_type=MEDIA_TYPES.get(extension, "application/octet-stream"),
+        filename=f"{job.kind.value}-{job.survey_id}{extension}",
+    )
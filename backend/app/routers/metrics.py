@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends
+
+from app.admission import admission
+from app.dependencies import require_admin
+from app.models.user import User
+from app.schemas.metrics import GateStats
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("/admission", response_model=dict[str, GateStats])
+async def get_admission_metrics(user: User = Depends(require_admin)):
+    """In-progress and queued requests per route class, with totals (Admin only)."""
+    return admission.stats()
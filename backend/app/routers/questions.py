@@ -7,12 +7,33 @@ from app.database import get_db
 from app.dependencies import get_owned_survey, get_current_user
 from app.models.user import User, UserRole
 from app.models.survey import Survey
-from app.schemas.question import QuestionCreate, QuestionResponse
+from app.schemas.question import (
+    QuestionCreate,
+    QuestionResponse,
+    QuestionBulkCreate,
+    QuestionReorder,
+)
 from app.services.survey_service import SurveyService
 
 router = APIRouter(prefix="/api/surveys/{survey_id}/questions", tags=["questions"])
 
 
+async def ensure_editable(survey: Survey, service: SurveyService) -> None:
+    """Reject changes to the questions of closed or already answered surveys."""
+    if survey.closed_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot modify a closed survey",
+        )
+
+    # Check if survey has responses
+    if await service.survey_has_responses(survey.id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot modify survey with existing responses",
+        )
+
+
 @router.post("", response_model=QuestionResponse, status_code=status.HTTP_201_CREATED)
 async def add_question(
     question_data: QuestionCreate,
@@ -21,13 +42,7 @@ async def add_question(
 ):
     """Add a question to a survey (Owner only, survey must not have responses)."""
     service = SurveyService(db)
-
-    # Check if survey has responses
-    if await service.survey_has_responses(survey.id):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot modify survey with existing responses",
-        )
+    await ensure_editable(survey, service)
 
     question = await service.add_question(
         survey_id=survey.id,
@@ -39,6 +54,53 @@ async def add_question(
     return question
 
 
+@router.post(
+    "/bulk",
+    response_model=list[QuestionResponse],
+    status_code=status.HTTP_201_CREATED,
+)
+async def add_questions_bulk(
+    bulk_data: QuestionBulkCreate,
+    survey: Survey = Depends(get_owned_survey),
+    db: AsyncSession = Depends(get_db),
+):
+    """Add many questions in one transaction (Owner only, survey must not have responses)."""
+    service = SurveyService(db)
+    await ensure_editable(survey, service)
+
+    return await service.add_questions(
+        survey.id,
+        [
+            {
+                "text": q.text,
+                "type": q.type,
+                "rank_max": q.rank_max,
+                "order_index": q.order_index if "order_index" in q.model_fields_set else None,
+            }
+            for q in bulk_data.questions
+        ],
+    )
+
+
+@router.put("/order", response_model=list[QuestionResponse])
+async def reorder_questions(
+    reorder_data: QuestionReorder,
+    survey: Survey = Depends(get_owned_survey),
+    db: AsyncSession = Depends(get_db),
+):
+    """Reorder all questions of a survey (Owner only, survey must not have responses)."""
+    service = SurveyService(db)
+    await ensure_editable(survey, service)
+
+    try:
+        return await service.reorder_questions(survey.id, reorder_data.question_ids)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
 @router.get("", response_model=list[QuestionResponse])
 async def get_questions(
     survey_id: UUID,
@@ -64,8 +126,7 @@ async def get_questions(
 
     # Admins need access
     if user.role == UserRole.ADMIN:
-        admin_surveys = await service.list_surveys_for_admin(user.id)
-        if survey.id not in [s.id for s in admin_surveys]:
+        if not await service.admin_has_access(survey.id, user.id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have access to this survey",
@@ -3,10 +3,10 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.dependencies import get_current_user, get_survey_with_access
 from app.models.user import User, UserRole
-from app.models.survey import Survey
+from app.models.survey import Survey, AnswerStorage
 from app.schemas.response import (
     ResponseCreate,
     ResponseResponse,
@@ -14,7 +14,8 @@ from app.schemas.response import (
     AggregateResponse,
 )
 from app.services.survey_service import SurveyService
-from app.services.response_service import ResponseService
+from app.services.response_service import ResponseService, get_aggregates_coalesced
+from app.services.answer_validator import get_survey_validator
 
 router = APIRouter(prefix="/api/surveys/{survey_id}/responses", tags=["responses"])
 
@@ -48,30 +49,41 @@ async def submit_response(
             detail="Survey is not published",
         )
 
-    # Validate answers match questions
-    questions = await survey_service.get_questions(survey_id)
-    question_ids = {q.id for q in questions}
-    answer_question_ids = {a.question_id for a in response_data.answers}
+    if survey.closed_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Survey is closed",
+        )
 
-    if answer_question_ids != question_ids:
+    answers = [a.model_dump() for a in response_data.answers]
+    validator = get_survey_validator(survey)
+    errors = validator.validate(answers)
+    if errors:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Answers must be provided for all questions",
+            detail=[e.model_dump(mode="json") for e in errors],
         )
 
     response_service = ResponseService(db)
-    response = await response_service.create_response(
-        survey_id=survey_id,
-        answerer_id=user.id,
-        answers=[a.model_dump() for a in response_data.answers],
-    )
+    try:
+        response = await response_service.create_response(
+            survey_id=survey_id,
+            answerer_id=user.id,
+            answers=answers,
+            layout=validator if survey.answer_storage == AnswerStorage.PACKED else None,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
     return response
 
 
 @router.get("", response_model=list[ResponseListResponse])
 async def list_responses(
     survey: Survey = Depends(get_survey_with_access),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """List all responses for a survey (Admin with access only)."""
     service = ResponseService(db)
@@ -83,7 +95,7 @@ async def list_responses(
 async def get_my_responses(
     survey_id: UUID,
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get current user's responses for a survey."""
     survey_service = SurveyService(db)
@@ -106,19 +118,20 @@ async def get_aggregate_responses(
     db: AsyncSession = Depends(get_db),
 ):
     """Get aggregated response statistics (Admin with access only)."""
-    service = ResponseService(db)
-    return await service.get_aggregates(survey.id)
+    # Hand the connection back while waiting on the shared computation
+    await db.commit()
+    return await get_aggregates_coalesced(survey)
 
 
 @router.get("/{response_id}", response_model=ResponseResponse)
 async def get_response(
     response_id: UUID,
     survey: Survey = Depends(get_survey_with_access),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a specific response (Admin with access only)."""
     service = ResponseService(db)
-    response = await service.get_response_by_id(response_id)
+    response = await service.get_response_by_id(response_id, survey_id=survey.id)
 
     if not response or response.survey_id != survey.id:
         raise HTTPException(
@@ -1,27 +1,70 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.dependencies import (
     get_current_user,
     require_admin,
     get_survey_with_access,
     get_owned_survey,
 )
+from app.models.job import JobKind
 from app.models.user import User, UserRole
 from app.models.survey import Survey
+from app.schemas.job import JobResponse
+from app.schemas.response import ComparisonRequest, ComparisonResponse
 from app.schemas.survey import (
     SurveyCreate,
     SurveyResponse,
     SurveyListResponse,
     SurveyShareRequest,
+    SurveySort,
+    SurveyClone,
+    PortfolioResponse,
 )
-from app.services.survey_service import SurveyService
+from app.services.survey_service import SurveyService, get_survey_coalesced
+from app.services.portfolio import PortfolioService, get_portfolio_coalesced
+from app.services.analytics import build_comparison
+from app.services.comparative import ComparisonService
+from app.services.catalog import catalog
+from app.services.job_service import JobService
+from app.services.job_runner import job_runner
+from app.services.snapshots import SurveyPayload, get_snapshot
 
 router = APIRouter(prefix="/api/surveys", tags=["surveys"])
 
+# Snapshots never change, so clients may keep them for a year
+SNAPSHOT_MAX_AGE_SECONDS = 365 * 24 * 3600
+
+
+def _snapshot_response(
+    request: Request, survey_id: UUID, payload: SurveyPayload, immutable: bool
+) -> Response:
+    """Send a survey snapshot in the encoding the client accepts.
+
+    The ETag is the content hash and ``Content-Location`` the snapshot's
+    immutable URL; the survey URL itself must be revalidated, as its snapshot
+    changes when the survey does.
+    """
+    etag = f'"{payload.content_hash}"'
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding, X-User-ID",
+        "Content-Location": f"{router.prefix}/{survey_id}/snapshots/{payload.content_hash}",
+        "Cache-Control": (
+            f"private, max-age={SNAPSHOT_MAX_AGE_SECONDS}, immutable"
+            if immutable else "private, no-cache"
+        ),
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    content, encoding = payload.encoded(request.headers.get("accept-encoding"))
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type="application/json", headers=headers)
+
 
 @router.post("", response_model=SurveyResponse, status_code=status.HTTP_201_CREATED)
 async def create_survey(
@@ -35,35 +78,105 @@ async def create_survey(
         owner_id=user.id,
         title=survey_data.title,
         description=survey_data.description,
+        answer_storage=survey_data.answer_storage,
     )
     return survey
 
 
 @router.get("", response_model=list[SurveyListResponse])
 async def list_surveys(
+    http_response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    sort: SurveySort = SurveySort.CREATED_AT_DESC,
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """List surveys available to the current user."""
+    """List surveys available to the current user, one page at a time.
+
+    The total number of visible surveys is returned in ``X-Total-Count``.
+    """
     service = SurveyService(db)
+    snapshot = catalog.get()
+    if user.role == UserRole.ANSWERER and snapshot is not None and snapshot.complete:
+        page = snapshot.page(sort, limit, offset)
+        if page is not None:
+            ids, total = page
+            # Counters change with every submission, so they are read live
+            counts = await service.response_counts(ids) if ids else {}
+            return Response(
+                content=snapshot.page_json(ids, counts),
+                media_type="application/json",
+                headers={"X-Total-Count": str(total)},
+            )
+
+    rows, total = await service.list_surveys_page(user, limit, offset, sort.value)
+
+    http_response.headers["X-Total-Count"] = str(total)
+    return [
+        SurveyListResponse.model_validate(survey).model_copy(
+            update={"question_count": question_count}
+        )
+        for survey, question_count in rows
+    ]
 
-    if user.role == UserRole.ADMIN:
-        surveys = await service.list_surveys_for_admin(user.id)
-    else:
-        surveys = await service.list_published_surveys()
 
-    return surveys
+@router.get("/portfolio", response_model=PortfolioResponse)
+async def get_portfolio(
+    user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Response counts, last submission and daily trend for every survey the admin can access."""
+    version = await PortfolioService(db).version(user.id)
+    # Hand the connection back while waiting on the shared computation
+    await db.commit()
+    return await get_portfolio_coalesced(user.id, version)
+
+
+@router.post("/compare", response_model=ComparisonResponse)
+async def compare_surveys(
+    request: ComparisonRequest,
+    user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Compare matching rank and true/false questions across surveys (Admin with access to all).
+
+    Questions match by template lineage or by text; each matched question
+    gets per-survey means with z-scores and outliers, and pooled statistics.
+    """
+    service = ComparisonService(db)
+    try:
+        survey_ids, groups = await service.load_columns(user.id, request.survey_ids, request.match)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    # Hand the connection back before the computation
+    await db.commit()
+    return await job_runner.run_cpu(
+        build_comparison, request.match, survey_ids, groups, request.outlier_z
+    )
 
 
 @router.get("/{survey_id}", response_model=SurveyResponse)
 async def get_survey(
     survey_id: UUID,
+    request: Request,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get survey details."""
-    service = SurveyService(db)
-    survey = await service.get_survey_by_id(survey_id)
+    """Get survey details.
+
+    Answerers get published surveys from their pre-compressed snapshot, with
+    an ETag for conditional requests.
+    """
+    snapshot = catalog.get()
+    if user.role == UserRole.ANSWERER and snapshot is not None:
+        payload = snapshot.survey_payload(survey_id)
+        if payload is not None:
+            return _snapshot_response(request, survey_id, payload, immutable=False)
+
+    # Hand the connection back while waiting on the shared load
+    await db.commit()
+    survey = await get_survey_coalesced(survey_id)
 
     if not survey:
         raise HTTPException(
@@ -81,9 +194,9 @@ async def get_survey(
         return survey
 
     # Admins need to own or have access
-    if user.role == UserRole.ADMIN:
-        admin_surveys = await service.list_surveys_for_admin(user.id)
-        if survey.id not in [s.id for s in admin_surveys]:
+    if user.role == UserRole.ADMIN and survey.owner_id != user.id:
+        service = SurveyService(db)
+        if not await service.admin_has_access(survey.id, user.id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have access to this survey",
@@ -92,6 +205,51 @@ async def get_survey(
     return survey
 
 
+@router.get("/{survey_id}/snapshots/{content_hash}", response_model=SurveyResponse)
+async def get_survey_snapshot(
+    survey_id: UUID,
+    content_hash: str,
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a published survey's definition by content hash.
+
+    Snapshots never change, so they are sent with long-lived cache headers.
+    """
+    payload = None
+    snapshot = catalog.get()
+    if snapshot is not None:
+        current = snapshot.survey_payload(survey_id)
+        if current is not None and current.content_hash == content_hash:
+            payload = current
+    if payload is None:
+        payload = await get_snapshot(db, survey_id, content_hash)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Snapshot not found",
+        )
+
+    # Snapshots are only taken of published surveys, which answerers may read
+    if user.role == UserRole.ADMIN:
+        survey = await db.get(Survey, survey_id)
+        if survey is None:
+            # Deleted, with another worker's catalog not yet refreshed
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Survey not found",
+            )
+        service = SurveyService(db)
+        if survey.owner_id != user.id and not await service.admin_has_access(survey_id, user.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have access to this survey",
+            )
+
+    return _snapshot_response(request, survey_id, payload, immutable=True)
+
+
 @router.patch("/{survey_id}/publish", response_model=SurveyResponse)
 async def publish_survey(
     survey: Survey = Depends(get_owned_survey),
@@ -102,6 +260,91 @@ async def publish_survey(
     return await service.publish_survey(survey)
 
 
+@router.patch("/{survey_id}/close", response_model=SurveyResponse)
+async def close_survey(
+    survey: Survey = Depends(get_owned_survey),
+    db: AsyncSession = Depends(get_db),
+):
+    """Close a survey to new responses (Owner only)."""
+    service = SurveyService(db)
+    if survey.closed_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Survey is already closed",
+        )
+    return await service.close_survey(survey)
+
+
+@router.delete(
+    "/{survey_id}",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def delete_survey(
+    survey: Survey = Depends(get_owned_survey),
+    db: AsyncSession = Depends(get_db),
+):
+    """Delete a survey with its questions and responses (Owner only).
+
+    Surveys can hold millions of answers, so deletion runs as a background
+    job; poll it at ``/api/jobs/{job_id}``. The survey is closed as soon as
+    the job starts.
+    """
+    service = JobService(db)
+    try:
+        job = await service.create_job(
+            owner_id=survey.owner_id,
+            survey_id=survey.id,
+            kind=JobKind.SURVEY_DELETE,
+            params={},
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+        )
+    job_runner.notify()
+    return job
+
+
+@router.post(
+    "/{survey_id}/clone",
+    response_model=list[SurveyListResponse],
+    status_code=status.HTTP_201_CREATED,
+)
+async def clone_survey(
+    clone_data: SurveyClone,
+    survey: Survey = Depends(get_survey_with_access),
+    user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Copy a survey with its questions, once per owner (Admin with access only).
+
+    Without ``owner_ids`` the copy goes to the requesting admin; with many
+    owners, one template is provisioned for all of them in one call.
+    """
+    service = SurveyService(db)
+    try:
+        rows = await service.clone_survey(
+            survey,
+            owner_ids=clone_data.owner_ids or [user.id],
+            title=clone_data.title,
+            include_access=clone_data.include_access,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    return [
+        SurveyListResponse.model_validate(copy).model_copy(
+            update={"question_count": question_count}
+        )
+        for copy, question_count in rows
+    ]
+
+
 @router.post("/{survey_id}/share", status_code=status.HTTP_201_CREATED)
 async def share_survey(
     share_data: SurveyShareRequest,
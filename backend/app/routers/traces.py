@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.dependencies import require_admin
+from app.models.user import User
+from app.schemas.trace import TraceResponse
+from app.tracing import trace_buffer
+
+router = APIRouter(prefix="/api/traces", tags=["traces"])
+
+
+@router.get("", response_model=list[TraceResponse])
+async def list_slowest_traces(
+    limit: int = Query(20, ge=1, le=200),
+    min_duration_ms: float = Query(0.0, ge=0),
+    user: User = Depends(require_admin),
+):
+    """Slowest recently kept request traces, slowest first (Admin only)."""
+    return [t.to_dict() for t in trace_buffer.slowest(limit, min_duration_ms)]
+
+
+@router.get("/{trace_id}", response_model=TraceResponse)
+async def get_trace(
+    trace_id: str,
+    user: User = Depends(require_admin),
+):
+    """Get one kept trace with its full span tree (Admin only)."""
+    trace = trace_buffer.get(trace_id)
+    if not trace:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trace not found",
+        )
+    return trace.to_dict()
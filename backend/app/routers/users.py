@@ -1,43 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.dependencies import get_current_user
+from app.database import get_db, get_read_db
+from app.dependencies import get_current_user, require_admin
 from app.models.user import User
-from app.schemas.user import UserCreate, UserResponse
+from app.schemas.user import (
+    UserCreate,
+    UserResponse,
+    UserRole,
+    UserImport,
+    UserImportResponse,
+)
+from app.services.user_service import UserService
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
 @router.get("", response_model=list[UserResponse])
-async def list_users(db: AsyncSession = Depends(get_db)):
-    """List all users (for demo user switching)."""
-    result = await db.execute(select(User))
-    users = result.scalars().all()
+async def list_users(
+    http_response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    role: UserRole | None = None,
+    email_prefix: str | None = Query(None, min_length=1, max_length=255),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """List users by email, one page at a time (for demo user switching).
+
+    The total number of matching users is returned in ``X-Total-Count``.
+    """
+    service = UserService(db)
+    users, total = await service.list_users_page(limit, offset, role, email_prefix)
+    http_response.headers["X-Total-Count"] = str(total)
     return users
 
 
 @router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Create a new user."""
-    # Check if email already exists
-    existing = await db.execute(select(User).where(User.email == user_data.email))
-    if existing.scalar_one_or_none():
+    service = UserService(db)
+    try:
+        return await service.create_user(
+            email=user_data.email,
+            name=user_data.name,
+            role=user_data.role,
+        )
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered",
+            detail=str(e),
         )
 
-    user = User(
-        email=user_data.email,
-        name=user_data.name,
-        role=user_data.role,
-    )
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
-    return user
+
+@router.post("/import", response_model=UserImportResponse)
+async def import_users(
+    request: UserImport,
+    user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Create many users at once (Admin only).
+
+    Emails that are already registered, or repeated in the request, are
+    skipped and listed in ``skipped``.
+    """
+    service = UserService(db)
+    created, skipped = await service.import_users([u.model_dump() for u in request.users])
+    return UserImportResponse(created=created, skipped=skipped)
 
 
 @router.get("/me", response_model=UserResponse)
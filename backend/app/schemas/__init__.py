@@ -1,11 +1,28 @@
-from app.schemas.user import UserCreate, UserResponse, UserRole
+from app.schemas.user import (
+    UserCreate,
+    UserResponse,
+    UserRole,
+    UserImport,
+    UserImportResponse,
+)
 from app.schemas.survey import (
     SurveyCreate,
     SurveyResponse,
     SurveyListResponse,
     SurveyShareRequest,
+    AnswerStorage,
+    SurveySort,
+    SurveyClone,
+    SurveySummary,
+    PortfolioResponse,
+)
+from app.schemas.question import (
+    QuestionCreate,
+    QuestionResponse,
+    QuestionType,
+    QuestionBulkCreate,
+    QuestionReorder,
 )
-from app.schemas.question import QuestionCreate, QuestionResponse, QuestionType
 from app.schemas.response import (
     AnswerCreate,
     AnswerResponse,
@@ -13,23 +30,64 @@ from app.schemas.response import (
     ResponseResponse,
     ResponseListResponse,
     AggregateResponse,
+    ComparisonMatch,
+    ComparisonRequest,
+    ComparisonResponse,
+    AnswerError,
+    ChangeEntry,
+    ChangeFeedResponse,
+)
+from app.schemas.job import JobCreate, JobResponse, JobKind, JobStatus
+from app.schemas.batch import (
+    BatchGetRequest,
+    BatchError,
+    SurveyBatchResponse,
+    ResponseBatchResponse,
 )
+from app.schemas.trace import SpanResponse, TraceResponse
+from app.schemas.metrics import GateStats
 
 __all__ = [
     "UserCreate",
     "UserResponse",
     "UserRole",
+    "UserImport",
+    "UserImportResponse",
     "SurveyCreate",
     "SurveyResponse",
     "SurveyListResponse",
     "SurveyShareRequest",
+    "AnswerStorage",
+    "SurveySort",
+    "SurveyClone",
+    "SurveySummary",
+    "PortfolioResponse",
     "QuestionCreate",
     "QuestionResponse",
     "QuestionType",
+    "QuestionBulkCreate",
+    "QuestionReorder",
     "AnswerCreate",
     "AnswerResponse",
     "ResponseCreate",
     "ResponseResponse",
     "ResponseListResponse",
     "AggregateResponse",
+    "ComparisonMatch",
+    "ComparisonRequest",
+    "ComparisonResponse",
+    "AnswerError",
+    "ChangeEntry",
+    "ChangeFeedResponse",
+    "JobCreate",
+    "JobResponse",
+    "JobKind",
+    "JobStatus",
+    "BatchGetRequest",
+    "BatchError",
+    "SurveyBatchResponse",
+    "ResponseBatchResponse",
+    "SpanResponse",
+    "TraceResponse",
+    "GateStats",
 ]
@@ -0,0 +1,28 @@
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.schemas.response import ResponseResponse
+from app.schemas.survey import SurveyResponse
+
+MAX_BATCH_IDS = 100
+
+
+class BatchGetRequest(BaseModel):
+    ids: list[UUID] = Field(min_length=1, max_length=MAX_BATCH_IDS)
+
+
+class BatchError(BaseModel):
+    id: UUID
+    status_code: int
+    detail: str
+
+
+class SurveyBatchResponse(BaseModel):
+    results: list[SurveyResponse]
+    errors: list[BatchError]
+
+
+class ResponseBatchResponse(BaseModel):
+    results: list[ResponseResponse]
+    errors: list[BatchError]
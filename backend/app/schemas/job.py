@@ -0,0 +1,52 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, model_validator
+
+
+class JobKind(str, Enum):
+    EXPORT = "export"
+    AGGREGATE_REBUILD = "aggregate_rebuild"
+    CROSSTAB = "crosstab"
+    SURVEY_DELETE = "survey_delete"
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobCreate(BaseModel):
+    kind: JobKind
+    params: dict[str, Any] = {}
+
+    @model_validator(mode="after")
+    def validate_params(self):
+        if self.kind == JobKind.SURVEY_DELETE:
+            raise ValueError("surveys are deleted with DELETE /api/surveys/{survey_id}")
+        if self.kind == JobKind.CROSSTAB:
+            for key in ("question_a", "question_b"):
+                try:
+                    UUID(str(self.params.get(key)))
+                except ValueError:
+                    raise ValueError(f"crosstab jobs require a {key} question id")
+        return self
+
+
+class JobResponse(BaseModel):
+    id: UUID
+    kind: JobKind
+    status: JobStatus
+    survey_id: Optional[UUID]
+    progress: float
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class GateStats(BaseModel):
+    limit: int
+    queue_size: int
+    active: int
+    # Current queue depth
+    waiting: int
+    admitted: int
+    rejected: int
+    timed_out: int
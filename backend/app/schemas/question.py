@@ -2,7 +2,10 @@ from enum import Enum
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, Field, model_validator
+
+
+MAX_BULK_QUESTIONS = 500
 
 
 class QuestionType(str, Enum):
@@ -26,6 +29,16 @@ class QuestionCreate(BaseModel):
         return self
 
 
+class QuestionBulkCreate(BaseModel):
+    # Questions without an explicit order_index are appended in list order
+    questions: list[QuestionCreate] = Field(min_length=1, max_length=MAX_BULK_QUESTIONS)
+
+
+class QuestionReorder(BaseModel):
+    # Every question of the survey, in the new order
+    question_ids: list[UUID] = Field(min_length=1)
+
+
 class QuestionResponse(BaseModel):
     id: UUID
     survey_id: UUID
@@ -33,6 +46,7 @@ class QuestionResponse(BaseModel):
     type: QuestionType
     rank_max: Optional[int]
     order_index: int
+    template_question_id: Optional[UUID] = None
 
     class Config:
         from_attributes = True
@@ -1,12 +1,16 @@
 from datetime import datetime
+from enum import Enum
 from typing import Optional, Any
 from uuid import UUID
 
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, Field, model_validator
 
 from app.schemas.question import QuestionType
 
 
+MAX_COMPARE_SURVEYS = 1000
+
+
 class AnswerCreate(BaseModel):
     question_id: UUID
     text_value: Optional[str] = None
@@ -81,3 +85,77 @@ class AggregateResponse(BaseModel):
     survey_id: UUID
     total_responses: int
     questions: list[QuestionAggregate]
+
+
+class ComparisonMatch(str, Enum):
+    # Questions copied from the same template question
+    LINEAGE = "lineage"
+    # Questions of the same type with the same text (case and spacing ignored)
+    TEXT = "text"
+
+
+class ComparisonRequest(BaseModel):
+    survey_ids: list[UUID] = Field(min_length=2, max_length=MAX_COMPARE_SURVEYS)
+    match: ComparisonMatch = ComparisonMatch.LINEAGE
+    # Surveys whose mean is this many standard deviations from the others' are outliers
+    outlier_z: float = Field(default=2.0, gt=0)
+
+
+class SurveyQuestionStats(BaseModel):
+    survey_id: UUID
+    question_id: UUID
+    count: int
+    # Mean rank, or the true rate (0-1) for true/false questions
+    mean: Optional[float] = None
+    stddev: Optional[float] = None
+    # Distance of the mean from the mean of all surveys' means, in their standard deviations
+    z_score: Optional[float] = None
+    outlier: bool = False
+
+
+class QuestionComparison(BaseModel):
+    # Root template question id, or the normalized text
+    key: str
+    question_text: str
+    question_type: QuestionType
+    survey_count: int
+    total_responses: int
+    # Over all answers of all surveys
+    pooled_mean: Optional[float] = None
+    pooled_stddev: Optional[float] = None
+    # Spread of the per-survey means
+    min_mean: Optional[float] = None
+    max_mean: Optional[float] = None
+    stddev_of_means: Optional[float] = None
+    surveys: list[SurveyQuestionStats]
+
+
+class ComparisonResponse(BaseModel):
+    match: ComparisonMatch
+    survey_count: int
+    questions: list[QuestionComparison]
+
+
+class AnswerError(BaseModel):
+    # Index of the offending answer in the submission (None for missing questions)
+    index: Optional[int] = None
+    question_id: Optional[UUID] = None
+    code: str
+    message: str
+
+
+class ChangeEntry(BaseModel):
+    seq: int
+    id: UUID
+    survey_id: UUID
+    answerer_id: UUID
+    submitted_at: datetime
+    # question_id -> the answer's value
+    answers: dict[UUID, int | bool | str]
+
+
+class ChangeFeedResponse(BaseModel):
+    changes: list[ChangeEntry]
+    # Pass as ``since`` on the next call
+    next_cursor: int
+    has_more: bool
@@ -1,15 +1,34 @@
-from datetime import datetime
+from datetime import date, datetime
+from enum import Enum
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.schemas.question import QuestionResponse
 
 
+MAX_CLONE_OWNERS = 500
+
+
+class AnswerStorage(str, Enum):
+    ROWS = "rows"
+    PACKED = "packed"
+
+
+class SurveySort(str, Enum):
+    CREATED_AT = "created_at"
+    CREATED_AT_DESC = "-created_at"
+    TITLE = "title"
+    TITLE_DESC = "-title"
+    RESPONSE_COUNT = "response_count"
+    RESPONSE_COUNT_DESC = "-response_count"
+
+
 class SurveyCreate(BaseModel):
     title: str
     description: Optional[str] = None
+    answer_storage: AnswerStorage = AnswerStorage.ROWS
 
 
 class SurveyResponse(BaseModel):
@@ -18,7 +37,11 @@ class SurveyResponse(BaseModel):
     title: str
     description: Optional[str]
     is_published: bool
+    answer_storage: AnswerStorage
     created_at: datetime
+    closed_at: Optional[datetime] = None
+    archived_at: Optional[datetime] = None
+    template_id: Optional[UUID] = None
     questions: list[QuestionResponse] = []
 
     class Config:
@@ -32,10 +55,44 @@ class SurveyListResponse(BaseModel):
     description: Optional[str]
     is_published: bool
     created_at: datetime
+    closed_at: Optional[datetime] = None
+    question_count: int = 0
+    response_count: int = 0
+    template_id: Optional[UUID] = None
 
     class Config:
         from_attributes = True
 
 
+class SurveySummary(BaseModel):
+    id: UUID
+    owner_id: UUID
+    title: str
+    is_published: bool
+    created_at: datetime
+    closed_at: Optional[datetime] = None
+    archived_at: Optional[datetime] = None
+    response_count: int
+    last_response_at: Optional[datetime] = None
+    # Responses per day over the trend window, oldest first
+    daily_responses: list[int]
+
+
+class PortfolioResponse(BaseModel):
+    # First day of every survey's daily_responses
+    trend_start: date
+    total_responses: int
+    surveys: list[SurveySummary]
+
+
+class SurveyClone(BaseModel):
+    # Defaults to the source survey's title
+    title: Optional[str] = None
+    # One copy per owner; defaults to the requesting admin
+    owner_ids: Optional[list[UUID]] = Field(default=None, min_length=1, max_length=MAX_CLONE_OWNERS)
+    # Also copy the source survey's access grants
+    include_access: bool = False
+
+
 class SurveyShareRequest(BaseModel):
     admin_id: UUID
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+
+class SpanResponse(BaseModel):
+    name: str
+    kind: str
+    offset_ms: float
+    duration_ms: float
+    attrs: dict[str, Any]
+    children: list["SpanResponse"] = []
+
+
+class TraceResponse(BaseModel):
+    id: str
+    method: str
+    path: str
+    route: Optional[str]
+    status_code: Optional[int]
+    started_at: datetime
+    duration_ms: float
+    root: SpanResponse
@@ -2,7 +2,10 @@ from datetime import datetime
 from enum import Enum
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
+
+# Users accepted by one POST /api/users/import call
+MAX_IMPORT_USERS = 50000
 
 
 class UserRole(str, Enum):
@@ -25,3 +28,13 @@ class UserResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class UserImport(BaseModel):
+    users: list[UserCreate] = Field(min_length=1, max_length=MAX_IMPORT_USERS)
+
+
+class UserImportResponse(BaseModel):
+    created: int
+    # Already registered, or repeated within the import
+    skipped: list[str]
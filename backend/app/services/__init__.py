@@ -1,4 +1,17 @@
 from app.services.survey_service import SurveyService
 from app.services.response_service import ResponseService
+from app.services.archive_service import ArchiveService
+from app.services.job_service import JobService
+from app.services.user_service import UserService
+from app.services.purge_service import PurgeService
+from app.services.comparative import ComparisonService
 
-__all__ = ["SurveyService", "ResponseService"]
+__all__ = [
+    "SurveyService",
+    "ResponseService",
+    "ArchiveService",
+    "JobService",
+    "UserService",
+    "PurgeService",
+    "ComparisonService",
+]
@@ -0,0 +1,195 @@
+"""Pure computations over plain response data.
+
+These functions take and return picklable values only, so the job runner can
+execute them in a worker process as well as inline.
+"""
+import csv
+import io
+import math
+from array import array
+from collections import defaultdict
+from uuid import UUID
+
+from app.schemas.question import QuestionType
+from app.schemas.response import (
+    QuestionAggregate,
+    AggregateResponse,
+    ComparisonMatch,
+    ComparisonResponse,
+    QuestionComparison,
+    SurveyQuestionStats,
+)
+
+
+def build_aggregates(
+    survey_id: UUID, questions: list[dict], responses: list[dict]
+) -> AggregateResponse:
+    """Aggregate answers per question (counts, averages, true/false totals)."""
+    answers_by_question = defaultdict(list)
+    for response in responses:
+        for answer in response["answers"]:
+            answers_by_question[answer["question_id"]].append(answer)
+
+    question_aggregates = []
+    for question in questions:
+        answers = answers_by_question.get(question["id"], [])
+        aggregate = QuestionAggregate(
+            question_id=question["id"],
+            question_text=question["text"],
+            question_type=question["type"],
+            total_responses=len(answers),
+        )
+
+        if question["type"] == QuestionType.TRUE_FALSE:
+            true_count = sum(1 for a in answers if a["bool_value"] is True)
+            false_count = sum(1 for a in answers if a["bool_value"] is False)
+            aggregate.true_count = true_count
+            aggregate.false_count = false_count
+            if len(answers) > 0:
+                aggregate.true_percentage = round(true_count / len(answers) * 100, 2)
+
+        elif question["type"] == QuestionType.RANK:
+            rank_values = [a["rank_value"] for a in answers if a["rank_value"] is not None]
+            if rank_values:
+                aggregate.average_rank = round(sum(rank_values) / len(rank_values), 2)
+                # Build distribution
+                distribution = defaultdict(int)
+                for v in rank_values:
+                    distribution[v] += 1
+                aggregate.rank_distribution = dict(distribution)
+
+        elif question["type"] == QuestionType.TEXT:
+            aggregate.text_responses = [
+                a["text_value"] for a in answers if a["text_value"] is not None
+            ]
+
+        question_aggregates.append(aggregate)
+
+    return AggregateResponse(
+        survey_id=survey_id,
+        total_responses=len(responses),
+        questions=question_aggregates,
+    )
+
+
+def answer_value(answer: dict):
+    """The single value set on an answer."""
+    for field in ("rank_value", "bool_value", "text_value"):
+        if answer[field] is not None:
+            return answer[field]
+    return None
+
+
+def render_csv(questions: list[dict], responses: list[dict]) -> str:
+    """One row per response, one column per question in survey order."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(
+        ["response_id", "answerer_id", "submitted_at"] + [q["text"] for q in questions]
+    )
+    for response in responses:
+        values = {a["question_id"]: answer_value(a) for a in response["answers"]}
+        writer.writerow(
+            [response["id"], response["answerer_id"], response["submitted_at"].isoformat()]
+            + ["" if values.get(q["id"]) is None else values[q["id"]] for q in questions]
+        )
+    return out.getvalue()
+
+
+def build_crosstab(
+    question_a: UUID, question_b: UUID, responses: list[dict]
+) -> dict:
+    """Count responses for each pair of values of two questions."""
+    counts = defaultdict(int)
+    for response in responses:
+        values = {a["question_id"]: answer_value(a) for a in response["answers"]}
+        if question_a in values and question_b in values:
+            counts[(values[question_a], values[question_b])] += 1
+
+    rows = sorted({a for a, _ in counts}, key=str)
+    columns = sorted({b for _, b in counts}, key=str)
+    return {
+        "question_a": str(question_a),
+        "question_b": str(question_b),
+        "rows": rows,
+        "columns": columns,
+        "counts": [[counts.get((a, b), 0) for b in columns] for a in rows],
+    }
+
+
+def _spread(values: list[float]) -> tuple[float, float]:
+    """Mean and population standard deviation."""
+    mean = math.fsum(values) / len(values)
+    variance = math.fsum((v - mean) ** 2 for v in values) / len(values)
+    return mean, math.sqrt(variance)
+
+
+def build_comparison(
+    match: ComparisonMatch,
+    survey_ids: list[UUID],
+    groups: list[dict],
+    outlier_z: float,
+) -> ComparisonResponse:
+    """Per-survey and pooled statistics of matched questions.
+
+    Each group is one matched question: ``question_ids`` maps survey
+    positions (indexes into ``survey_ids``) to the survey's question, and the
+    parallel ``surveys`` / ``values`` arrays hold one entry per answer (rank,
+    or 1/0 for true/false). Per-survey counts, sums and sums of squares are
+    accumulated in one pass over those columns.
+    """
+    n = len(survey_ids)
+    comparisons = []
+    for group in groups:
+        counts = array("q", bytes(8 * n))
+        sums = array("d", bytes(8 * n))
+        squares = array("d", bytes(8 * n))
+        for position, value in zip(group["surveys"], group["values"]):
+            counts[position] += 1
+            sums[position] += value
+            squares[position] += value * value
+
+        stats = []
+        for position, question_id in group["question_ids"].items():
+            count = counts[position]
+            entry = SurveyQuestionStats(
+                survey_id=survey_ids[position], question_id=question_id, count=count
+            )
+            if count:
+                mean = sums[position] / count
+                entry.mean = mean
+                entry.stddev = math.sqrt(max(squares[position] / count - mean * mean, 0.0))
+            stats.append(entry)
+
+        comparison = QuestionComparison(
+            key=group["key"],
+            question_text=group["question_text"],
+            question_type=group["question_type"],
+            survey_count=len(stats),
+            total_responses=len(group["values"]),
+            surveys=stats,
+        )
+        if group["values"]:
+            total = len(group["values"])
+            pooled_mean = math.fsum(sums) / total
+            comparison.pooled_mean = round(pooled_mean, 4)
+            comparison.pooled_stddev = round(
+                math.sqrt(max(math.fsum(squares) / total - pooled_mean ** 2, 0.0)), 4
+            )
+
+            means = [s.mean for s in stats if s.mean is not None]
+            center, deviation = _spread(means)
+            comparison.min_mean = round(min(means), 4)
+            comparison.max_mean = round(max(means), 4)
+            comparison.stddev_of_means = round(deviation, 4)
+            for entry in stats:
+                if entry.mean is None:
+                    continue
+                if deviation > 0:
+                    entry.z_score = round((entry.mean - center) / deviation, 4)
+                    entry.outlier = abs(entry.z_score) >= outlier_z
+                entry.mean = round(entry.mean, 4)
+                entry.stddev = round(entry.stddev, 4)
+        comparisons.append(comparison)
+
+    return ComparisonResponse(match=match, survey_count=n, questions=comparisons)
@@ -0,0 +1,115 @@
+"""Packed binary encoding of a response's answers.
+
+Layout (little endian), version 1:
+
+    header   u8 version, u16 answer count
+    entry    u16 question ordinal, u8 tag, then the value:
+               TAG_RANK  i32
+               TAG_BOOL  u8
+               TAG_TEXT  u32 byte length + UTF-8 bytes
+
+Ordinals index the survey's questions ordered by (order_index, id), which
+cannot change once a survey has responses.
+"""
+import struct
+import uuid
+from uuid import UUID
+
+FORMAT_VERSION = 1
+
+TAG_RANK = 1
+TAG_BOOL = 2
+TAG_TEXT = 3
+
+_HEADER = struct.Struct("<BH")
+_ENTRY = struct.Struct("<HB")
+_RANK = struct.Struct("<i")
+_BOOL = struct.Struct("<B")
+_TEXT_LEN = struct.Struct("<I")
+
+
+def encode_answers(answers: list[dict], ordinals: dict[UUID, int]) -> bytes:
+    """Pack validated answers using the survey's question ordinals."""
+    parts = [_HEADER.pack(FORMAT_VERSION, len(answers))]
+    for answer in answers:
+        ordinal = ordinals[answer["question_id"]]
+        if answer.get("rank_value") is not None:
+            parts.append(_ENTRY.pack(ordinal, TAG_RANK))
+            parts.append(_RANK.pack(answer["rank_value"]))
+        elif answer.get("bool_value") is not None:
+            parts.append(_ENTRY.pack(ordinal, TAG_BOOL))
+            parts.append(_BOOL.pack(answer["bool_value"]))
+        else:
+            data = answer["text_value"].encode("utf-8")
+            parts.append(_ENTRY.pack(ordinal, TAG_TEXT))
+            parts.append(_TEXT_LEN.pack(len(data)))
+            parts.append(data)
+    return b"".join(parts)
+
+
+def decode_answers(
+    response_id: UUID, data: bytes, question_ids: list[UUID]
+) -> list[dict]:
+    """Unpack answers into the same dicts the row layout stores.
+
+    Answer ids are derived from the response and question ids so they stay
+    stable across reads and when converting back to rows.
+    """
+    version, count = _HEADER.unpack_from(data, 0)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported packed answer format version {version}")
+
+    offset = _HEADER.size
+    answers = []
+    for _ in range(count):
+        ordinal, tag = _ENTRY.unpack_from(data, offset)
+        offset += _ENTRY.size
+        question_id = question_ids[ordinal]
+        answer = {
+            "id": uuid.uuid5(response_id, str(question_id)),
+            "response_id": response_id,
+            "question_id": question_id,
+            "text_value": None,
+            "bool_value": None,
+            "rank_value": None,
+        }
+        if tag == TAG_RANK:
+            answer["rank_value"] = _RANK.unpack_from(data, offset)[0]
+            offset += _RANK.size
+        elif tag == TAG_BOOL:
+            answer["bool_value"] = bool(_BOOL.unpack_from(data, offset)[0])
+            offset += _BOOL.size
+        elif tag == TAG_TEXT:
+            length = _TEXT_LEN.unpack_from(data, offset)[0]
+            offset += _TEXT_LEN.size
+            answer["text_value"] = data[offset:offset + length].decode("utf-8")
+            offset += length
+        else:
+            raise ValueError(f"Unknown packed answer tag {tag}")
+        answers.append(answer)
+    return answers
+
+
+def decode_scalars(data: bytes) -> list[tuple[int, int]]:
+    """(question ordinal, value) of the rank and true/false answers only,
+    true/false as 1/0; text answers are skipped without being decoded."""
+    version, count = _HEADER.unpack_from(data, 0)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported packed answer format version {version}")
+
+    offset = _HEADER.size
+    values = []
+    for _ in range(count):
+        ordinal, tag = _ENTRY.unpack_from(data, offset)
+        offset += _ENTRY.size
+        if tag == TAG_RANK:
+            values.append((ordinal, _RANK.unpack_from(data, offset)[0]))
+            offset += _RANK.size
+        elif tag == TAG_BOOL:
+            values.append((ordinal, _BOOL.unpack_from(data, offset)[0]))
+            offset += _BOOL.size
+        elif tag == TAG_TEXT:
+            offset += _TEXT_LEN.size + _TEXT_LEN.unpack_from(data, offset)[0]
+        else:
+            raise ValueError(f"Unknown packed answer tag {tag}")
+    return values
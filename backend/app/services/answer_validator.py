@@ -0,0 +1,149 @@
+from collections import OrderedDict
+from typing import NamedTuple
+from uuid import UUID
+
+from app.models.question import Question, QuestionType
+from app.schemas.response import AnswerError
+
+# Answer column each question type must be answered with
+VALUE_FIELDS = {
+    QuestionType.RANK: "rank_value",
+    QuestionType.TRUE_FALSE: "bool_value",
+    QuestionType.TEXT: "text_value",
+}
+
+MAX_CACHED_VALIDATORS = 1024
+
+
+class QuestionRule(NamedTuple):
+    ordinal: int
+    field: str
+    rank_max: int | None
+
+
+def question_signature(questions: list[Question]) -> frozenset:
+    """What a validator depends on in a survey's questions; order follows from it."""
+    return frozenset((q.id, q.order_index, q.type, q.rank_max) for q in questions)
+
+
+class SurveyValidator:
+    """Answer rules for one survey, compiled from its questions.
+
+    Questions are indexed by id into a (ordinal, expected field, bounds) table
+    so a submission is checked in one pass without touching the database.
+    """
+
+    def __init__(self, survey_id: UUID, questions: list[Question]):
+        self.survey_id = survey_id
+        ordered = sorted(questions, key=lambda q: (q.order_index, str(q.id)))
+        self.rules: dict[UUID, QuestionRule] = {
+            q.id: QuestionRule(ordinal, VALUE_FIELDS[QuestionType(q.type)], q.rank_max)
+            for ordinal, q in enumerate(ordered)
+        }
+        # Ordinal -> question id, the layout used by packed answer storage
+        self.question_ids: list[UUID] = [q.id for q in ordered]
+        self.ordinals: dict[UUID, int] = {
+            question_id: rule.ordinal for question_id, rule in self.rules.items()
+        }
+        self.signature = question_signature(questions)
+
+    def matches(self, questions: list[Question]) -> bool:
+        """Whether this validator was compiled from these questions."""
+        return question_signature(questions) == self.signature
+
+    def validate(self, answers: list[dict]) -> list[AnswerError]:
+        """Check one submission and return per-answer errors (empty when valid)."""
+        rules = self.rules
+        errors: list[AnswerError] = []
+        seen: set[UUID] = set()
+
+        for index, answer in enumerate(answers):
+            question_id = answer["question_id"]
+            rule = rules.get(question_id)
+            if rule is None:
+                errors.append(AnswerError(
+                    index=index,
+                    question_id=question_id,
+                    code="unknown_question",
+                    message="Question does not belong to this survey",
+                ))
+                continue
+            if question_id in seen:
+                errors.append(AnswerError(
+                    index=index,
+                    question_id=question_id,
+                    code="duplicate_answer",
+                    message="Question answered more than once",
+                ))
+                continue
+            seen.add(question_id)
+
+            value = answer.get(rule.field)
+            if value is None:
+                errors.append(AnswerError(
+                    index=index,
+                    question_id=question_id,
+                    code="wrong_type",
+                    message=f"Expected {rule.field} for this question",
+                ))
+            elif rule.rank_max is not None and not 1 <= value <= rule.rank_max:
+                errors.append(AnswerError(
+                    index=index,
+                    question_id=question_id,
+                    code="out_of_range",
+                    message=f"rank_value must be between 1 and {rule.rank_max}",
+                ))
+
+        if len(seen) != len(rules):
+            for question_id in rules.keys() - seen:
+                errors.append(AnswerError(
+                    question_id=question_id,
+                    code="missing_answer",
+                    message="Answers must be provided for all questions",
+                ))
+
+        return errors
+
+    def validate_batch(self, submissions: list[list[dict]]) -> list[list[AnswerError]]:
+        """Check many submissions; result lists line up with the input."""
+        return [self.validate(answers) for answers in submissions]
+
+
+_validators: OrderedDict[UUID, SurveyValidator] = OrderedDict()
+
+
+def get_survey_validator(survey) -> SurveyValidator:
+    """Return the cached validator for a survey, compiling it on first use.
+
+    The survey must have its questions loaded. A cached validator compiled
+    from other questions (another worker changed them and this one has not
+    polled the invalidation yet) is recompiled and replaced.
+    """
+    validator = _validators.get(survey.id)
+    if validator is not None and validator.matches(survey.questions):
+        _validators.move_to_end(survey.id)
+        return validator
+
+    validator = SurveyValidator(survey.id, survey.questions)
+    # Only published surveys are answered, so drafts are not worth caching
+    if survey.is_published:
+        _validators[survey.id] = validator
+        _validators.move_to_end(survey.id)
+        if len(_validators) > MAX_CACHED_VALIDATORS:
+            _validators.popitem(last=False)
+    else:
+        _validators.pop(survey.id, None)
+    return validator
+
+
+def get_cached_validator(survey_id: UUID) -> SurveyValidator | None:
+    """Return a survey's validator if it is already compiled."""
+    return _validators.get(survey_id)
+
+
+def invalidate_survey_validator(survey_id: UUID | None) -> None:
+    """Drop a survey's compiled validator (all for None) after questions change."""
+    if survey_id is None:
+        _validators.clear()
+    else:
+        _validators.pop(survey_id, None)
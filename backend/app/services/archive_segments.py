@@ -0,0 +1,280 @@
+"""Compressed, append-only segment files for archived responses.
+
+A segment holds a batch of one survey's responses in a columnar layout. Each
+column is zlib-compressed on its own and the file ends with a small footer:
+
+    column data ...
+    footer      JSON: version, survey id, counts, column directory
+    trailer     u32 footer length + MAGIC
+
+Response columns (one entry per response):
+    response_id, answerer_id   16 bytes each
+    submitted_at               i64 microseconds since the epoch
+    answer_start               u32 index of the response's first answer
+                               (response_count + 1 entries)
+
+Answer columns (one entry per answer):
+    answer_id, question_id     16 bytes each
+    tag                        u8, answer_codec.TAG_*
+    rank_value                 i32
+    bool_value                 u8
+    text_start                 u32 offset into text_data (answer_count + 1)
+    text_data                  concatenated UTF-8
+
+Segments are written once to a temporary file and renamed into place, and
+read back through a memory map so only the columns a reader touches are
+decompressed.
+"""
+import json
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from app.services.answer_codec import TAG_RANK, TAG_BOOL, TAG_TEXT
+
+FORMAT_VERSION = 1
+MAGIC = b"SVSEG001"
+_TRAILER = struct.Struct("<I8s")
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+MAX_OPEN_SEGMENTS = 64
+
+
+def _uuid_column(values) -> bytes:
+    return b"".join(v.bytes for v in values)
+
+
+def write_segment(path: str, survey_id: UUID, responses: list[dict]) -> int:
+    """Write responses (dicts with an ``answers`` list) to a new segment file.
+
+    Returns the number of bytes written.
+    """
+    answers = [a for r in responses for a in r["answers"]]
+
+    answer_start = array("I", [0])
+    for r in responses:
+        answer_start.append(answer_start[-1] + len(r["answers"]))
+
+    tags = bytearray()
+    ranks = array("i")
+    bools = bytearray()
+    text_start = array("I", [0])
+    text_data = bytearray()
+    for a in answers:
+        if a["rank_value"] is not None:
+            tags.append(TAG_RANK)
+        elif a["bool_value"] is not None:
+            tags.append(TAG_BOOL)
+        else:
+            tags.append(TAG_TEXT)
+            text_data += a["text_value"].encode("utf-8")
+        ranks.append(a["rank_value"] or 0)
+        bools.append(1 if a["bool_value"] else 0)
+        text_start.append(len(text_data))
+
+    columns = {
+        "response_id": _uuid_column(r["id"] for r in responses),
+        "answerer_id": _uuid_column(r["answerer_id"] for r in responses),
+        "submitted_at": array(
+            "q", ((r["submitted_at"] - EPOCH) // ONE_MICROSECOND for r in responses)
+        ).tobytes(),
+        "answer_start": answer_start.tobytes(),
+        "answer_id": _uuid_column(a["id"] for a in answers),
+        "question_id": _uuid_column(a["question_id"] for a in answers),
+        "tag": bytes(tags),
+        "rank_value": ranks.tobytes(),
+        "bool_value": bytes(bools),
+        "text_start": text_start.tobytes(),
+        "text_data": bytes(text_data),
+    }
+
+    directory = {}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for name, raw in columns.items():
+            compressed = zlib.compress(raw, 6)
+            directory[name] = [f.tell(), len(compressed), len(raw)]
+            f.write(compressed)
+        footer = json.dumps({
+            "version": FORMAT_VERSION,
+            "survey_id": str(survey_id),
+            "response_count": len(responses),
+            "answer_count": len(answers),
+            "columns": directory,
+        }).encode("utf-8")
+        f.write(footer)
+        f.write(_TRAILER.pack(len(footer), MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+class SegmentReader:
+    """Memory-mapped reader over one segment file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        footer_length, magic = _TRAILER.unpack_from(self._map, len(self._map) - _TRAILER.size)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a response segment")
+        footer_start = len(self._map) - _TRAILER.size - footer_length
+        footer = json.loads(self._map[footer_start:footer_start + footer_length])
+        if footer["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported segment version {footer['version']}")
+
+        self.survey_id = UUID(footer["survey_id"])
+        self.response_count: int = footer["response_count"]
+        self.answer_count: int = footer["answer_count"]
+        self._directory: dict[str, list[int]] = footer["columns"]
+        self._columns: dict[str, bytes] = {}
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def _column(self, name: str) -> bytes:
+        data = self._columns.get(name)
+        if data is None:
+            offset, length, _ = self._directory[name]
+            data = zlib.decompress(self._map[offset:offset + length])
+            self._columns[name] = data
+        return data
+
+    def _array(self, name: str, typecode: str) -> array:
+        values = array(typecode)
+        values.frombytes(self._column(name))
+        return values
+
+    def _uuid_at(self, name: str, index: int) -> UUID:
+        return UUID(bytes=self._column(name)[index * 16:(index + 1) * 16])
+
+    def find(self, response_id: UUID) -> int | None:
+        """Position of a response in this segment, if present."""
+        ids = self._column("response_id")
+        target = response_id.bytes
+        position = ids.find(target)
+        # Only 16-byte aligned matches are real ids
+        while position != -1 and position % 16:
+            position = ids.find(target, position + 1)
+        return None if position == -1 else position // 16
+
+    def positions(
+        self,
+        answerer_id: UUID | None = None,
+        submitted_before: datetime | None = None,
+    ) -> list[int]:
+        """Positions of one answerer's responses, or of those submitted earlier.
+
+        Only the answerer or submission time column is decompressed.
+        """
+        if answerer_id is not None:
+            answerers = self._column("answerer_id")
+            target = answerer_id.bytes
+            return [
+                p for p in range(self.response_count)
+                if answerers[p * 16:(p + 1) * 16] == target
+            ]
+        cutoff = (submitted_before - EPOCH) // ONE_MICROSECOND
+        return [p for p, t in enumerate(self._array("submitted_at", "q")) if t < cutoff]
+
+    def scalar_answers(self) -> list[tuple[bytes, int]]:
+        """(question id bytes, value) of every rank and true/false answer,
+        true/false as 1/0.
+
+        Only the question id, tag, rank and bool columns are decompressed.
+        """
+        question_ids = self._column("question_id")
+        tags = self._column("tag")
+        ranks = self._array("rank_value", "i")
+        bools = self._column("bool_value")
+        values = []
+        for i, tag in enumerate(tags):
+            if tag == TAG_RANK:
+                values.append((question_ids[i * 16:(i + 1) * 16], ranks[i]))
+            elif tag == TAG_BOOL:
+                values.append((question_ids[i * 16:(i + 1) * 16], bools[i]))
+        return values
+
+    def responses(
+        self,
+        positions: list[int] | None = None,
+        answerer_id: UUID | None = None,
+    ) -> list[dict]:
+        """Decode responses (all, the given positions, or one answerer's)."""
+        if positions is None:
+            positions = range(self.response_count)
+        if answerer_id is not None:
+            answerers = self._column("answerer_id")
+            target = answerer_id.bytes
+            positions = [p for p in positions if answerers[p * 16:(p + 1) * 16] == target]
+
+        submitted_at = self._array("submitted_at", "q")
+        answer_start = self._array("answer_start", "I")
+        tags = self._column("tag")
+        ranks = self._array("rank_value", "i")
+        bools = self._column("bool_value")
+        text_start = self._array("text_start", "I")
+        text_data = self._column("text_data")
+
+        results = []
+        for p in positions:
+            response_id = self._uuid_at("response_id", p)
+            answers = []
+            for i in range(answer_start[p], answer_start[p + 1]):
+                tag = tags[i]
+                answers.append({
+                    "id": self._uuid_at("answer_id", i),
+                    "response_id": response_id,
+                    "question_id": self._uuid_at("question_id", i),
+                    "rank_value": ranks[i] if tag == TAG_RANK else None,
+                    "bool_value": bool(bools[i]) if tag == TAG_BOOL else None,
+                    "text_value": (
+                        text_data[text_start[i]:text_start[i + 1]].decode("utf-8")
+                        if tag == TAG_TEXT else None
+                    ),
+                })
+            results.append({
+                "id": response_id,
+                "survey_id": self.survey_id,
+                "answerer_id": self._uuid_at("answerer_id", p),
+                "submitted_at": EPOCH + submitted_at[p] * ONE_MICROSECOND,
+                "answers": answers,
+            })
+        return results
+
+
+_readers: OrderedDict[str, SegmentReader] = OrderedDict()
+
+
+def open_segment(path: str) -> SegmentReader:
+    """Return a cached reader for a segment; segments never change once written."""
+    reader = _readers.get(path)
+    if reader is not None:
+        _readers.move_to_end(path)
+        return reader
+
+    reader = SegmentReader(path)
+    _readers[path] = reader
+    if len(_readers) > MAX_OPEN_SEGMENTS:
+        _, evicted = _readers.popitem(last=False)
+        evicted.close()
+    return reader
+
+
+def close_segment(path: str) -> None:
+    """Drop the cached reader of a segment that was replaced or deleted."""
+    reader = _readers.pop(path, None)
+    if reader is not None:
+        reader.close()
@@ -0,0 +1,147 @@
+import os
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.config import settings
+from app.models.archive import ArchiveSegment, SurveyRollup
+from app.models.response import Response, Answer
+from app.models.survey import Survey
+from app.services.archive_segments import write_segment
+from app.services.catalog import catalog, bump_generation
+from app.services.invalidation import invalidations, SURVEY_CHANNEL
+from app.services.response_service import ResponseService, response_to_dict
+from app.shards import is_sharded, responses_db
+from app.tracing import trace_methods
+
+
+@trace_methods
+class ArchiveService:
+    """Moves responses of long-closed surveys out of the database.
+
+    Responses are written to segment files under ``settings.archive_dir``;
+    the survey's aggregates are kept as a rollup row so ``get_aggregates``
+    keeps answering from the database.
+
+    With sharded storage the survey's rows are deleted from its shard right
+    after the main database commits the segments; should that delete fail,
+    archiving the survey again finishes it.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_archivable_surveys(self, older_than_days: int) -> list[UUID]:
+        """Surveys closed more than ``older_than_days`` ago and not yet archived."""
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        result = await self.db.execute(
+            select(Survey.id).where(
+                Survey.closed_at.is_not(None),
+                Survey.closed_at < cutoff,
+                Survey.archived_at.is_(None),
+            )
+        )
+        return list(result.scalars().all())
+
+    async def archive_survey(self, survey_id: UUID) -> int:
+        """Archive one closed survey; returns the number of archived responses."""
+        survey = await self.db.get(Survey, survey_id)
+        if survey is None or survey.closed_at is None:
+            raise ValueError("Only closed surveys can be archived")
+        if survey.archived_at is not None:
+            if is_sharded():
+                async with responses_db(self.db, survey_id) as db:
+                    await _delete_responses(db, survey_id)
+                    await db.commit()
+            return 0
+
+        response_service = ResponseService(self.db)
+        aggregates = await response_service.get_aggregates(survey_id)
+
+        os.makedirs(settings.archive_dir, exist_ok=True)
+        segments: list[ArchiveSegment] = []
+        last_id = None
+        async with responses_db(self.db, survey_id) as db:
+            try:
+                while True:
+                    query = (
+                        select(Response)
+                        .options(selectinload(Response.answers))
+                        .where(Response.survey_id == survey_id)
+                        .order_by(Response.id)
+                        .limit(settings.archive_segment_responses)
+                    )
+                    if last_id is not None:
+                        query = query.where(Response.id > last_id)
+                    result = await db.execute(query)
+                    responses = await response_service.unpack_answers(
+                        list(result.scalars().all())
+                    )
+                    if not responses:
+                        break
+                    last_id = responses[-1].id
+
+                    name = f"{survey_id}-{datetime.utcnow():%Y%m%d%H%M%S}-{len(segments):04d}.seg"
+                    size = write_segment(
+                        os.path.join(settings.archive_dir, name),
+                        survey_id,
+                        [response_to_dict(r) for r in responses],
+                    )
+                    segments.append(ArchiveSegment(
+                        survey_id=survey_id,
+                        path=name,
+                        response_count=len(responses),
+                        size_bytes=size,
+                    ))
+                    # Keep memory flat across chunks
+                    for response in responses:
+                        db.expunge(response)
+
+                # Segments are on disk; swap the rows for them in one transaction
+                self.db.add(SurveyRollup(survey_id=survey_id, payload=aggregates.model_dump_json()))
+                self.db.add_all(segments)
+                await _delete_responses(db, survey_id)
+                survey.archived_at = datetime.utcnow()
+                stale = await bump_generation(self.db, survey_id)
+                await invalidations.publish(self.db, SURVEY_CHANNEL, survey_id)
+                await self.db.commit()
+            except Exception:
+                await self.db.rollback()
+                await db.rollback()
+                for segment in segments:
+                    path = os.path.join(settings.archive_dir, segment.path)
+                    if os.path.exists(path):
+                        os.remove(path)
+                raise
+            if db is not self.db:
+                await db.commit()
+
+        self.db.expunge_all()
+        if stale:
+            await catalog.refresh()
+        return sum(s.response_count for s in segments)
+
+    async def archive_closed_surveys(
+        self, older_than_days: int | None = None
+    ) -> dict[UUID, int]:
+        """Archive every eligible survey; returns archived counts per survey."""
+        if older_than_days is None:
+            older_than_days = settings.archive_after_days
+        archived = {}
+        for survey_id in await self.list_archivable_surveys(older_than_days):
+            archived[survey_id] = await self.archive_survey(survey_id)
+        return archived
+
+
+async def _delete_responses(db: AsyncSession, survey_id: UUID) -> None:
+    await db.execute(
+        delete(Answer).where(
+            Answer.response_id.in_(
+                select(Response.id).where(Response.survey_id == survey_id)
+            )
+        )
+    )
+    await db.execute(delete(Response).where(Response.survey_id == survey_id))
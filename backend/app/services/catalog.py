@@ -0,0 +1,270 @@
+"""In-memory snapshot of published surveys for the answerer fast path.
+
+Answerers only ever read published surveys, so their listing and survey
+detail requests are served from an immutable snapshot with the JSON already
+serialized (and, for survey details, compressed: the stored survey snapshots
+of ``services/snapshots.py`` are loaded as they are). A snapshot is never modified: changes build a new one which
+replaces the old in a single assignment, so readers never see a partial
+catalog.
+
+Response counts change with every submission, which does not bump the
+generation, so listing entries are stored without ``response_count`` and
+the live counts of a page are merged in when it is served; listings sorted
+by response count are left to the database.
+
+The ``catalog_state`` row holds a generation number that is bumped in the
+same transaction as any change answerers can see (``bump_generation``).
+Each worker polls that one row and rebuilds when its snapshot is behind, and
+the worker that made the change rebuilds right away.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from types import MappingProxyType
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.config import settings
+from app.database import async_session
+from app.models.catalog import CatalogState
+from app.models.snapshot import SurveySnapshot
+from app.models.survey import Survey
+from app.schemas.survey import SurveyListResponse, SurveyResponse, SurveySort
+from app.services.snapshots import SurveyPayload, build_payload, record_snapshot, snapshot_payload
+
+logger = logging.getLogger(__name__)
+
+BUILD_CHUNK_SIZE = 500
+
+# Sorts on the live response counter, which the snapshot does not hold
+LIVE_SORTS = frozenset({SurveySort.RESPONSE_COUNT, SurveySort.RESPONSE_COUNT_DESC})
+
+
+class CatalogSnapshot:
+    """Immutable index of published surveys with their serialized JSON."""
+
+    __slots__ = ("generation", "built_at", "complete", "size_bytes", "_details", "_entries", "_orders")
+
+    def __init__(
+        self,
+        generation: int,
+        details: dict[UUID, SurveyPayload],
+        # Listing JSON without response_count and its closing brace
+        entries: dict[UUID, bytes],
+        orders: dict[SurveySort, tuple[UUID, ...]],
+        complete: bool,
+    ):
+        self.generation = generation
+        self.built_at = time.monotonic()
+        # False when the memory budget was hit and some surveys were left out
+        self.complete = complete
+        self._details = MappingProxyType(details)
+        self._entries = MappingProxyType(entries)
+        self._orders = MappingProxyType(orders)
+        self.size_bytes = (
+            sum(p.size_bytes for p in details.values()) + sum(map(len, entries.values()))
+        )
+
+    def __len__(self) -> int:
+        return len(self._details)
+
+    def survey_payload(self, survey_id: UUID) -> SurveyPayload | None:
+        """Current snapshot of a published survey."""
+        return self._details.get(survey_id)
+
+    def page(self, sort: SurveySort, limit: int, offset: int) -> tuple[tuple[UUID, ...], int] | None:
+        """Survey ids of one page of the published listing and the total, or
+        None for sorts the snapshot cannot serve."""
+        order = self._orders.get(sort)
+        if order is None:
+            return None
+        return order[offset:offset + limit], len(order)
+
+    def page_json(self, page: tuple[UUID, ...], response_counts: dict[UUID, int]) -> bytes:
+        """A page as a JSON array, with the given live response counts."""
+        return b"[" + b",".join(
+            self._entries[i] + b',"response_count":%d}' % response_counts.get(i, 0) for i in page
+        ) + b"]"
+
+
+def _sort_orders(surveys: list[SurveyListResponse]) -> dict[SurveySort, tuple[UUID, ...]]:
+    """Listing orders matching ``SurveyService.list_surveys_page`` (ties by id)."""
+    by_id = sorted(surveys, key=lambda s: s.id)
+    orders = {}
+    for sort in SurveySort:
+        if sort in LIVE_SORTS:
+            continue
+        field = sort.value.lstrip("-")
+        ordered = sorted(
+            by_id, key=lambda s: getattr(s, field), reverse=sort.value.startswith("-")
+        )
+        orders[sort] = tuple(s.id for s in ordered)
+    return orders
+
+
+async def build_snapshot(db: AsyncSession) -> CatalogSnapshot:
+    """Load published surveys, newest first, until the memory budget is used."""
+    generation = await current_generation(db)
+
+    details, entries, listed = {}, {}, []
+    size = 0
+    complete = True
+    offset = 0
+    while complete:
+        result = await db.execute(
+            select(Survey)
+            .options(selectinload(Survey.questions))
+            .where(Survey.is_published == True)
+            .order_by(Survey.created_at.desc(), Survey.id)
+            .limit(BUILD_CHUNK_SIZE)
+            .offset(offset)
+        )
+        surveys = list(result.scalars().all())
+        stored = await _stored_payloads(db, [s.snapshot_hash for s in surveys if s.snapshot_hash])
+        for survey in surveys:
+            detail = stored.get(survey.snapshot_hash)
+            if detail is None:
+                # Published before snapshots were recorded
+                detail = build_payload(
+                    SurveyResponse.model_validate(survey).model_dump_json().encode()
+                )
+            listing = SurveyListResponse.model_validate(survey).model_copy(
+                update={"question_count": len(survey.questions)}
+            )
+            entry = listing.model_dump_json(exclude={"response_count"}).encode()[:-1]
+            size += detail.size_bytes + len(entry)
+            if size > settings.catalog_max_bytes:
+                complete = False
+                break
+            details[survey.id] = detail
+            entries[survey.id] = entry
+            listed.append(listing)
+
+        if len(surveys) < BUILD_CHUNK_SIZE:
+            break
+        offset += BUILD_CHUNK_SIZE
+        db.expunge_all()
+
+    return CatalogSnapshot(generation, details, entries, _sort_orders(listed), complete)
+
+
+async def _stored_payloads(db: AsyncSession, hashes: list[str]) -> dict[str, SurveyPayload]:
+    if not hashes:
+        return {}
+    result = await db.execute(
+        select(SurveySnapshot).where(SurveySnapshot.content_hash.in_(hashes))
+    )
+    payloads = {}
+    for snapshot in result.scalars():
+        payloads[snapshot.content_hash] = snapshot_payload(snapshot)
+        db.expunge(snapshot)
+    return payloads
+
+
+async def current_generation(db: AsyncSession) -> int:
+    state = await db.get(CatalogState, 1)
+    return state.generation if state else 0
+
+
+async def bump_generation(db: AsyncSession, survey_id: UUID | None = None) -> bool:
+    """Mark the catalog stale; call before committing the change itself.
+
+    With ``survey_id`` the catalog is only marked stale if that survey is
+    published, so editing drafts costs no rebuilds, and a published survey's
+    new definition is recorded as its snapshot. Returns whether it was.
+    """
+    statement = update(CatalogState).where(CatalogState.id == 1)
+    if survey_id is not None:
+        statement = statement.where(
+            select(Survey.is_published).where(Survey.id == survey_id).scalar_subquery()
+        )
+    result = await db.execute(
+        statement.values(
+            generation=CatalogState.generation + 1, updated_at=datetime.utcnow()
+        )
+    )
+    if survey_id is not None:
+        await record_snapshot(db, survey_id)
+    return result.rowcount > 0
+
+
+class Catalog:
+    """Holds the current snapshot and keeps it in step with the generation."""
+
+    def __init__(self):
+        self.snapshot: CatalogSnapshot | None = None
+        self._running = False
+        self._lock = asyncio.Lock()
+        self._poller: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if not settings.catalog_enabled:
+            return
+        self._running = True
+        async with async_session() as db:
+            if await db.get(CatalogState, 1) is None:
+                db.add(CatalogState(id=1, generation=0))
+                await db.commit()
+        await self.refresh()
+        self._poller = asyncio.create_task(self._poll(), name="catalog-poller")
+
+    async def stop(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+        self._running = False
+        self.snapshot = None
+
+    def get(self) -> CatalogSnapshot | None:
+        """The current snapshot, or None when the catalog is not running."""
+        return self.snapshot
+
+    async def refresh(self, min_generation: int | None = None) -> None:
+        """Rebuild the snapshot and swap it in.
+
+        With ``min_generation``, skip the rebuild when the current snapshot is
+        already at least that new. A no-op unless the catalog was started
+        (command-line tools never start it).
+        """
+        if not self._running:
+            return
+        async with self._lock:
+            current = self.snapshot
+            if (
+                min_generation is not None
+                and current is not None
+                and current.generation >= min_generation
+            ):
+                return
+            async with async_session() as db:
+                snapshot = await build_snapshot(db)
+            if not snapshot.complete:
+                logger.warning(
+                    "Catalog holds %d published surveys, the rest exceed CATALOG_MAX_BYTES",
+                    len(snapshot),
+                )
+            self.snapshot = snapshot
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(settings.catalog_poll_interval_seconds)
+            try:
+                async with async_session() as db:
+                    generation = await current_generation(db)
+                snapshot = self.snapshot
+                if snapshot is None or generation > snapshot.generation:
+                    await self.refresh(min_generation=generation)
+                elif time.monotonic() - snapshot.built_at > settings.catalog_max_age_seconds:
+                    await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Catalog refresh failed")
+
+
+catalog = Catalog()
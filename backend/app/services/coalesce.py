@@ -0,0 +1,66 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """Coalesce concurrent identical computations, with an optional TTL cache.
+
+    Callers asking for the same key while a computation is in flight await
+    that computation instead of starting their own. With ``ttl_seconds`` set,
+    finished results are also served for that long. The computation runs in
+    its own task, so a caller that disconnects does not cancel it for the
+    others; it must therefore not use the caller's database session.
+    """
+
+    def __init__(self, ttl_seconds: float = 0.0, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._cache: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        # Bumped by invalidate() so in-flight results started earlier are not cached
+        self._generation = 0
+        self.stats = {"computed": 0, "coalesced": 0, "cache_hits": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self._cache.get(key)
+        if cached is not None:
+            expires_at, value = cached
+            if expires_at > time.monotonic():
+                self.stats["cache_hits"] += 1
+                return value
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["computed"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            generation = self._generation
+            task.add_done_callback(lambda t: self._finished(key, t, generation))
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drop a cached key (or everything); in-flight results won't be cached."""
+        self._generation += 1
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def _finished(self, key: Hashable, task: asyncio.Task, generation: int) -> None:
+        self._inflight.pop(key, None)
+        if (
+            self.ttl_seconds <= 0
+            or task.cancelled()
+            or task.exception() is not None
+            or generation != self._generation
+        ):
+            return
+        self._cache[key] = (time.monotonic() + self.ttl_seconds, task.result())
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
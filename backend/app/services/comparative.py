@@ -0,0 +1,214 @@
+"""Comparison of the same questions across many surveys.
+
+A template deployed to hundreds of teams is compared question by question:
+questions match across surveys by template lineage (the root template
+question they were copied from, see ``SurveyService.clone_survey``) or by
+type and text. Rank and true/false answers of every matched question are
+loaded into column arrays in one pass per responses database, one query per
+chunk of surveys for each answer layout, and archived surveys are read from
+their segments' answer columns; nothing is turned into ORM objects or
+answer dicts. ``analytics.build_comparison`` then computes the statistics
+from those columns.
+"""
+import os
+from array import array
+from collections import defaultdict
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.archive import ArchiveSegment
+from app.models.question import Question
+from app.models.response import Answer, Response
+from app.models.survey import Survey
+from app.schemas.question import QuestionType
+from app.schemas.response import ComparisonMatch
+from app.services.answer_codec import decode_scalars
+from app.services.archive_segments import open_segment
+from app.services.survey_service import admin_can_access
+from app.shards import is_sharded, responses_db, shard_of
+from app.tracing import trace_methods
+
+# Survey ids per IN list
+COMPARE_CHUNK_SIZE = 500
+
+COMPARABLE_TYPES = (QuestionType.RANK, QuestionType.TRUE_FALSE)
+
+
+def _chunks(ids: list[UUID]):
+    for start in range(0, len(ids), COMPARE_CHUNK_SIZE):
+        yield ids[start:start + COMPARE_CHUNK_SIZE]
+
+
+def _text_key(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+@trace_methods
+class ComparisonService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def load_columns(
+        self, admin_id: UUID, survey_ids: list[UUID], match: ComparisonMatch
+    ) -> tuple[list[UUID], list[dict]]:
+        """The surveys (deduplicated, in request order) and one group per
+        question matched in at least two of them, with its answer columns,
+        as ``analytics.build_comparison`` takes them.
+
+        Raises ValueError unless the admin can access every survey.
+        """
+        survey_ids = list(dict.fromkeys(survey_ids))
+        archived: set[UUID] = set()
+        found = 0
+        for chunk in _chunks(survey_ids):
+            result = await self.db.execute(
+                select(Survey.id, Survey.archived_at).where(
+                    Survey.id.in_(chunk), admin_can_access(admin_id)
+                )
+            )
+            for survey_id, archived_at in result.all():
+                found += 1
+                if archived_at is not None:
+                    archived.add(survey_id)
+        if found != len(survey_ids):
+            raise ValueError("Survey not found")
+
+        groups, targets, layouts = await self._match_questions(survey_ids, match)
+
+        live = [s for s in survey_ids if s not in archived]
+        by_database: dict[int | None, list[UUID]] = defaultdict(list)
+        for survey_id in live:
+            by_database[shard_of(survey_id) if is_sharded() else None].append(survey_id)
+        for ids in by_database.values():
+            # Any survey of the group picks its database
+            async with responses_db(self.db, ids[0]) as db:
+                for chunk in _chunks(ids):
+                    await self._load_rows(db, chunk, targets)
+                    await self._load_packed(db, chunk, layouts)
+        await self._load_segments([s for s in survey_ids if s in archived], targets)
+        return survey_ids, groups
+
+    async def _match_questions(
+        self, survey_ids: list[UUID], match: ComparisonMatch
+    ) -> tuple[list[dict], dict[UUID, tuple], dict[UUID, list]]:
+        """Groups of matching rank and true/false questions, the (group,
+        survey position) of each matched question id, and each survey's
+        packed answer layout mapped onto those.
+
+        A survey's questions are taken in layout order (``order_index``, then
+        id, as ``SurveyValidator``), so the groups follow the first survey's
+        question order and a survey with two questions of the same key only
+        matches the first.
+        """
+        positions = {survey_id: i for i, survey_id in enumerate(survey_ids)}
+        lineage = func.coalesce(Question.template_question_id, Question.id)
+        questions_by_survey = defaultdict(list)
+        for chunk in _chunks(survey_ids):
+            result = await self.db.execute(
+                select(
+                    Question.id,
+                    Question.survey_id,
+                    Question.type,
+                    Question.text,
+                    Question.order_index,
+                    lineage.label("root_id"),
+                ).where(Question.survey_id.in_(chunk))
+            )
+            for row in result.all():
+                questions_by_survey[row.survey_id].append(row)
+
+        groups: dict[tuple, dict] = {}
+        for survey_id in survey_ids:
+            position = positions[survey_id]
+            questions = questions_by_survey[survey_id]
+            questions.sort(key=lambda q: (q.order_index, str(q.id)))
+            for question in questions:
+                if question.type not in COMPARABLE_TYPES:
+                    continue
+                if match == ComparisonMatch.LINEAGE:
+                    key = (str(question.root_id), question.type)
+                else:
+                    key = (_text_key(question.text), question.type)
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = {
+                        "key": key[0],
+                        "question_text": question.text,
+                        "question_type": question.type,
+                        "question_ids": {},
+                        "surveys": array("I"),
+                        "values": array("i"),
+                    }
+                group["question_ids"].setdefault(position, question.id)
+
+        matched = [g for g in groups.values() if len(g["question_ids"]) > 1]
+        targets = {
+            question_id: (group, position)
+            for group in matched
+            for position, question_id in group["question_ids"].items()
+        }
+        layouts = {
+            survey_id: [targets.get(q.id) for q in questions_by_survey[survey_id]]
+            for survey_id in survey_ids
+        }
+        return matched, targets, layouts
+
+    async def _load_rows(self, db: AsyncSession, survey_ids: list[UUID], targets: dict) -> None:
+        """Answers of responses stored as answer rows."""
+        result = await db.execute(
+            select(Answer.question_id, Answer.rank_value, Answer.bool_value)
+            .join(Response, Answer.response_id == Response.id)
+            .where(
+                Response.survey_id.in_(survey_ids),
+                Response.packed_answers.is_(None),
+                Answer.text_value.is_(None),
+            )
+        )
+        for question_id, rank_value, bool_value in result.all():
+            target = targets.get(question_id)
+            if target is not None:
+                group, position = target
+                group["surveys"].append(position)
+                group["values"].append(rank_value if rank_value is not None else int(bool_value))
+
+    async def _load_packed(
+        self, db: AsyncSession, survey_ids: list[UUID], layouts: dict
+    ) -> None:
+        """Answers of responses stored in the packed layout.
+
+        Surveys may hold both layouts while their storage is converted, so
+        every survey is looked at in both.
+        """
+        result = await db.execute(
+            select(Response.survey_id, Response.packed_answers).where(
+                Response.survey_id.in_(survey_ids),
+                Response.packed_answers.is_not(None),
+            )
+        )
+        for survey_id, packed in result.all():
+            layout = layouts[survey_id]
+            for ordinal, value in decode_scalars(packed):
+                target = layout[ordinal]
+                if target is not None:
+                    group, position = target
+                    group["surveys"].append(position)
+                    group["values"].append(value)
+
+    async def _load_segments(self, survey_ids: list[UUID], targets: dict) -> None:
+        """Answers of archived surveys, from their segments."""
+        by_bytes = {question_id.bytes: target for question_id, target in targets.items()}
+        for chunk in _chunks(survey_ids):
+            result = await self.db.execute(
+                select(ArchiveSegment.path).where(ArchiveSegment.survey_id.in_(chunk))
+            )
+            for path in result.scalars().all():
+                reader = open_segment(os.path.join(settings.archive_dir, path))
+                for question_id, value in reader.scalar_answers():
+                    target = by_bytes.get(question_id)
+                    if target is not None:
+                        group, position = target
+                        group["surveys"].append(position)
+                        group["values"].append(value)
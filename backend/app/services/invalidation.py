@@ -0,0 +1,156 @@
+"""Cache invalidation shared by all worker processes, via the database.
+
+In-process caches (survey definitions, compiled validators, ...) subscribe to
+a channel with a handler dropping one entry, or everything for a None key.
+Services ``publish`` invalidations inside the transaction making the change:
+
+- the row is written to ``cache_invalidations`` with that transaction, so
+  other workers only see it once the change itself is visible;
+- once the session commits, this process's handlers run right away.
+
+Each worker polls the table every ``invalidation_poll_interval_seconds``,
+so caches in other processes drop stale entries within that delay. Command-
+line tools publish the same way and reach the running web workers too.
+"""
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Hashable
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import async_session
+from app.models.invalidation import CacheInvalidation
+
+logger = logging.getLogger(__name__)
+
+# Rows are stamped before their transaction commits; polls look back this far
+# so slow transactions are still picked up
+GRACE_SECONDS = 30
+
+PRUNE_EVERY_POLLS = 300
+
+PENDING_KEY = "pending_invalidations"
+
+# Channels; keys are survey ids
+SURVEY_CHANNEL = "survey"
+# Keys are the ids of admins whose survey access changed
+ACCESS_CHANNEL = "access"
+
+
+class InvalidationBus:
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers: dict[str, list[Callable[[str | None], None]]] = defaultdict(list)
+        self._seen: dict[int, datetime] = {}
+        self._since: datetime | None = None
+        self._poller: asyncio.Task | None = None
+        self.stats = {"published": 0, "received": 0}
+
+    def subscribe(self, channel: str, handler: Callable[[str | None], None]) -> None:
+        """Call ``handler(key)`` for each invalidation on ``channel``."""
+        self._handlers[channel].append(handler)
+
+    async def publish(
+        self, db: AsyncSession, channel: str, key: Hashable | None = None
+    ) -> None:
+        """Invalidate ``key`` on ``channel`` in every worker once ``db`` commits."""
+        key = None if key is None else str(key)
+        await db.execute(
+            insert(CacheInvalidation).values(
+                channel=channel,
+                key=key,
+                origin=self.origin,
+                created_at=datetime.utcnow(),
+            )
+        )
+        db.info.setdefault(PENDING_KEY, []).append((channel, key))
+        self.stats["published"] += 1
+
+    def dispatch(self, channel: str, key: str | None) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(key)
+            except Exception:
+                logger.exception("Invalidation handler for %s failed", channel)
+
+    async def start(self) -> None:
+        self._since = datetime.utcnow()
+        self._seen.clear()
+        self._poller = asyncio.create_task(self._poll(), name="invalidation-poller")
+
+    async def stop(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+
+    async def poll_once(self) -> int:
+        """Apply invalidations published by other processes; returns how many."""
+        now = datetime.utcnow()
+        window_start = self._since - timedelta(seconds=GRACE_SECONDS)
+        async with async_session() as db:
+            result = await db.execute(
+                select(CacheInvalidation.id, CacheInvalidation.channel, CacheInvalidation.key)
+                .where(
+                    CacheInvalidation.created_at >= window_start,
+                    CacheInvalidation.origin != self.origin,
+                )
+                .order_by(CacheInvalidation.id)
+            )
+            rows = result.all()
+
+        applied = 0
+        for row in rows:
+            if row.id in self._seen:
+                continue
+            self._seen[row.id] = now
+            self.dispatch(row.channel, row.key)
+            applied += 1
+        self.stats["received"] += applied
+
+        self._since = now
+        horizon = now - timedelta(seconds=GRACE_SECONDS * 2)
+        self._seen = {i: seen_at for i, seen_at in self._seen.items() if seen_at >= horizon}
+        return applied
+
+    async def prune(self) -> None:
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.invalidation_retention_seconds)
+        async with async_session() as db:
+            await db.execute(
+                delete(CacheInvalidation).where(CacheInvalidation.created_at < cutoff)
+            )
+            await db.commit()
+
+    async def _poll(self) -> None:
+        polls = 0
+        while True:
+            await asyncio.sleep(settings.invalidation_poll_interval_seconds)
+            try:
+                await self.poll_once()
+                polls += 1
+                if polls % PRUNE_EVERY_POLLS == 0:
+                    await self.prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Polling cache invalidations failed")
+
+
+invalidations = InvalidationBus()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session):
+    for channel, key in session.info.pop(PENDING_KEY, ()):
+        invalidations.dispatch(channel, key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,250 @@
+import asyncio
+import json
+import logging
+import os
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from app.config import settings
+from app.database import async_session, read_session
+from app.models.archive import SurveyRollup
+from app.models.job import Job, JobKind
+from app.models.survey import Survey
+from app.services.analytics import build_aggregates, build_crosstab, render_csv
+from app.services.coalesce import SingleFlight
+from app.services.job_service import JobService
+from app.services.purge_service import PurgeService
+from app.services.response_service import ResponseService
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Heartbeats per stale period, so a running job is never requeued as stale
+# however job_stale_after_seconds is configured
+HEARTBEATS_PER_STALE_PERIOD = 3
+
+# Concurrent exports of the same survey version render the CSV once
+export_flight = SingleFlight()
+
+
+def heartbeat_interval() -> float:
+    """Seconds between heartbeats of a running job."""
+    return settings.job_stale_after_seconds / HEARTBEATS_PER_STALE_PERIOD
+
+
+class JobContext:
+    """What a job handler gets: its job row, a session and the runner."""
+
+    def __init__(self, runner: "JobRunner", db, job: Job):
+        self.runner = runner
+        self.db = db
+        self.job = job
+        self.params = json.loads(job.params)
+
+    async def report(self, progress: float) -> None:
+        async with async_session() as db:
+            await JobService(db).heartbeat(self.job.id, progress)
+
+    def result_path(self, extension: str) -> str:
+        os.makedirs(settings.job_results_dir, exist_ok=True)
+        return os.path.join(settings.job_results_dir, f"{self.job.id}.{extension}")
+
+
+async def _job_survey(ctx: JobContext) -> Survey:
+    """The job's survey. Deleting a survey detaches its queued jobs, which
+    then fail here rather than partway through.
+    """
+    survey = None
+    if ctx.job.survey_id is not None:
+        survey = await ctx.db.get(Survey, ctx.job.survey_id)
+    if survey is None:
+        raise ValueError("Survey was deleted")
+    return survey
+
+
+async def run_export(ctx: JobContext) -> str:
+    survey = await _job_survey(ctx)
+
+    async def render():
+        async with read_session() as db:
+            questions, responses = await ResponseService(db).load_survey_data(survey.id)
+        await ctx.report(0.5)
+        return await ctx.runner.run_cpu(render_csv, questions, responses)
+
+    key = (survey.id, survey.response_count, survey.archived_at)
+    content = await export_flight.do(key, render)
+    path = ctx.result_path("csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+
+async def run_aggregate_rebuild(ctx: JobContext) -> str:
+    survey = await _job_survey(ctx)
+    survey_id = survey.id
+    async with read_session() as db:
+        questions, responses = await ResponseService(db).load_survey_data(survey_id)
+    await ctx.report(0.5)
+    aggregates = await ctx.runner.run_cpu(build_aggregates, survey_id, questions, responses)
+    payload = aggregates.model_dump_json()
+
+    # Archived surveys serve aggregates from their rollup, so refresh it
+    # (read again: it may have been archived or deleted meanwhile)
+    survey = await ctx.db.get(Survey, survey_id, populate_existing=True)
+    if survey is not None and survey.archived_at is not None:
+        rollup = await ctx.db.get(SurveyRollup, survey_id)
+        if rollup is None:
+            ctx.db.add(SurveyRollup(survey_id=survey_id, payload=payload))
+        else:
+            rollup.payload = payload
+        await ctx.db.commit()
+
+    path = ctx.result_path("json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(payload)
+    return path
+
+
+async def run_crosstab(ctx: JobContext) -> str:
+    survey = await _job_survey(ctx)
+    async with read_session() as db:
+        _, responses = await ResponseService(db).load_survey_data(survey.id)
+    await ctx.report(0.5)
+    table = await ctx.runner.run_cpu(
+        build_crosstab,
+        UUID(ctx.params["question_a"]),
+        UUID(ctx.params["question_b"]),
+        responses,
+    )
+    path = ctx.result_path("json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(table, f, default=str)
+    return path
+
+
+async def run_survey_delete(ctx: JobContext) -> str:
+    survey = await _job_survey(ctx)
+    survey_id = survey.id
+    total = max(survey.response_count, 1)
+
+    async def progress(deleted: int) -> None:
+        await ctx.report(min(deleted / total, 0.99))
+
+    deleted = await PurgeService(ctx.db).delete_survey(survey_id, progress=progress)
+    path = ctx.result_path("json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"survey_id": survey_id, "deleted_responses": deleted}, f, default=str)
+    return path
+
+
+HANDLERS = {
+    JobKind.EXPORT: run_export,
+    JobKind.AGGREGATE_REBUILD: run_aggregate_rebuild,
+    JobKind.CROSSTAB: run_crosstab,
+    JobKind.SURVEY_DELETE: run_survey_delete,
+}
+
+
+class JobRunner:
+    """In-process job workers started from the app lifespan.
+
+    A fixed number of asyncio workers claim queued jobs from the jobs table,
+    so at most ``settings.job_workers`` jobs run per process and interactive
+    requests keep the rest of the connection pool. CPU-heavy steps go to a
+    process pool. Jobs left running by a dead worker are requeued once their
+    heartbeat goes stale.
+    """
+
+    def __init__(self):
+        self._workers: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._pool: "ProcessPoolExecutor | None" = None
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(settings.job_workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def notify(self) -> None:
+        """Wake idle workers after a job was submitted."""
+        self._wakeup.set()
+
+    async def run_cpu(self, fn, *args):
+        """Run a pure function in the process pool."""
+        if self._pool is None:
+            # Imported on first use: most workers never run a CPU job
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Spawned workers do not inherit the event loop or database threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.job_process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                async with async_session() as db:
+                    service = JobService(db)
+                    await service.requeue_stale()
+                    job_id = await service.claim_next()
+                if job_id is not None:
+                    await self._run(job_id)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job worker iteration failed")
+
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=settings.job_poll_interval_seconds
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _run(self, job_id: UUID) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            async with async_session() as db:
+                job = await db.get(Job, job_id)
+                ctx = JobContext(self, db, job)
+                result_path = await HANDLERS[job.kind](ctx)
+            error = None
+        except asyncio.CancelledError:
+            # Shutting down: leave the job running so it is requeued as stale
+            heartbeat.cancel()
+            raise
+        except Exception as e:
+            logger.exception("Job %s failed", job_id)
+            result_path, error = None, str(e) or e.__class__.__name__
+        finally:
+            heartbeat.cancel()
+
+        async with async_session() as db:
+            await JobService(db).finish(job_id, result_path=result_path, error=error)
+
+    async def _heartbeat(self, job_id: UUID) -> None:
+        while True:
+            await asyncio.sleep(heartbeat_interval())
+            async with async_session() as db:
+                await JobService(db).heartbeat(job_id)
+
+
+job_runner = JobRunner()
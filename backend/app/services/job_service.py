@@ -0,0 +1,108 @@
+import json
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.job import Job, JobKind, JobStatus
+from app.tracing import trace_methods
+
+
+@trace_methods
+class JobService:
+    """Persistence for background jobs; the runner claims and updates rows here."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_job(
+        self,
+        owner_id: UUID,
+        survey_id: UUID | None,
+        kind: JobKind,
+        params: dict,
+    ) -> Job:
+        active = await self.db.execute(
+            select(func.count(Job.id)).where(
+                Job.owner_id == owner_id,
+                Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]),
+            )
+        )
+        if active.scalar_one() >= settings.job_max_active_per_user:
+            raise ValueError("Too many active jobs, try again once some have finished")
+
+        job = Job(
+            owner_id=owner_id,
+            survey_id=survey_id,
+            kind=kind,
+            params=json.dumps(params, default=str),
+            status=JobStatus.QUEUED,
+        )
+        self.db.add(job)
+        await self.db.commit()
+        await self.db.refresh(job)
+        return job
+
+    async def get_job(self, job_id: UUID) -> Job | None:
+        return await self.db.get(Job, job_id)
+
+    async def claim_next(self) -> UUID | None:
+        """Atomically move the oldest queued job to running and return its id.
+
+        The conditional UPDATE makes claiming safe across worker processes.
+        """
+        while True:
+            result = await self.db.execute(
+                select(Job.id)
+                .where(Job.status == JobStatus.QUEUED)
+                .order_by(Job.created_at)
+                .limit(1)
+            )
+            job_id = result.scalar_one_or_none()
+            if job_id is None:
+                await self.db.commit()
+                return None
+
+            now = datetime.utcnow()
+            claimed = await self.db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+                .values(status=JobStatus.RUNNING, started_at=now, heartbeat_at=now)
+            )
+            await self.db.commit()
+            if claimed.rowcount == 1:
+                return job_id
+
+    async def requeue_stale(self) -> int:
+        """Return running jobs whose worker stopped heartbeating to the queue."""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.job_stale_after_seconds)
+        result = await self.db.execute(
+            update(Job)
+            .where(Job.status == JobStatus.RUNNING, Job.heartbeat_at < cutoff)
+            .values(status=JobStatus.QUEUED, progress=0.0)
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def heartbeat(self, job_id: UUID, progress: float | None = None) -> None:
+        values = {"heartbeat_at": datetime.utcnow()}
+        if progress is not None:
+            values["progress"] = progress
+        await self.db.execute(update(Job).where(Job.id == job_id).values(**values))
+        await self.db.commit()
+
+    async def finish(
+        self, job_id: UUID, result_path: str | None = None, error: str | None = None
+    ) -> None:
+        values = {
+            "status": JobStatus.FAILED if error else JobStatus.SUCCEEDED,
+            "finished_at": datetime.utcnow(),
+            "result_path": result_path,
+            "error": error,
+        }
+        if not error:
+            values["progress"] = 1.0
+        await self.db.execute(update(Job).where(Job.id == job_id).values(**values))
+        await self.db.commit()
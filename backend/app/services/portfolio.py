@@ -0,0 +1,144 @@
+"""Per-survey summary stats for everything an admin can access.
+
+The landing page needs, for each survey, its response count, last
+submission and a daily trend. Counts and last submission times are the
+maintained ``Survey.response_count`` and ``Survey.last_response_at``, so
+only the trend touches responses: one grouped query per chunk of surveys
+that received responses inside the trend window, answered from
+``ix_responses_survey_submitted``.
+
+Portfolios are cached per admin under a version derived from the admin's
+surveys (how many, their response counts, publish/close/archive state), so
+any change that would alter the portfolio starts a fresh computation, in
+every worker; access grants also invalidate cached portfolios explicitly.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import read_session
+from app.models.response import Response
+from app.models.survey import Survey
+from app.schemas.survey import PortfolioResponse, SurveySummary
+from app.services.coalesce import SingleFlight
+from app.services.invalidation import invalidations, ACCESS_CHANNEL
+from app.services.survey_service import admin_can_access
+from app.shards import is_sharded, responses_db, shard_of
+from app.tracing import trace_methods
+
+# Survey ids per trend query
+TREND_CHUNK_SIZE = 500
+
+portfolio_flight = SingleFlight(ttl_seconds=settings.portfolio_cache_ttl_seconds)
+
+# Entries are keyed by version, not admin alone, so an access change drops them all
+invalidations.subscribe(ACCESS_CHANNEL, lambda key: portfolio_flight.invalidate())
+
+
+@trace_methods
+class PortfolioService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def version(self, admin_id: UUID) -> tuple:
+        """Fingerprint of everything the admin's portfolio is computed from."""
+        result = await self.db.execute(
+            select(
+                func.count(Survey.id),
+                func.coalesce(func.sum(Survey.response_count), 0),
+                func.max(Survey.last_response_at),
+                func.coalesce(func.sum(case((Survey.is_published == True, 1), else_=0)), 0),
+                func.count(Survey.closed_at),
+                func.count(Survey.archived_at),
+            ).where(admin_can_access(admin_id))
+        )
+        return tuple(result.one())
+
+    async def build(self, admin_id: UUID, today: date) -> PortfolioResponse:
+        days = settings.portfolio_trend_days
+        trend_start = today - timedelta(days=days - 1)
+        window_start = datetime.combine(trend_start, datetime.min.time())
+
+        result = await self.db.execute(
+            select(
+                Survey.id,
+                Survey.owner_id,
+                Survey.title,
+                Survey.is_published,
+                Survey.created_at,
+                Survey.closed_at,
+                Survey.archived_at,
+                Survey.response_count,
+                Survey.last_response_at,
+            )
+            .where(admin_can_access(admin_id))
+            .order_by(Survey.created_at.desc(), Survey.id)
+        )
+        surveys = result.all()
+
+        active = [
+            s.id for s in surveys
+            if s.last_response_at is not None and s.last_response_at >= window_start
+        ]
+        trends = await self._daily_counts(active, window_start, trend_start, days)
+
+        return PortfolioResponse(
+            trend_start=trend_start,
+            total_responses=sum(s.response_count for s in surveys),
+            surveys=[
+                SurveySummary(
+                    **s._mapping,
+                    daily_responses=trends.get(s.id) or [0] * days,
+                )
+                for s in surveys
+            ],
+        )
+
+    async def _daily_counts(
+        self,
+        survey_ids: list[UUID],
+        window_start: datetime,
+        trend_start: date,
+        days: int,
+    ) -> dict[UUID, list[int]]:
+        """Responses per day since ``window_start`` for each survey."""
+        groups: dict[int | None, list[UUID]] = defaultdict(list)
+        for survey_id in survey_ids:
+            groups[shard_of(survey_id) if is_sharded() else None].append(survey_id)
+
+        day = func.date(Response.submitted_at)
+        trends: dict[UUID, list[int]] = {}
+        for ids in groups.values():
+            # Any survey of the group picks its database
+            async with responses_db(self.db, ids[0]) as db:
+                for start in range(0, len(ids), TREND_CHUNK_SIZE):
+                    result = await db.execute(
+                        select(Response.survey_id, day, func.count())
+                        .where(
+                            Response.survey_id.in_(ids[start:start + TREND_CHUNK_SIZE]),
+                            Response.submitted_at >= window_start,
+                        )
+                        .group_by(Response.survey_id, day)
+                    )
+                    for survey_id, submitted_on, count in result.all():
+                        if not isinstance(submitted_on, date):
+                            submitted_on = date.fromisoformat(submitted_on)
+                        offset = (submitted_on - trend_start).days
+                        if 0 <= offset < days:
+                            trends.setdefault(survey_id, [0] * days)[offset] += count
+        return trends
+
+
+async def get_portfolio_coalesced(admin_id: UUID, version: tuple) -> PortfolioResponse:
+    """An admin's portfolio, cached until ``version`` or the day changes."""
+    today = datetime.utcnow().date()
+
+    async def compute():
+        async with read_session() as db:
+            return await PortfolioService(db).build(admin_id, today)
+
+    return await portfolio_flight.do((admin_id, version, today), compute)
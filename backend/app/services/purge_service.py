@@ -0,0 +1,363 @@
+"""Survey deletion and response purging with set-based deletes.
+
+The ORM relationships cascade with ``delete-orphan``, so deleting through the
+session would load every question, response and answer first. Nothing here
+loads the rows it deletes: responses go in chunks of ``DELETE ... WHERE id IN
+(...)`` (answers first, by ``response_id``), each chunk in its own short
+transaction, so purging millions of answers keeps memory flat and never holds
+the write lock for long. ``progress`` is awaited after every chunk with the
+number of responses deleted so far.
+
+Archived responses are purged by rewriting the affected segment files without
+them (segments are never modified in place) and rebuilding the survey's
+rollup.
+"""
+import os
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from sqlalchemy import and_, bindparam, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.archive import ArchiveSegment, SurveyRollup
+from app.models.job import Job
+from app.models.question import Question
+from app.models.response import Answer, Response
+from app.models.snapshot import SurveySnapshot
+from app.models.survey import Survey, SurveyAccess
+from app.services.analytics import build_aggregates
+from app.services.archive_segments import SegmentReader, close_segment, open_segment, write_segment
+from app.services.catalog import catalog, bump_generation
+from app.services.invalidation import invalidations, SURVEY_CHANNEL
+from app.services.response_service import ResponseService
+from app.shards import is_sharded, responses_db, shard_sessions
+from app.tracing import trace_methods
+
+# Responses per DELETE; keeps IN lists well under bind parameter limits
+DEFAULT_CHUNK_SIZE = 1000
+
+Progress = Callable[[int], Awaitable[None]] | None
+
+
+async def _delete_chunk(db: AsyncSession, condition, chunk_size: int) -> list:
+    """Delete up to ``chunk_size`` matching responses and their answers.
+
+    Returns the (id, survey_id) rows deleted; the caller commits.
+    """
+    result = await db.execute(
+        select(Response.id, Response.survey_id).where(condition).limit(chunk_size)
+    )
+    rows = result.all()
+    if rows:
+        ids = [row.id for row in rows]
+        await db.execute(
+            delete(Answer)
+            .where(Answer.response_id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            delete(Response)
+            .where(Response.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+    return rows
+
+
+@trace_methods
+class PurgeService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def delete_survey(
+        self,
+        survey_id: UUID,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Progress = None,
+    ) -> int:
+        """Delete a survey with its questions, responses, access grants and
+        archive; returns the number of deleted responses.
+
+        The survey is closed first so no submissions arrive while its
+        responses are deleted chunk by chunk; the survey row and everything
+        else referencing it then go in one short transaction. Copies of the
+        survey are re-rooted on the oldest copy so they keep a common template.
+        """
+        survey = await self.db.get(Survey, survey_id)
+        if survey is None:
+            raise ValueError("Survey not found")
+        if survey.closed_at is None:
+            survey.closed_at = datetime.utcnow()
+            stale = await bump_generation(self.db, survey_id)
+            await invalidations.publish(self.db, SURVEY_CHANNEL, survey_id)
+            await self.db.commit()
+            if stale:
+                await catalog.refresh()
+
+        deleted = 0
+        condition = Response.survey_id == survey_id
+        async with responses_db(self.db, survey_id) as db:
+            while rows := await _delete_chunk(db, condition, chunk_size):
+                await db.commit()
+                deleted += len(rows)
+                if progress:
+                    await progress(deleted)
+
+        result = await self.db.execute(
+            select(ArchiveSegment.path).where(ArchiveSegment.survey_id == survey_id)
+        )
+        segment_paths = [os.path.join(settings.archive_dir, p) for p in result.scalars()]
+
+        if not is_sharded():
+            # Submissions that passed their checks before the survey closed
+            while rows := await _delete_chunk(self.db, condition, chunk_size):
+                deleted += len(rows)
+        await self._reroot_copies(survey_id)
+        await self.db.execute(
+            update(Job).where(Job.survey_id == survey_id).values(survey_id=None)
+        )
+        stale = await bump_generation(self.db, survey_id)
+        for model in (SurveyAccess, ArchiveSegment, SurveyRollup, SurveySnapshot, Question):
+            await self.db.execute(
+                delete(model)
+                .where(model.survey_id == survey_id)
+                .execution_options(synchronize_session=False)
+            )
+        await self.db.execute(
+            delete(Survey)
+            .where(Survey.id == survey_id)
+            .execution_options(synchronize_session=False)
+        )
+        await invalidations.publish(self.db, SURVEY_CHANNEL, survey_id)
+        await self.db.commit()
+        self.db.expunge_all()
+
+        if is_sharded():
+            async with responses_db(self.db, survey_id) as db:
+                while rows := await _delete_chunk(db, condition, chunk_size):
+                    await db.commit()
+                    deleted += len(rows)
+        for path in segment_paths:
+            close_segment(path)
+            if os.path.exists(path):
+                os.remove(path)
+        if stale:
+            await catalog.refresh()
+        if progress:
+            await progress(deleted)
+        return deleted
+
+    async def purge_user_responses(
+        self,
+        answerer_id: UUID,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Progress = None,
+    ) -> int:
+        """Delete every response of one answerer, archived ones included.
+
+        Returns the number of deleted responses.
+        """
+        deleted = await self._purge_live(
+            [Response.answerer_id == answerer_id], chunk_size, progress
+        )
+        result = await self.db.execute(
+            select(Survey.id).where(Survey.archived_at.is_not(None))
+        )
+        for survey_id in result.scalars().all():
+            deleted += await self._purge_archived(
+                survey_id, lambda reader: reader.positions(answerer_id=answerer_id)
+            )
+            if progress:
+                await progress(deleted)
+        return deleted
+
+    async def purge_responses_before(
+        self,
+        cutoff: datetime,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Progress = None,
+    ) -> int:
+        """Delete every response submitted before ``cutoff``, archived ones
+        included. Returns the number of deleted responses.
+
+        Responses are deleted survey by survey so each chunk is found through
+        ``ix_responses_survey_submitted``; only surveys created before the
+        cutoff can hold such responses.
+        """
+        result = await self.db.execute(
+            select(Survey.id, Survey.archived_at).where(Survey.created_at < cutoff)
+        )
+        surveys = result.all()
+
+        deleted = 0
+        for survey_id, archived_at in surveys:
+            if archived_at is None:
+                deleted += await self._purge_live(
+                    [Response.survey_id == survey_id, Response.submitted_at < cutoff],
+                    chunk_size,
+                    progress,
+                    deleted,
+                    survey_id=survey_id,
+                )
+            else:
+                deleted += await self._purge_archived(
+                    survey_id, lambda reader: reader.positions(submitted_before=cutoff)
+                )
+                if progress:
+                    await progress(deleted)
+        return deleted
+
+    async def _purge_live(
+        self,
+        conditions: list,
+        chunk_size: int,
+        progress: Progress,
+        done: int = 0,
+        survey_id: UUID | None = None,
+    ) -> int:
+        """Delete matching responses from the survey's responses database, or
+        from every one without ``survey_id``; keeps response counts in step.
+
+        Unsharded, each chunk and its counter updates commit together.
+        """
+        if survey_id is not None or not is_sharded():
+            databases = [lambda: responses_db(self.db, survey_id)]
+        else:
+            databases = shard_sessions
+
+        deleted = 0
+        condition = and_(*conditions)
+        for open_db in databases:
+            async with open_db() as db:
+                while rows := await _delete_chunk(db, condition, chunk_size):
+                    if db is not self.db:
+                        await db.commit()
+                    await self._decrement_counts(Counter(row.survey_id for row in rows))
+                    await self.db.commit()
+                    deleted += len(rows)
+                    if progress:
+                        await progress(done + deleted)
+        return deleted
+
+    async def _decrement_counts(self, removed: Counter) -> None:
+        surveys = Survey.__table__
+        await self.db.execute(
+            update(surveys)
+            .where(surveys.c.id == bindparam("survey_id"))
+            .values(response_count=surveys.c.response_count - bindparam("removed")),
+            [{"survey_id": k, "removed": n} for k, n in removed.items()],
+        )
+
+    async def _purge_archived(
+        self, survey_id: UUID, match: Callable[[SegmentReader], list[int]]
+    ) -> int:
+        """Rewrite an archived survey's segments without the ``match``ed
+        responses and rebuild its rollup; returns the number removed.
+
+        Replacement segments keep their row (and so their order); the files
+        they replace are removed once the new paths are committed.
+        """
+        result = await self.db.execute(
+            select(ArchiveSegment)
+            .where(ArchiveSegment.survey_id == survey_id)
+            .order_by(ArchiveSegment.created_at)
+        )
+        removed = 0
+        replaced: list[str] = []
+        written: list[str] = []
+        try:
+            for segment in result.scalars().all():
+                path = os.path.join(settings.archive_dir, segment.path)
+                reader = open_segment(path)
+                drop = set(match(reader))
+                if not drop:
+                    continue
+                kept = reader.responses(
+                    [p for p in range(reader.response_count) if p not in drop]
+                )
+                if kept:
+                    name = f"{survey_id}-{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}.seg"
+                    written.append(os.path.join(settings.archive_dir, name))
+                    segment.size_bytes = write_segment(written[-1], survey_id, kept)
+                    segment.path = name
+                    segment.response_count = len(kept)
+                else:
+                    await self.db.delete(segment)
+                replaced.append(path)
+                removed += len(drop)
+            if not removed:
+                return 0
+            await self._decrement_counts(Counter({survey_id: removed}))
+            await invalidations.publish(self.db, SURVEY_CHANNEL, survey_id)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            for path in written:
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+
+        for path in replaced:
+            close_segment(path)
+            os.remove(path)
+
+        self.db.expunge_all()
+        questions, responses = await ResponseService(self.db).load_survey_data(survey_id)
+        aggregates = build_aggregates(survey_id, questions, responses)
+        await self.db.execute(
+            update(SurveyRollup)
+            .where(SurveyRollup.survey_id == survey_id)
+            .values(payload=aggregates.model_dump_json(), created_at=datetime.utcnow())
+        )
+        await self.db.commit()
+        return removed
+
+    async def _reroot_copies(self, survey_id: UUID) -> None:
+        """Make the oldest copy of a template the root of the other copies,
+        mapping their questions' ``template_question_id`` onto its questions."""
+        result = await self.db.execute(
+            select(Survey.id)
+            .where(Survey.template_id == survey_id)
+            .order_by(Survey.created_at, Survey.id)
+            .limit(1)
+        )
+        new_root = result.scalar_one_or_none()
+        if new_root is None:
+            return
+
+        result = await self.db.execute(
+            select(Question.template_question_id, Question.id).where(
+                Question.survey_id == new_root,
+                Question.template_question_id.is_not(None),
+            )
+        )
+        mapping = result.all()
+        if mapping:
+            questions = Question.__table__
+            await self.db.execute(
+                update(questions)
+                .where(questions.c.template_question_id == bindparam("old"))
+                .values(template_question_id=bindparam("new")),
+                [{"old": old, "new": new} for old, new in mapping],
+            )
+        await self.db.execute(
+            update(Question)
+            .where(Question.survey_id == new_root)
+            .values(template_question_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(
+            update(Survey)
+            .where(Survey.template_id == survey_id)
+            .values(template_id=new_root)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(
+            update(Survey)
+            .where(Survey.id == new_root)
+            .values(template_id=None)
+            .execution_options(synchronize_session=False)
+        )
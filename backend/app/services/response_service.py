@@ -1,15 +1,168 @@
+import asyncio
+import logging
+import os
+import uuid
+from collections import Counter
 from uuid import UUID
-from collections import defaultdict
+from datetime import datetime
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, insert, update, delete, bindparam, case
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models.response import Response, Answer
-from app.models.question import Question, QuestionType
-from app.schemas.response import QuestionAggregate, AggregateResponse
+from app.config import settings
+from app.database import async_session, read_session
+from app.models.archive import ArchiveSegment, SurveyRollup
+from app.models.response import Response, Answer, ResponseSeq
+from app.models.question import Question
+from app.models.survey import Survey, AnswerStorage
+from app.schemas.response import AggregateResponse
+from app.services.analytics import build_aggregates, answer_value
+from app.services.answer_codec import encode_answers, decode_answers
+from app.services.archive_segments import SegmentReader, open_segment
+from app.services.catalog import catalog, bump_generation
+from app.services.coalesce import SingleFlight
+from app.services.invalidation import invalidations, SURVEY_CHANNEL
+from app.services.survey_service import admin_can_access
+from app.shards import is_sharded, responses_db, shard_sessions
+from app.services.answer_validator import (
+    SurveyValidator,
+    get_cached_validator,
+    get_survey_validator,
+)
+from app.tracing import trace_methods
 
+logger = logging.getLogger(__name__)
 
+# Identical aggregate requests share one computation (see get_aggregates_coalesced)
+aggregate_flight = SingleFlight(ttl_seconds=settings.read_cache_ttl_seconds)
+# With shards, coalescing only: see get_aggregates_coalesced
+sharded_aggregate_flight = SingleFlight()
+
+
+async def claim_response_seq(db: AsyncSession) -> int:
+    """Take the next change feed seq; call inside the inserting transaction.
+
+    Seqs come from the ``response_seq`` counter row rather than from the
+    highest stored seq, so archiving or purging the newest responses never
+    lets their seqs be handed out again below a feed reader's cursor. The
+    counter row stays locked until the transaction ends, so responses become
+    visible in seq order, which a database sequence (numbers handed out
+    before commit) would not guarantee. With sharded storage each shard
+    numbers its own responses, which is why only per-survey feeds are
+    available then.
+    """
+    result = await db.execute(
+        update(ResponseSeq)
+        .where(ResponseSeq.id == 1)
+        .values(value=ResponseSeq.value + 1)
+        .returning(ResponseSeq.value)
+    )
+    seq = result.scalar_one_or_none()
+    if seq is not None:
+        return seq
+
+    # First submission to this database: continue after any existing seqs
+    result = await db.execute(select(func.coalesce(func.max(Response.seq), 0) + 1))
+    seq = result.scalar_one()
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(ResponseSeq).values(id=1, value=seq))
+        return seq
+    except IntegrityError:
+        # A concurrent first submission created the row; take the next value
+        return await claim_response_seq(db)
+
+
+class ResponseCounts:
+    """Survey response counters for sharded submissions, written in batches.
+
+    Bumping ``Survey.response_count`` (and ``last_response_at``) with every submission would send each
+    one through the main database's writer again, so sharded submissions
+    count here and the totals are added in one transaction every
+    ``response_count_flush_seconds``. Counters may lag by that interval, and
+    a worker killed without shutting down loses its unflushed counts.
+    """
+
+    def __init__(self):
+        self._pending: Counter[UUID] = Counter()
+        self._latest: dict[UUID, datetime] = {}
+        self._flusher: asyncio.Task | None = None
+
+    def add(self, survey_id: UUID, submitted_at: datetime) -> None:
+        self._pending[survey_id] += 1
+        self._note_latest(survey_id, submitted_at)
+
+    def _note_latest(self, survey_id: UUID, submitted_at: datetime) -> None:
+        latest = self._latest.get(survey_id)
+        if latest is None or submitted_at > latest:
+            self._latest[survey_id] = submitted_at
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, Counter()
+        latest, self._latest = self._latest, {}
+        surveys = Survey.__table__
+        # Other workers flush too, so never move last_response_at backwards
+        last_response_at = case(
+            (
+                surveys.c.last_response_at.is_(None)
+                | (surveys.c.last_response_at < bindparam("latest")),
+                bindparam("latest"),
+            ),
+            else_=surveys.c.last_response_at,
+        )
+        try:
+            async with async_session() as db:
+                await db.execute(
+                    update(surveys)
+                    .where(surveys.c.id == bindparam("survey_id"))
+                    .values(
+                        response_count=surveys.c.response_count + bindparam("added"),
+                        last_response_at=last_response_at,
+                    ),
+                    [
+                        {"survey_id": k, "added": n, "latest": latest[k]}
+                        for k, n in pending.items()
+                    ],
+                )
+                await db.commit()
+        except Exception:
+            # Keep the counts for the next flush
+            self._pending.update(pending)
+            for survey_id, submitted_at in latest.items():
+                self._note_latest(survey_id, submitted_at)
+            raise
+
+    async def start(self) -> None:
+        if is_sharded():
+            self._flusher = asyncio.create_task(self._run(), name="response-count-flusher")
+
+    async def stop(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.response_count_flush_seconds)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Flushing response counts failed")
+
+
+response_counts = ResponseCounts()
+
+
+@trace_methods
 class ResponseService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -19,122 +172,571 @@ class ResponseService:
         survey_id: UUID,
         answerer_id: UUID,
         answers: list[dict],
+        layout: SurveyValidator | None = None,
     ) -> Response:
-        response = Response(survey_id=survey_id, answerer_id=answerer_id)
-        self.db.add(response)
-        await self.db.flush()
-
-        for answer_data in answers:
-            answer = Answer(
-                response_id=response.id,
-                question_id=answer_data["question_id"],
-                text_value=answer_data.get("text_value"),
-                bool_value=answer_data.get("bool_value"),
-                rank_value=answer_data.get("rank_value"),
+        """Insert a response and its answers in a single transaction.
+
+        Ids are generated up front so the answers can be written with one
+        multi-row INSERT, and the returned response is built from the written
+        values instead of being re-selected. When the survey's ``layout`` is
+        given the answers are packed into the response row instead.
+
+        With sharded storage the response goes to the survey's shard and the
+        survey's response counter is bumped through ``response_counts``, so
+        submissions do not write to the main database at all.
+        """
+        response_id = uuid.uuid4()
+        submitted_at = datetime.utcnow()
+        answer_rows = [
+            {
+                "id": (
+                    uuid.uuid5(response_id, str(answer_data["question_id"]))
+                    if layout else uuid.uuid4()
+                ),
+                "response_id": response_id,
+                "question_id": answer_data["question_id"],
+                "text_value": answer_data.get("text_value"),
+                "bool_value": answer_data.get("bool_value"),
+                "rank_value": answer_data.get("rank_value"),
+            }
+            for answer_data in answers
+        ]
+
+        packed_answers = encode_answers(answers, layout.ordinals) if layout else None
+
+        async with responses_db(self.db, survey_id) as db:
+            await self._insert_response(
+                db, survey_id, answerer_id, response_id, submitted_at, answer_rows, packed_answers
             )
-            self.db.add(answer)
+        if db is not self.db:
+            response_counts.add(survey_id, submitted_at)
 
-        await self.db.commit()
-        await self.db.refresh(response)
+        return Response(
+            id=response_id,
+            survey_id=survey_id,
+            answerer_id=answerer_id,
+            submitted_at=submitted_at,
+            answers=[Answer(**row) for row in answer_rows],
+        )
 
-        # Reload with answers
-        result = await self.db.execute(
+    async def _insert_response(
+        self,
+        db: AsyncSession,
+        survey_id: UUID,
+        answerer_id: UUID,
+        response_id: UUID,
+        submitted_at: datetime,
+        answer_rows: list[dict],
+        packed_answers: bytes | None,
+    ) -> None:
+        try:
+            seq = await claim_response_seq(db)
+            await db.execute(
+                insert(Response).values(
+                    id=response_id,
+                    survey_id=survey_id,
+                    answerer_id=answerer_id,
+                    submitted_at=submitted_at,
+                    seq=seq,
+                    packed_answers=packed_answers,
+                )
+            )
+            if answer_rows and packed_answers is None:
+                await db.execute(insert(Answer).values(answer_rows))
+            if db is self.db:
+                await db.execute(
+                    update(Survey)
+                    .where(Survey.id == survey_id)
+                    .values(
+                        response_count=Survey.response_count + 1,
+                        last_response_at=submitted_at,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            # Only the one-response-per-user index is the client's conflict;
+            # anything else (e.g. a question deleted meanwhile) is an error
+            existing = await db.execute(
+                select(Response.id).where(
+                    Response.survey_id == survey_id,
+                    Response.answerer_id == answerer_id,
+                )
+            )
+            if existing.first() is not None:
+                raise ValueError("You have already submitted a response to this survey")
+            raise
+
+    async def get_response_by_id(
+        self, response_id: UUID, survey_id: UUID | None = None
+    ) -> Response | None:
+        """Fetch a response; with ``survey_id`` archived responses are found too.
+
+        Without ``survey_id`` every shard is searched when storage is sharded.
+        """
+        query = (
             select(Response)
             .options(selectinload(Response.answers))
-            .where(Response.id == response.id)
+            .where(Response.id == response_id)
         )
-        return result.scalar_one()
+        if survey_id is not None:
+            async with responses_db(self.db, survey_id) as db:
+                response = (await db.execute(query)).scalar_one_or_none()
+        elif is_sharded():
+            response = None
+            for shard_session in shard_sessions:
+                async with shard_session() as db:
+                    response = (await db.execute(query)).scalar_one_or_none()
+                if response:
+                    break
+        else:
+            response = (await self.db.execute(query)).scalar_one_or_none()
+        if response:
+            await self.unpack_answers([response])
+            return response
+
+        if survey_id is not None:
+            for segment in await self._archive_segments(survey_id):
+                position = segment.find(response_id)
+                if position is not None:
+                    return _response_from_archive(segment.responses([position])[0])
+        return None
+
+    async def get_responses_for_admin(
+        self, response_ids: list[UUID], admin_id: UUID
+    ) -> dict[UUID, tuple[Response, bool]]:
+        """Load responses with answers and the admin's access to each.
+
+        Access (owner or shared) is checked for all ids in the same query that
+        loads the responses. Responses already moved to the archive are not
+        found here; fetch them per survey instead.
+        """
+        if is_sharded():
+            return await self._get_sharded_responses_for_admin(response_ids, admin_id)
 
-    async def get_response_by_id(self, response_id: UUID) -> Response | None:
         result = await self.db.execute(
-            select(Response)
+            select(Response, admin_can_access(admin_id).label("allowed"))
+            .join(Survey, Survey.id == Response.survey_id)
             .options(selectinload(Response.answers))
-            .where(Response.id == response_id)
+            .where(Response.id.in_(response_ids))
         )
-        return result.scalar_one_or_none()
+        rows = result.all()
+        await self.unpack_answers([response for response, ok in rows if ok])
+        return {response.id: (response, bool(ok)) for response, ok in rows}
+
+    async def _get_sharded_responses_for_admin(
+        self, response_ids: list[UUID], admin_id: UUID
+    ) -> dict[UUID, tuple[Response, bool]]:
+        """``get_responses_for_admin`` across shards: look up every shard, then
+        check access for the surveys found in one query on the main database."""
+        responses = []
+        for shard_session in shard_sessions:
+            async with shard_session() as db:
+                result = await db.execute(
+                    select(Response)
+                    .options(selectinload(Response.answers))
+                    .where(Response.id.in_(response_ids))
+                )
+                responses += result.scalars().all()
+        if not responses:
+            return {}
 
-    async def list_responses_for_survey(self, survey_id: UUID) -> list[Response]:
         result = await self.db.execute(
-            select(Response)
-            .options(selectinload(Response.answers))
-            .where(Response.survey_id == survey_id)
-            .order_by(Response.submitted_at.desc())
+            select(Survey.id, admin_can_access(admin_id)).where(
+                Survey.id.in_({r.survey_id for r in responses})
+            )
         )
-        return list(result.scalars().all())
+        allowed = {survey_id: bool(ok) for survey_id, ok in result.all()}
+        await self.unpack_answers([r for r in responses if allowed.get(r.survey_id)])
+        return {r.id: (r, allowed.get(r.survey_id, False)) for r in responses}
+
+    async def list_responses_for_survey(self, survey_id: UUID) -> list[Response]:
+        async with responses_db(self.db, survey_id) as db:
+            result = await db.execute(
+                select(Response)
+                .options(selectinload(Response.answers))
+                .where(Response.survey_id == survey_id)
+                .order_by(Response.submitted_at.desc())
+            )
+            rows = list(result.scalars().all())
+        responses = await self.unpack_answers(rows)
+
+        segments = await self._archive_segments(survey_id)
+        if segments:
+            responses += [
+                _response_from_archive(r) for s in segments for r in s.responses()
+            ]
+            responses.sort(key=lambda r: r.submitted_at, reverse=True)
+        return responses
 
     async def list_user_responses_for_survey(
         self, survey_id: UUID, user_id: UUID
     ) -> list[Response]:
-        result = await self.db.execute(
-            select(Response)
-            .options(selectinload(Response.answers))
-            .where(Response.survey_id == survey_id, Response.answerer_id == user_id)
-            .order_by(Response.submitted_at.desc())
+        async with responses_db(self.db, survey_id) as db:
+            result = await db.execute(
+                select(Response)
+                .options(selectinload(Response.answers))
+                .where(Response.survey_id == survey_id, Response.answerer_id == user_id)
+                .order_by(Response.submitted_at.desc())
+            )
+            rows = list(result.scalars().all())
+        responses = await self.unpack_answers(rows)
+
+        segments = await self._archive_segments(survey_id)
+        if segments:
+            responses += [
+                _response_from_archive(r)
+                for s in segments
+                for r in s.responses(answerer_id=user_id)
+            ]
+            responses.sort(key=lambda r: r.submitted_at, reverse=True)
+        return responses
+
+    async def list_changes(
+        self,
+        since: int,
+        limit: int,
+        survey_id: UUID | None = None,
+        admin_id: UUID | None = None,
+    ) -> tuple[list[dict], int, bool]:
+        """Responses submitted after the ``since`` cursor, oldest first.
+
+        Scoped to one survey and/or to the surveys ``admin_id`` can access.
+        The query walks the seq index from the cursor, so a sync only pays for
+        new responses. Answers are inlined as ``{question_id: value}``.
+        Responses moved to the archive are no longer in the feed. With sharded
+        storage only single-survey feeds are available, since seqs are per shard.
+
+        Returns the entries, the cursor to pass next time and whether more
+        entries are waiting.
+        """
+        if is_sharded() and (survey_id is None or admin_id is not None):
+            raise ValueError(
+                "Responses are sharded; read the change feed of each survey instead"
+            )
+
+        query = (
+            select(
+                Response.id,
+                Response.survey_id,
+                Response.answerer_id,
+                Response.submitted_at,
+                Response.seq,
+                Response.packed_answers,
+            )
+            .where(Response.seq > since)
+            .order_by(Response.seq)
+            .limit(limit + 1)
         )
-        return list(result.scalars().all())
+        if survey_id is not None:
+            query = query.where(Response.survey_id == survey_id)
+        if admin_id is not None:
+            query = query.join(Survey, Survey.id == Response.survey_id).where(
+                admin_can_access(admin_id)
+            )
+        async with responses_db(self.db, survey_id) as db:
+            rows = (await db.execute(query)).all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+            values = {row.id: {} for row in rows}
+            row_ids = [row.id for row in rows if row.packed_answers is None]
+            if row_ids:
+                result = await db.execute(
+                    select(
+                        Answer.response_id,
+                        Answer.question_id,
+                        Answer.text_value,
+                        Answer.bool_value,
+                        Answer.rank_value,
+                    ).where(Answer.response_id.in_(row_ids))
+                )
+                for answer in result.mappings():
+                    values[answer["response_id"]][answer["question_id"]] = answer_value(answer)
+
+        packed = [row for row in rows if row.packed_answers is not None]
+        if packed:
+            layouts = await self._layouts({row.survey_id for row in packed})
+            for row in packed:
+                question_ids = layouts[row.survey_id].question_ids
+                for answer in decode_answers(row.id, row.packed_answers, question_ids):
+                    values[row.id][answer["question_id"]] = answer_value(answer)
+
+        entries = [
+            {
+                "seq": row.seq,
+                "id": row.id,
+                "survey_id": row.survey_id,
+                "answerer_id": row.answerer_id,
+                "submitted_at": row.submitted_at,
+                "answers": values[row.id],
+            }
+            for row in rows
+        ]
+        next_cursor = rows[-1].seq if rows else since
+        return entries, next_cursor, has_more
 
     async def get_aggregates(self, survey_id: UUID) -> AggregateResponse:
+        # Archived surveys keep their aggregates as a rollup row
+        survey = await self.db.get(Survey, survey_id)
+        if survey is not None and survey.archived_at is not None:
+            rollup = await self.db.get(SurveyRollup, survey_id)
+            if rollup is not None:
+                return AggregateResponse.model_validate_json(rollup.payload)
+
         # Get all questions for the survey
         questions_result = await self.db.execute(
             select(Question)
             .where(Question.survey_id == survey_id)
             .order_by(Question.order_index)
         )
-        questions = list(questions_result.scalars().all())
+        questions = [question_to_dict(q) for q in questions_result.scalars()]
 
         # Get all responses
-        responses_result = await self.db.execute(
-            select(Response)
-            .options(selectinload(Response.answers))
-            .where(Response.survey_id == survey_id)
+        async with responses_db(self.db, survey_id) as db:
+            responses_result = await db.execute(
+                select(Response)
+                .options(selectinload(Response.answers))
+                .where(Response.survey_id == survey_id)
+            )
+            rows = list(responses_result.scalars().all())
+        responses = await self.unpack_answers(rows)
+
+        return build_aggregates(
+            survey_id, questions, [response_to_dict(r) for r in responses]
         )
-        responses = list(responses_result.scalars().all())
-        total_responses = len(responses)
-
-        # Build question aggregates
-        question_aggregates = []
-        for question in questions:
-            # Get all answers for this question
-            answers = []
-            for response in responses:
-                for answer in response.answers:
-                    if answer.question_id == question.id:
-                        answers.append(answer)
-
-            aggregate = QuestionAggregate(
-                question_id=question.id,
-                question_text=question.text,
-                question_type=question.type,
-                total_responses=len(answers),
+
+    async def load_survey_data(self, survey_id: UUID) -> tuple[list[dict], list[dict]]:
+        """Questions and all responses (archived included) of a survey as plain data."""
+        questions_result = await self.db.execute(
+            select(Question)
+            .where(Question.survey_id == survey_id)
+            .order_by(Question.order_index)
+        )
+        questions = [question_to_dict(q) for q in questions_result.scalars()]
+        responses = await self.list_responses_for_survey(survey_id)
+        return questions, [response_to_dict(r) for r in responses]
+
+    async def _archive_segments(self, survey_id: UUID) -> list[SegmentReader]:
+        """Open segment readers for an archived survey (none otherwise).
+
+        The survey is normally already in the session's identity map, so
+        surveys that were never archived cost no extra query.
+        """
+        survey = await self.db.get(Survey, survey_id)
+        if survey is None or survey.archived_at is None:
+            return []
+
+        result = await self.db.execute(
+            select(ArchiveSegment.path)
+            .where(ArchiveSegment.survey_id == survey_id)
+            .order_by(ArchiveSegment.created_at)
+        )
+        return [
+            open_segment(os.path.join(settings.archive_dir, path))
+            for path in result.scalars()
+        ]
+
+    async def _layouts(self, survey_ids: set[UUID]) -> dict[UUID, SurveyValidator]:
+        """Question layouts for the given surveys, compiled or from cache."""
+        layouts = {}
+        missing = set()
+        for survey_id in survey_ids:
+            validator = get_cached_validator(survey_id)
+            if validator is None:
+                missing.add(survey_id)
+            else:
+                layouts[survey_id] = validator
+
+        if missing:
+            result = await self.db.execute(
+                select(Survey)
+                .options(joinedload(Survey.questions))
+                .where(Survey.id.in_(missing))
             )
+            for survey in result.unique().scalars():
+                layouts[survey.id] = get_survey_validator(survey)
+        return layouts
 
-            if question.type == QuestionType.TRUE_FALSE:
-                true_count = sum(1 for a in answers if a.bool_value is True)
-                false_count = sum(1 for a in answers if a.bool_value is False)
-                aggregate.true_count = true_count
-                aggregate.false_count = false_count
-                if len(answers) > 0:
-                    aggregate.true_percentage = round(true_count / len(answers) * 100, 2)
-
-            elif question.type == QuestionType.RANK:
-                rank_values = [a.rank_value for a in answers if a.rank_value is not None]
-                if rank_values:
-                    aggregate.average_rank = round(sum(rank_values) / len(rank_values), 2)
-                    # Build distribution
-                    distribution = defaultdict(int)
-                    for v in rank_values:
-                        distribution[v] += 1
-                    aggregate.rank_distribution = dict(distribution)
-
-            elif question.type == QuestionType.TEXT:
-                aggregate.text_responses = [
-                    a.text_value for a in answers if a.text_value is not None
-                ]
-
-            question_aggregates.append(aggregate)
-
-        return AggregateResponse(
-            survey_id=survey_id,
-            total_responses=total_responses,
-            questions=question_aggregates,
+    async def unpack_answers(self, responses: list[Response]) -> list[Response]:
+        """Populate ``answers`` on responses stored in the packed layout."""
+        packed = [r for r in responses if r.packed_answers is not None]
+        if not packed:
+            return responses
+
+        layouts = await self._layouts({r.survey_id for r in packed})
+        for response in packed:
+            rows = decode_answers(
+                response.id,
+                response.packed_answers,
+                layouts[response.survey_id].question_ids,
+            )
+            # Committed value, so the decoded answers are never flushed as rows
+            set_committed_value(response, "answers", [Answer(**row) for row in rows])
+        return responses
+
+    async def convert_storage(
+        self,
+        survey_id: UUID,
+        target: AnswerStorage,
+        chunk_size: int = 500,
+        progress=None,
+    ) -> int:
+        """Convert a survey's existing responses to the ``target`` layout.
+
+        The survey is switched first so new submissions use the target layout,
+        then responses are converted in chunks, each in its own transaction.
+        Readers handle both layouts per response, so the survey stays readable
+        while the conversion runs. Returns the number of converted responses.
+        """
+        result = await self.db.execute(
+            select(Survey)
+            .options(joinedload(Survey.questions))
+            .where(Survey.id == survey_id)
         )
+        survey = result.unique().scalar_one_or_none()
+        if not survey:
+            raise ValueError("Survey not found")
+
+        layout = SurveyValidator(survey.id, survey.questions)
+        survey.answer_storage = target
+        stale = await bump_generation(self.db, survey_id)
+        await invalidations.publish(self.db, SURVEY_CHANNEL, survey_id)
+        await self.db.commit()
+        if stale:
+            await catalog.refresh()
+
+        converted = 0
+        async with responses_db(self.db, survey_id) as db:
+            while True:
+                if target == AnswerStorage.PACKED:
+                    chunk = await db.execute(
+                        select(Response)
+                        .options(selectinload(Response.answers))
+                        .where(
+                            Response.survey_id == survey_id,
+                            Response.packed_answers.is_(None),
+                        )
+                        .limit(chunk_size)
+                    )
+                    responses = list(chunk.scalars().all())
+                    if not responses:
+                        break
+                    await db.execute(
+                        update(Response),
+                        [
+                            {
+                                "id": r.id,
+                                "packed_answers": encode_answers(
+                                    [
+                                        {
+                                            "question_id": a.question_id,
+                                            "text_value": a.text_value,
+                                            "bool_value": a.bool_value,
+                                            "rank_value": a.rank_value,
+                                        }
+                                        for a in r.answers
+                                    ],
+                                    layout.ordinals,
+                                ),
+                            }
+                            for r in responses
+                        ],
+                    )
+                    await db.execute(
+                        delete(Answer).where(
+                            Answer.response_id.in_([r.id for r in responses])
+                        )
+                    )
+                else:
+                    chunk = await db.execute(
+                        select(Response.id, Response.packed_answers)
+                        .where(
+                            Response.survey_id == survey_id,
+                            Response.packed_answers.is_not(None),
+                        )
+                        .limit(chunk_size)
+                    )
+                    responses = chunk.all()
+                    if not responses:
+                        break
+                    answer_rows = [
+                        row
+                        for response_id, data in responses
+                        for row in decode_answers(response_id, data, layout.question_ids)
+                    ]
+                    if answer_rows:
+                        await db.execute(insert(Answer), answer_rows)
+                    await db.execute(
+                        update(Response),
+                        [{"id": r.id, "packed_answers": None} for r in responses],
+                    )
+
+                await db.commit()
+                # Converted responses must not linger in the identity map
+                db.expunge_all()
+                converted += len(responses)
+                if progress:
+                    progress(converted)
+
+        return converted
+
+
+def _response_from_archive(data: dict) -> Response:
+    """Build a detached response from a decoded archive segment entry."""
+    answers = [Answer(**a) for a in data["answers"]]
+    return Response(
+        id=data["id"],
+        survey_id=data["survey_id"],
+        answerer_id=data["answerer_id"],
+        submitted_at=data["submitted_at"],
+        answers=answers,
+    )
+
+
+async def get_aggregates_coalesced(survey: Survey) -> AggregateResponse:
+    """Aggregates for a survey, computed once for concurrent identical requests.
+
+    The key includes the survey's response counter, so without shards a new
+    submission always starts a fresh computation. Sharded submissions reach
+    the counter only when some worker flushes ``ResponseCounts``, so there
+    the key cannot tell a cached result from one missing newer responses:
+    concurrent requests are still coalesced but results are not cached.
+    """
+    async def compute():
+        async with read_session() as db:
+            return await ResponseService(db).get_aggregates(survey.id)
+
+    key = (survey.id, survey.response_count, survey.archived_at)
+    flight = sharded_aggregate_flight if is_sharded() else aggregate_flight
+    return await flight.do(key, compute)
+
+
+def question_to_dict(question: Question) -> dict:
+    return {
+        "id": question.id,
+        "text": question.text,
+        "type": question.type,
+        "rank_max": question.rank_max,
+        "order_index": question.order_index,
+    }
+
+
+def response_to_dict(response: Response) -> dict:
+    return {
+        "id": response.id,
+        "survey_id": response.survey_id,
+        "answerer_id": response.answerer_id,
+        "submitted_at": response.submitted_at,
+        "answers": [
+            {
+                "id": a.id,
+                "question_id": a.question_id,
+                "text_value": a.text_value,
+                "bool_value": a.bool_value,
+                "rank_value": a.rank_value,
+            }
+            for a in response.answers
+        ],
+    }
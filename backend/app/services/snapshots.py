@@ -0,0 +1,122 @@
+"""Immutable, content-addressed snapshots of published survey definitions.
+
+Whenever a change answerers can see is made to a published survey (publish,
+new questions, close, archive, ...), ``bump_generation`` records a snapshot:
+the ``SurveyResponse`` JSON, serialized once, gzip-compressed and, when the
+optional ``brotli`` package is installed, brotli-compressed too. Snapshots
+are keyed by the sha256 of the JSON, so an unchanged definition is never
+stored twice and a hash always names the same bytes.
+
+The catalog loads these bytes as they are, and the survey routes send the
+variant the client accepts, so serving a survey costs no serialization or
+compression.
+"""
+import gzip
+import hashlib
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.snapshot import SurveySnapshot
+from app.models.survey import Survey
+from app.schemas.survey import SurveyResponse
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is always available
+    brotli = None
+
+
+class SurveyPayload(NamedTuple):
+    """A snapshot's JSON and its pre-compressed variants."""
+
+    content_hash: str
+    body: bytes
+    gzip_body: bytes
+    brotli_body: bytes | None
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.body) + len(self.gzip_body) + len(self.brotli_body or b"")
+
+    def encoded(self, accept_encoding: str | None) -> tuple[bytes, str | None]:
+        """The smallest variant allowed by an ``Accept-Encoding`` header, and
+        its content encoding (None for plain JSON)."""
+        accepted = _accepted_encodings(accept_encoding)
+        if self.brotli_body is not None and "br" in accepted:
+            return self.brotli_body, "br"
+        if "gzip" in accepted:
+            return self.gzip_body, "gzip"
+        return self.body, None
+
+
+def _accepted_encodings(header: str | None) -> set[str]:
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if coding and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.lower())
+    if "*" in accepted:
+        accepted |= {"br", "gzip"}
+    return accepted
+
+
+def build_payload(body: bytes) -> SurveyPayload:
+    """Hash and compress serialized survey JSON."""
+    return SurveyPayload(
+        content_hash=hashlib.sha256(body).hexdigest(),
+        body=body,
+        # A fixed mtime keeps the compressed bytes a function of the content
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+        brotli_body=brotli.compress(body) if brotli is not None else None,
+    )
+
+
+def snapshot_payload(snapshot: SurveySnapshot) -> SurveyPayload:
+    return SurveyPayload(
+        content_hash=snapshot.content_hash,
+        body=snapshot.body,
+        gzip_body=snapshot.gzip_body,
+        brotli_body=snapshot.brotli_body,
+    )
+
+
+async def record_snapshot(db: AsyncSession, survey_id: UUID) -> str | None:
+    """Snapshot a published survey's current definition and make it the
+    survey's current one; returns its hash (None for drafts).
+
+    Call inside the transaction making the change, after it is applied.
+    """
+    result = await db.execute(
+        select(Survey)
+        .options(selectinload(Survey.questions))
+        .where(Survey.id == survey_id, Survey.is_published == True)
+        # Questions may have been added with core INSERTs in this transaction
+        .execution_options(populate_existing=True)
+    )
+    survey = result.scalar_one_or_none()
+    if survey is None:
+        return None
+
+    body = SurveyResponse.model_validate(survey).model_dump_json().encode()
+    content_hash = hashlib.sha256(body).hexdigest()
+    stored = await db.execute(
+        select(SurveySnapshot.content_hash).where(SurveySnapshot.content_hash == content_hash)
+    )
+    if stored.first() is None:
+        payload = build_payload(body)
+        db.add(SurveySnapshot(survey_id=survey_id, **payload._asdict()))
+    survey.snapshot_hash = content_hash
+    return content_hash
+
+
+async def get_snapshot(db: AsyncSession, survey_id: UUID, content_hash: str) -> SurveyPayload | None:
+    """A stored snapshot of the survey, by hash."""
+    snapshot = await db.get(SurveySnapshot, content_hash)
+    if snapshot is None or snapshot.survey_id != survey_id:
+        return None
+    return snapshot_payload(snapshot)
@@ -1,52 +1,161 @@
+import uuid
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, exists, or_, func, insert, update, literal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, aliased
 
-from app.models.survey import Survey, SurveyAccess
+from app.models.survey import Survey, SurveyAccess, AnswerStorage
 from app.models.question import Question
+from app.config import settings
+from app.database import async_session, new_uuid
 from app.models.user import User, UserRole
+from app.schemas.survey import SurveyResponse
+from app.services.answer_validator import invalidate_survey_validator
+from app.services.catalog import catalog, bump_generation
+from app.services.coalesce import SingleFlight
+from app.services.invalidation import invalidations, ACCESS_CHANNEL, SURVEY_CHANNEL
+from app.shards import responses_db
+from app.tracing import trace_methods
 
+# Survey definitions by id, shared by concurrent GET /api/surveys/{id} calls
+survey_flight = SingleFlight(ttl_seconds=settings.read_cache_ttl_seconds)
 
+
+def _drop_survey_caches(key: str | None) -> None:
+    survey_id = None if key is None else UUID(key)
+    survey_flight.invalidate(survey_id)
+    invalidate_survey_validator(survey_id)
+
+
+invalidations.subscribe(SURVEY_CHANNEL, _drop_survey_caches)
+
+
+def admin_can_access(admin_id: UUID):
+    """SQL condition: the admin owns the survey or it was shared with them."""
+    return or_(
+        Survey.owner_id == admin_id,
+        exists().where(
+            SurveyAccess.survey_id == Survey.id,
+            SurveyAccess.admin_id == admin_id,
+        ),
+    )
+
+
+@trace_methods
 class SurveyService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_survey(self, owner_id: UUID, title: str, description: str | None) -> Survey:
-        survey = Survey(owner_id=owner_id, title=title, description=description)
+    async def create_survey(
+        self,
+        owner_id: UUID,
+        title: str,
+        description: str | None,
+        answer_storage: AnswerStorage = AnswerStorage.ROWS,
+    ) -> Survey:
+        survey = Survey(
+            owner_id=owner_id,
+            title=title,
+            description=description,
+            answer_storage=answer_storage,
+        )
         self.db.add(survey)
         await self.db.commit()
         # Re-fetch with eagerly loaded questions to avoid lazy loading issues
         return await self.get_survey_by_id(survey.id)
 
     async def get_survey_by_id(self, survey_id: UUID) -> Survey | None:
+        # Joined eager load fetches the survey and its questions in one round-trip
         result = await self.db.execute(
             select(Survey)
-            .options(selectinload(Survey.questions))
+            .options(joinedload(Survey.questions))
             .where(Survey.id == survey_id)
         )
-        return result.scalar_one_or_none()
+        return result.unique().scalar_one_or_none()
+
+    async def admin_has_access(self, survey_id: UUID, admin_id: UUID) -> bool:
+        result = await self.db.execute(
+            select(Survey.id).where(Survey.id == survey_id, admin_can_access(admin_id))
+        )
+        return result.scalar_one_or_none() is not None
+
+    async def get_surveys_for_user(
+        self, survey_ids: list[UUID], user: User
+    ) -> dict[UUID, tuple[Survey, bool]]:
+        """Load surveys with questions and the user's access to each in one query.
+
+        Admins may read surveys they own or that were shared with them;
+        answerers may read published surveys. Missing ids are absent from the
+        result.
+        """
+        if user.role == UserRole.ADMIN:
+            allowed = admin_can_access(user.id)
+        else:
+            allowed = Survey.is_published
+        result = await self.db.execute(
+            select(Survey, allowed.label("allowed"))
+            .options(joinedload(Survey.questions))
+            .where(Survey.id.in_(survey_ids))
+        )
+        return {survey.id: (survey, bool(ok)) for survey, ok in result.unique().all()}
 
     async def list_surveys_for_admin(self, admin_id: UUID) -> list[Survey]:
         """List surveys that an admin owns or has access to."""
-        # Get owned surveys
-        owned_result = await self.db.execute(
-            select(Survey).where(Survey.owner_id == admin_id)
+        result = await self.db.execute(
+            select(Survey).where(admin_can_access(admin_id))
         )
-        owned = list(owned_result.scalars().all())
+        return list(result.scalars().all())
 
-        # Get shared surveys
-        shared_result = await self.db.execute(
-            select(Survey)
-            .join(SurveyAccess, Survey.id == SurveyAccess.survey_id)
-            .where(SurveyAccess.admin_id == admin_id)
+    async def list_surveys_page(
+        self,
+        user: User,
+        limit: int,
+        offset: int,
+        sort: str = "-created_at",
+    ) -> tuple[list[tuple[Survey, int]], int]:
+        """One page of the surveys a user can see, with question counts.
+
+        Returns ``(rows, total)`` where rows are ``(survey, question_count)``.
+        Access filtering, the question count (a correlated aggregate) and the
+        total (a window count) all come from a single query; response counts
+        are the maintained ``Survey.response_count``.
+        """
+        if user.role == UserRole.ADMIN:
+            visible = admin_can_access(user.id)
+        else:
+            visible = Survey.is_published == True
+
+        question_count = (
+            select(func.count(Question.id))
+            .where(Question.survey_id == Survey.id)
+            .correlate(Survey)
+            .scalar_subquery()
         )
-        shared = list(shared_result.scalars().all())
+        column = getattr(Survey, sort.lstrip("-"))
+        order = column.desc() if sort.startswith("-") else column.asc()
 
-        # Combine and deduplicate
-        all_surveys = {s.id: s for s in owned + shared}
-        return list(all_surveys.values())
+        result = await self.db.execute(
+            select(Survey, question_count.label("question_count"), func.count().over())
+            .where(visible)
+            .order_by(order, Survey.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        rows = result.all()
+        if rows:
+            return [(survey, count) for survey, count, _ in rows], rows[0][2]
+
+        total = await self.db.execute(select(func.count(Survey.id)).where(visible))
+        return [], total.scalar_one()
+
+    async def response_counts(self, survey_ids) -> dict[UUID, int]:
+        """Current response counters of the given surveys."""
+        result = await self.db.execute(
+            select(Survey.id, Survey.response_count).where(Survey.id.in_(survey_ids))
+        )
+        return dict(result.all())
 
     async def list_published_surveys(self) -> list[Survey]:
         """List all published surveys (for answerers)."""
@@ -57,10 +166,105 @@ class SurveyService:
 
     async def publish_survey(self, survey: Survey) -> Survey:
         survey.is_published = True
+        await bump_generation(self.db, survey.id)
+        await invalidations.publish(self.db, SURVEY_CHANNEL, survey.id)
         await self.db.commit()
+        await catalog.refresh()
         # Re-fetch with eagerly loaded questions to avoid lazy loading issues
         return await self.get_survey_by_id(survey.id)
 
+    async def close_survey(self, survey: Survey) -> Survey:
+        survey.closed_at = datetime.utcnow()
+        stale = await bump_generation(self.db, survey.id)
+        await invalidations.publish(self.db, SURVEY_CHANNEL, survey.id)
+        await self.db.commit()
+        if stale:
+            await catalog.refresh()
+        return await self.get_survey_by_id(survey.id)
+
+    async def clone_survey(
+        self,
+        source: Survey,
+        owner_ids: list[UUID],
+        title: str | None = None,
+        include_access: bool = False,
+    ) -> list[tuple[Survey, int]]:
+        """Copy a survey and its questions once per owner, in one transaction.
+
+        The survey rows go in with one multi-row INSERT; questions (and access
+        grants with ``include_access``) are copied for all new surveys at once
+        with ``INSERT ... SELECT``, so the cost barely depends on the number of
+        questions. Copies start unpublished and without responses, and record
+        the root template in ``template_id`` / ``template_question_id``.
+
+        Returns ``(survey, question_count)`` per owner.
+        """
+        owner_ids = list(dict.fromkeys(owner_ids))
+        result = await self.db.execute(
+            select(func.count(User.id)).where(
+                User.id.in_(owner_ids), User.role == UserRole.ADMIN
+            )
+        )
+        if result.scalar_one() != len(owner_ids):
+            raise ValueError("Surveys can only be cloned to admin users")
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "owner_id": owner_id,
+                "title": title or source.title,
+                "description": source.description,
+                "is_published": False,
+                "answer_storage": source.answer_storage,
+                "created_at": now,
+                "response_count": 0,
+                "template_id": source.template_id or source.id,
+            }
+            for owner_id in owner_ids
+        ]
+        new_ids = [row["id"] for row in rows]
+        copy = aliased(Survey)
+
+        await self.db.execute(insert(Survey).values(rows))
+        await self.db.execute(
+            insert(Question).from_select(
+                ["id", "survey_id", "text", "type", "rank_max", "order_index", "template_question_id"],
+                select(
+                    new_uuid(),
+                    copy.id,
+                    Question.text,
+                    Question.type,
+                    Question.rank_max,
+                    Question.order_index,
+                    func.coalesce(Question.template_question_id, Question.id),
+                )
+                .join(copy, copy.id.in_(new_ids))
+                .where(Question.survey_id == source.id),
+            )
+        )
+        if include_access:
+            await self.db.execute(
+                insert(SurveyAccess).from_select(
+                    ["id", "survey_id", "admin_id", "granted_at"],
+                    select(new_uuid(), copy.id, SurveyAccess.admin_id, literal(now))
+                    .join(copy, copy.id.in_(new_ids))
+                    .where(
+                        SurveyAccess.survey_id == source.id,
+                        SurveyAccess.admin_id != copy.owner_id,
+                    ),
+                )
+            )
+        await self.db.commit()
+
+        result = await self.db.execute(
+            select(func.count(Question.id)).where(Question.survey_id == source.id)
+        )
+        question_count = result.scalar_one()
+        result = await self.db.execute(select(Survey).where(Survey.id.in_(new_ids)))
+        copies = {survey.id: survey for survey in result.scalars()}
+        return [(copies[survey_id], question_count) for survey_id in new_ids]
+
     async def share_survey(self, survey_id: UUID, admin_id: UUID) -> SurveyAccess:
         # Check if the user is an admin
         result = await self.db.execute(select(User).where(User.id == admin_id))
@@ -81,6 +285,9 @@ class SurveyService:
 
         access = SurveyAccess(survey_id=survey_id, admin_id=admin_id)
         self.db.add(access)
+        # Cached reads of the survey and of the admin's surveys predate the grant
+        await invalidations.publish(self.db, SURVEY_CHANNEL, survey_id)
+        await invalidations.publish(self.db, ACCESS_CHANNEL, admin_id)
         await self.db.commit()
         await self.db.refresh(access)
         return access
@@ -101,10 +308,77 @@ class SurveyService:
             order_index=order_index,
         )
         self.db.add(question)
+        stale = await bump_generation(self.db, survey_id)
+        await invalidations.publish(self.db, SURVEY_CHANNEL, survey_id)
         await self.db.commit()
         await self.db.refresh(question)
+        if stale:
+            await catalog.refresh()
         return question
 
+    async def add_questions(self, survey_id: UUID, questions: list[dict]) -> list[Question]:
+        """Add many questions with one multi-row INSERT in one transaction.
+
+        Questions whose ``order_index`` is None are appended after the
+        existing questions, in list order.
+        """
+        result = await self.db.execute(
+            select(func.max(Question.order_index)).where(Question.survey_id == survey_id)
+        )
+        last = result.scalar_one()
+        next_index = 0 if last is None else last + 1
+
+        rows = []
+        for question in questions:
+            order_index = question["order_index"]
+            if order_index is None:
+                order_index = next_index
+                next_index += 1
+            rows.append({
+                "id": uuid.uuid4(),
+                "survey_id": survey_id,
+                "text": question["text"],
+                "type": question["type"],
+                "rank_max": question["rank_max"],
+                "order_index": order_index,
+            })
+
+        await self.db.execute(insert(Question).values(rows))
+        stale = await bump_generation(self.db, survey_id)
+        await invalidations.publish(self.db, SURVEY_CHANNEL, survey_id)
+        await self.db.commit()
+        if stale:
+            await catalog.refresh()
+        return [Question(**row) for row in rows]
+
+    async def reorder_questions(
+        self, survey_id: UUID, question_ids: list[UUID]
+    ) -> list[Question]:
+        """Set ``order_index`` from the position of each question in one UPDATE batch.
+
+        ``question_ids`` must list every question of the survey exactly once.
+        """
+        result = await self.db.execute(
+            select(Question.id).where(Question.survey_id == survey_id)
+        )
+        existing = set(result.scalars())
+        if len(question_ids) != len(set(question_ids)) or set(question_ids) != existing:
+            raise ValueError("question_ids must list every question of the survey exactly once")
+
+        await self.db.execute(
+            update(Question),
+            [
+                {"id": question_id, "order_index": position}
+                for position, question_id in enumerate(question_ids)
+            ],
+        )
+        stale = await bump_generation(self.db, survey_id)
+        await invalidations.publish(self.db, SURVEY_CHANNEL, survey_id)
+        await self.db.commit()
+        if stale:
+            await catalog.refresh()
+        return await self.get_questions(survey_id)
+
     async def get_questions(self, survey_id: UUID) -> list[Question]:
         result = await self.db.execute(
             select(Question)
@@ -115,7 +389,21 @@ class SurveyService:
 
     async def survey_has_responses(self, survey_id: UUID) -> bool:
         from app.models.response import Response
-        result = await self.db.execute(
-            select(Response).where(Response.survey_id == survey_id).limit(1)
-        )
-        return result.scalar_one_or_none() is not None
+        async with responses_db(self.db, survey_id) as db:
+            result = await db.execute(
+                select(Response).where(Response.survey_id == survey_id).limit(1)
+            )
+            return result.scalar_one_or_none() is not None
+
+
+async def get_survey_coalesced(survey_id: UUID) -> SurveyResponse | None:
+    """Serialized survey with questions, loaded once for concurrent callers.
+
+    Access checks are left to the caller.
+    """
+    async def load():
+        async with async_session() as db:
+            survey = await SurveyService(db).get_survey_by_id(survey_id)
+            return SurveyResponse.model_validate(survey) if survey else None
+
+    return await survey_flight.do(survey_id, load)
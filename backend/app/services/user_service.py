@@ -0,0 +1,93 @@
+from sqlalchemy import select, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User, UserRole
+from app.tracing import trace_methods
+
+
+def _email_prefix_range(prefix: str):
+    """SQL condition matching emails starting with ``prefix``.
+
+    A range rather than LIKE so both email indexes can serve it (SQLite's
+    LIKE is case-insensitive and cannot use them); matching is case-sensitive.
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return (User.email >= prefix) & (User.email < upper)
+
+
+@trace_methods
+class UserService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_users_page(
+        self,
+        limit: int,
+        offset: int,
+        role: UserRole | None = None,
+        email_prefix: str | None = None,
+    ) -> tuple[list[User], int]:
+        """One page of users ordered by email, and the total matching.
+
+        The page walks ``ix_users_role_email`` (by role) or the unique email
+        index (by prefix, or unfiltered) and stops after ``offset + limit``
+        rows; the total is counted from the same index.
+        """
+        conditions = []
+        if role is not None:
+            conditions.append(User.role == role)
+        if email_prefix:
+            conditions.append(_email_prefix_range(email_prefix))
+
+        result = await self.db.execute(
+            select(User)
+            .where(*conditions)
+            .order_by(User.email)
+            .limit(limit)
+            .offset(offset)
+        )
+        users = list(result.scalars().all())
+        total = await self.db.execute(select(func.count()).select_from(User).where(*conditions))
+        return users, total.scalar_one()
+
+    async def create_user(self, email: str, name: str, role: UserRole) -> User:
+        """Insert a user; the unique email index rejects duplicates."""
+        user = User(email=email, name=name, role=role)
+        self.db.add(user)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("Email already registered")
+        return user
+
+    async def import_users(self, users: list[dict]) -> tuple[int, list[str]]:
+        """Create many users in one transaction, skipping registered emails.
+
+        One ``INSERT ... ON CONFLICT (email) DO NOTHING RETURNING email``,
+        sent as multi-row batches, so the uniqueness check runs inside the
+        insert instead of a query per user. Returns the number created and
+        the skipped emails (already registered, or repeated within ``users``).
+        """
+        unique = {}
+        skipped = []
+        for user in users:
+            if user["email"] in unique:
+                skipped.append(user["email"])
+            else:
+                unique[user["email"]] = user
+
+        dialect = self.db.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        result = await self.db.execute(
+            insert(User)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.email),
+            list(unique.values()),
+        )
+        inserted = set(result.scalars().all())
+        await self.db.commit()
+        skipped += [email for email in unique if email not in inserted]
+        return len(inserted), skipped
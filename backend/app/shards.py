@@ -0,0 +1,90 @@
+"""Optional sharding of response storage across several databases.
+
+With ``RESPONSE_SHARD_URLS`` set, the ``responses`` and ``answers`` of each
+survey live in one of those databases (separate SQLite files, or PostgreSQL
+databases/schemas), picked from the survey id. Users, surveys, questions and
+everything else stay in the main database. Submissions to surveys on
+different shards no longer queue behind the same writer, so write throughput
+grows with the number of shards.
+
+Services get the session holding a survey's responses from
+``responses_db``; without shards that is simply the session they were given.
+The shard of a survey is its id modulo the number of shards, so the list
+must not be reordered or resized once responses are stored.
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from uuid import UUID
+
+from sqlalchemy import Column, Index, MetaData, Table
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database import Base, ensure_schema, use_wal
+
+SHARDED_TABLES = ("responses", "answers", "response_seq")
+
+shard_engines = [create_async_engine(url, echo=True) for url in settings.response_shard_urls]
+for shard_engine in shard_engines:
+    use_wal(shard_engine)
+
+shard_sessions = [
+    async_sessionmaker(shard_engine, class_=AsyncSession, expire_on_commit=False)
+    for shard_engine in shard_engines
+]
+
+
+def is_sharded() -> bool:
+    return bool(shard_sessions)
+
+
+def shard_of(survey_id: UUID) -> int:
+    """Index of the shard holding a survey's responses."""
+    return survey_id.int % len(shard_sessions)
+
+
+@asynccontextmanager
+async def responses_db(db: AsyncSession, survey_id: UUID) -> AsyncIterator[AsyncSession]:
+    """Session for a survey's responses and answers.
+
+    ``db`` itself when responses are not sharded; otherwise a session on the
+    survey's shard, closed on exit. Callers commit it themselves.
+    """
+    if not shard_sessions:
+        yield db
+        return
+    async with shard_sessions[shard_of(survey_id)]() as session:
+        yield session
+
+
+def _shard_metadata() -> MetaData:
+    """The sharded tables with their indexes, minus foreign keys.
+
+    Surveys, users and questions are not in the shard to be referenced.
+    """
+    metadata = MetaData()
+    for name in SHARDED_TABLES:
+        source = Base.metadata.tables[name]
+        table = Table(
+            name,
+            metadata,
+            *(
+                Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+                for c in source.columns
+            ),
+        )
+        for index in source.indexes:
+            Index(
+                index.name,
+                *(table.c[c.name] for c in index.columns),
+                unique=index.unique,
+            )
+    return metadata
+
+
+async def create_shard_tables() -> None:
+    if not shard_engines:
+        return
+    metadata = _shard_metadata()
+    for shard_engine in shard_engines:
+        await ensure_schema(shard_engine, metadata)
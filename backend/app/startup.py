@@ -0,0 +1,101 @@
+"""Worker start-up: timings, cache warm-up and readiness.
+
+After start-up the worker warms what its first requests would otherwise pay
+for, taking the most recently answered published surveys as the hot set:
+connections in both pools, the user and access lookups of those surveys'
+admins (compiled statements and their rows in the database cache) and the
+compiled answer validators. ``/ready`` reports ready once that is done, so a
+load balancer only sends traffic to warmed workers; warm-up failures are
+logged and do not keep a worker out of rotation.
+"""
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import selectinload
+
+from app.config import settings
+from app.database import async_session, engine, read_engine
+from app.dependencies import get_current_user, get_survey_with_access
+from app.models.survey import Survey, SurveyAccess
+from app.services.answer_validator import get_survey_validator
+
+logger = logging.getLogger(__name__)
+
+async def _fill_pool(target: AsyncEngine) -> None:
+    """Open the pool's connections now instead of on first requests."""
+    size = target.pool.size() if hasattr(target.pool, "size") else 1
+    connections = await asyncio.gather(*(target.connect() for _ in range(size)))
+    for conn in connections:
+        await conn.close()
+
+
+async def warm_caches(survey_count: int) -> int:
+    """Warm the hot paths for the most recently answered published surveys;
+    returns the number of surveys warmed."""
+    await asyncio.gather(_fill_pool(engine), _fill_pool(read_engine))
+
+    async with async_session() as db:
+        result = await db.execute(
+            select(Survey)
+            .options(selectinload(Survey.questions))
+            .where(Survey.is_published == True, Survey.closed_at.is_(None))
+            .order_by(Survey.last_response_at.desc().nulls_last(), Survey.created_at.desc())
+            .limit(survey_count)
+        )
+        surveys = list(result.scalars().all())
+        for survey in surveys:
+            get_survey_validator(survey)
+
+        # One shared admin per survey, so the access check runs its ACL query too
+        result = await db.execute(
+            select(SurveyAccess.survey_id, SurveyAccess.admin_id).where(
+                SurveyAccess.survey_id.in_([s.id for s in surveys])
+            )
+        )
+        shared = dict(result.all())
+        for survey in surveys:
+            for admin_id in {survey.owner_id, shared.get(survey.id)} - {None}:
+                admin = await get_current_user(str(admin_id), db)
+                await get_survey_with_access(survey.id, admin, db)
+    return len(surveys)
+
+
+class Startup:
+    """Start-up timings and the background warm-up gating readiness."""
+
+    def __init__(self):
+        self.ready = False
+        self.timings_ms: dict[str, float] = {}
+        self.warmed_surveys = 0
+        self._started = time.monotonic()
+        self._warmup: asyncio.Task | None = None
+
+    def record(self, step: str, started: float) -> None:
+        self.timings_ms[step] = round((time.monotonic() - started) * 1000, 1)
+
+    def start_warmup(self) -> None:
+        self._warmup = asyncio.create_task(self._warm(), name="cache-warmup")
+
+    async def stop(self) -> None:
+        if self._warmup is not None:
+            self._warmup.cancel()
+            await asyncio.gather(self._warmup, return_exceptions=True)
+            self._warmup = None
+        self.ready = False
+
+    async def _warm(self) -> None:
+        started = time.monotonic()
+        try:
+            if settings.warmup_enabled:
+                self.warmed_surveys = await warm_caches(settings.warmup_surveys)
+        except Exception:
+            logger.exception("Cache warm-up failed")
+        self.record("warmup", started)
+        self.record("total", self._started)
+        self.ready = True
+
+
+startup = Startup()
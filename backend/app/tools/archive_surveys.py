@@ -0,0 +1,31 @@
+"""Archive responses of surveys closed longer than the configured threshold.
+
+Usage:
+    python -m app.tools.archive_surveys [--older-than-days N]
+"""
+import argparse
+import asyncio
+
+from app.config import settings
+from app.database import async_session
+from app.services.archive_service import ArchiveService
+
+
+async def archive(older_than_days: int) -> dict:
+    async with async_session() as db:
+        return await ArchiveService(db).archive_closed_surveys(older_than_days)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--older-than-days", type=int, default=settings.archive_after_days)
+    args = parser.parse_args()
+
+    archived = asyncio.run(archive(args.older_than_days))
+    for survey_id, count in archived.items():
+        print(f"{survey_id}: archived {count} responses")
+    print(f"done: {len(archived)} surveys archived")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Measure worker cold start: time until a fresh server answers a real request.
+
+Starts ``uvicorn app.main:app`` against the configured database several
+times and, for each run, records from process launch until:
+
+    serving   /health answers
+    ready     /ready answers 200 (start-up and cache warm-up done)
+    first     the first request for the hottest published survey succeeds,
+              sent as an answerer right after ready
+
+Usage:
+    python -m app.tools.bench_cold_start [--runs 5] [--user-id ID] [--survey-id ID]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.database import async_session
+from app.models.survey import Survey
+from app.models.user import User, UserRole
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+POLL_SECONDS = 0.005
+TIMEOUT_SECONDS = 120
+
+
+async def pick_targets() -> tuple[UUID, UUID]:
+    """An answerer and the most recently answered open published survey."""
+    async with async_session() as db:
+        user = await db.execute(select(User.id).where(User.role == UserRole.ANSWERER).limit(1))
+        survey = await db.execute(
+            select(Survey.id)
+            .where(Survey.is_published == True, Survey.closed_at.is_(None))
+            .order_by(Survey.last_response_at.desc().nulls_last(), Survey.created_at.desc())
+            .limit(1)
+        )
+        user_id, survey_id = user.scalar_one_or_none(), survey.scalar_one_or_none()
+    if user_id is None or survey_id is None:
+        raise SystemExit("Needs an answerer and a published survey in the database")
+    return user_id, survey_id
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(url: str, headers: dict | None = None) -> tuple[int, bytes]:
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def wait_for(url: str, deadline: float) -> bytes:
+    while time.monotonic() < deadline:
+        try:
+            status, body = get(url)
+            if status == 200:
+                return body
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(POLL_SECONDS)
+    raise TimeoutError(f"{url} did not answer within {TIMEOUT_SECONDS}s")
+
+
+def run_once(user_id: UUID, survey_id: UUID) -> dict:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + TIMEOUT_SECONDS
+        wait_for(f"{base}/health", deadline)
+        serving = time.monotonic()
+        ready_body = json.loads(wait_for(f"{base}/ready", deadline))
+        ready = time.monotonic()
+        status, _ = get(f"{base}/api/surveys/{survey_id}", {"X-User-ID": str(user_id)})
+        first = time.monotonic()
+        if status != 200:
+            raise RuntimeError(f"First request failed with {status}")
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        "serving_ms": (serving - started) * 1000,
+        "ready_ms": (ready - started) * 1000,
+        "first_ms": (first - started) * 1000,
+        "first_request_ms": (first - ready) * 1000,
+        "server_startup_ms": ready_body["startup_ms"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--user-id", type=UUID)
+    parser.add_argument("--survey-id", type=UUID)
+    args = parser.parse_args()
+
+    user_id, survey_id = args.user_id, args.survey_id
+    if user_id is None or survey_id is None:
+        picked_user, picked_survey = asyncio.run(pick_targets())
+        user_id, survey_id = user_id or picked_user, survey_id or picked_survey
+
+    runs = []
+    for i in range(args.runs):
+        result = run_once(user_id, survey_id)
+        runs.append(result)
+        print(
+            f"run {i + 1}: serving {result['serving_ms']:.0f} ms, ready {result['ready_ms']:.0f} ms, "
+            f"first good request {result['first_ms']:.0f} ms "
+            f"({result['first_request_ms']:.1f} ms itself); server {result['server_startup_ms']}"
+        )
+    for key in ("serving_ms", "ready_ms", "first_ms", "first_request_ms"):
+        print(f"median {key}: {statistics.median(r[key] for r in runs):.1f}")
+
+
+if __name__ == "__main__":
+    main()
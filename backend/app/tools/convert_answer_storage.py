@@ -0,0 +1,38 @@
+"""Convert a survey's answers between row and packed storage.
+
+Usage:
+    python -m app.tools.convert_answer_storage <survey_id> {rows,packed}
+"""
+import argparse
+import asyncio
+from uuid import UUID
+
+from app.database import async_session
+from app.models.survey import AnswerStorage
+from app.services.response_service import ResponseService
+
+
+async def convert(survey_id: UUID, target: AnswerStorage, chunk_size: int) -> int:
+    async with async_session() as db:
+        service = ResponseService(db)
+        return await service.convert_storage(
+            survey_id,
+            target,
+            chunk_size=chunk_size,
+            progress=lambda done: print(f"converted {done} responses"),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("survey_id", type=UUID)
+    parser.add_argument("target", choices=[s.value for s in AnswerStorage])
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    total = asyncio.run(convert(args.survey_id, AnswerStorage(args.target), args.chunk_size))
+    print(f"done: {total} responses now use {args.target} storage")
+
+
+if __name__ == "__main__":
+    main()
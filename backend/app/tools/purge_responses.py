@@ -0,0 +1,45 @@
+"""Purge responses of one answerer, or all responses submitted before a date.
+
+Usage:
+    python -m app.tools.purge_responses --answerer <user_id>
+    python -m app.tools.purge_responses --before YYYY-MM-DD
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from uuid import UUID
+
+from app.database import async_session
+from app.services.purge_service import DEFAULT_CHUNK_SIZE, PurgeService
+
+
+async def report(done: int) -> None:
+    print(f"deleted {done} responses")
+
+
+async def purge(answerer_id: UUID | None, before: datetime | None, chunk_size: int) -> int:
+    async with async_session() as db:
+        service = PurgeService(db)
+        if answerer_id is not None:
+            return await service.purge_user_responses(
+                answerer_id, chunk_size=chunk_size, progress=report
+            )
+        return await service.purge_responses_before(
+            before, chunk_size=chunk_size, progress=report
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--answerer", type=UUID)
+    target.add_argument("--before", type=datetime.fromisoformat)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    total = asyncio.run(purge(args.answerer, args.before, args.chunk_size))
+    print(f"done: {total} responses purged")
+
+
+if __name__ == "__main__":
+    main()
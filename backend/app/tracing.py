@@ -0,0 +1,293 @@
+"""Lightweight request tracing with a local ring-buffer exporter.
+
+Every HTTP request gets a trace. Dependencies and service methods wrapped
+with ``traced`` / ``trace_methods`` become spans, and SQL statements run on an
+instrumented engine become child spans of whatever span is current. Finished
+traces are tail-sampled: slow and failed requests are always kept, the rest
+with probability ``settings.trace_sample_rate``. Kept traces go to an
+in-memory ring buffer (browsable via ``/api/traces``) and optionally to a
+JSON-lines file, written from a background thread so requests never wait on
+the disk.
+"""
+import functools
+import inspect
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app.config import settings
+
+MAX_STATEMENT_LENGTH = 500
+# Kept traces waiting to be written to the trace file; more are dropped
+MAX_PENDING_WRITES = 10000
+
+
+class Span:
+    __slots__ = ("name", "kind", "start", "duration_ms", "attrs", "children")
+
+    def __init__(self, name: str, kind: str, attrs: dict | None = None):
+        self.name = name
+        self.kind = kind
+        self.start = time.perf_counter()
+        self.duration_ms: float | None = None
+        self.attrs = attrs or {}
+        self.children: list["Span"] = []
+
+    def finish(self) -> None:
+        self.duration_ms = (time.perf_counter() - self.start) * 1000
+
+    def to_dict(self, trace_start: float) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "offset_ms": round((self.start - trace_start) * 1000, 3),
+            "duration_ms": round(self.duration_ms or 0.0, 3),
+            "attrs": self.attrs,
+            "children": [c.to_dict(trace_start) for c in self.children],
+        }
+
+
+class Trace:
+    __slots__ = ("id", "method", "path", "route", "status_code", "started_at", "root")
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.route: str | None = None
+        self.status_code: int | None = None
+        self.started_at = datetime.utcnow()
+        self.root = Span(f"{method} {path}", "request")
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ms or 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status_code": self.status_code,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "root": self.root.to_dict(self.root.start),
+        }
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attrs):
+    """Record a child span of the current span; a no-op outside a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    current = Span(name, kind, attrs)
+    parent.children.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        current.finish()
+        _current_span.reset(token)
+
+
+def traced(name: str | None = None, kind: str = "service"):
+    """Decorator recording a span around an async function.
+
+    ``functools.wraps`` keeps the signature visible to FastAPI, so it can be
+    used on dependencies.
+    """
+    def decorate(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def trace_methods(cls):
+    """Class decorator wrapping every public coroutine method in a span."""
+    for attr, value in list(vars(cls).items()):
+        if not attr.startswith("_") and inspect.iscoroutinefunction(value):
+            setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+    return cls
+
+
+class TraceFileWriter:
+    """Appends traces to a JSON-lines file from a background thread.
+
+    ``write`` only queues the trace; serializing and writing happen on the
+    writer thread. When the disk cannot keep up, traces beyond
+    ``MAX_PENDING_WRITES`` are dropped (and counted) rather than queued
+    without bound.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.dropped = 0
+        self._queue: queue.Queue[Trace | None] = queue.Queue(maxsize=MAX_PENDING_WRITES)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def write(self, trace: Trace) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="trace-writer", daemon=True
+                    )
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Write what is queued and stop the thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                batch = [self._queue.get()]
+                while batch[-1] is not None and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                f.writelines(
+                    json.dumps(t.to_dict(), default=str) + "\n" for t in batch if t is not None
+                )
+                f.flush()
+                if batch[-1] is None:
+                    return
+
+
+class TraceBuffer:
+    """Ring buffer of kept traces with tail sampling."""
+
+    def __init__(self, size: int):
+        self._traces: deque[Trace] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._file = TraceFileWriter(settings.trace_file) if settings.trace_file else None
+        self.seen = 0
+        self.kept = 0
+
+    def offer(self, trace: Trace) -> bool:
+        self.seen += 1
+        keep = (
+            trace.duration_ms >= settings.trace_slow_ms
+            or (trace.status_code or 500) >= 500
+            or random.random() < settings.trace_sample_rate
+        )
+        if not keep:
+            return False
+
+        self.kept += 1
+        with self._lock:
+            self._traces.append(trace)
+        if self._file is not None:
+            self._file.write(trace)
+        return True
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+    def slowest(self, limit: int, min_duration_ms: float = 0.0) -> list[Trace]:
+        with self._lock:
+            traces = [t for t in self._traces if t.duration_ms >= min_duration_ms]
+        traces.sort(key=lambda t: t.duration_ms, reverse=True)
+        return traces[:limit]
+
+    def get(self, trace_id: str) -> Trace | None:
+        with self._lock:
+            return next((t for t in self._traces if t.id == trace_id), None)
+
+
+trace_buffer = TraceBuffer(settings.trace_buffer_size)
+
+
+class TracingMiddleware:
+    """ASGI middleware starting a trace per HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.tracing_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(scope["method"], scope["path"])
+        token = _current_span.set(trace.root)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                trace.status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_span.reset(token)
+            trace.root.finish()
+            route = scope.get("route")
+            trace.route = getattr(route, "path", None)
+            trace_buffer.offer(trace)
+
+
+def instrument_engine(engine) -> None:
+    """Record every SQL statement on ``engine`` as a span."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        if parent is None:
+            return
+        current = Span("sql", "sql", {"statement": statement[:MAX_STATEMENT_LENGTH]})
+        if executemany:
+            current.attrs["executemany"] = True
+        parent.children.append(current)
+        conn.info.setdefault("trace_spans", []).append(current)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if not spans:
+            return
+        current = spans.pop()
+        current.finish()
+        # DB-API rowcount is -1 for SELECTs until rows are fetched
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            current.attrs["rows"] = cursor.rowcount
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get("trace_spans") if conn is not None else None
+        if spans:
+            current = spans.pop()
+            current.finish()
+            current.attrs["error"] = str(exception_context.original_exception)[:200]
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+
+# Point the app at a throwaway database before it is imported
+_tmp = tempfile.mkdtemp(prefix="survey-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(_tmp, 'test.db')}")
+os.environ.setdefault("ARCHIVE_DIR", os.path.join(_tmp, "archive"))
+os.environ.setdefault("JOB_RESULTS_DIR", os.path.join(_tmp, "job_results"))
+os.environ.setdefault("TRACING_ENABLED", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def loop():
+    """One loop for the whole session; the engine's pooled connections live on it."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def run(loop):
+    """Run a coroutine to completion on the session loop."""
+    return loop.run_until_complete
+
+
+@pytest.fixture(scope="module")
+def client(run):
+    """An HTTP client for the app, with its start-up and shutdown run around the module."""
+    import httpx
+    from app.main import app
+
+    lifespan = app.router.lifespan_context(app)
+    run(lifespan.__aenter__())
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    yield client
+    run(client.aclose())
+    run(lifespan.__aexit__(None, None, None))
+
+
+@pytest.fixture
+def api(client, run):
+    """Send one request as a user: ``api("POST", url, user_id, json=...)``."""
+
+    def send(method, url, user_id=None, **kwargs):
+        headers = kwargs.pop("headers", {})
+        if user_id is not None:
+            headers["X-User-ID"] = str(user_id)
+        return run(client.request(method, url, headers=headers, **kwargs))
+
+    return send
+
+
+@pytest.fixture
+def new_user(api):
+    """Create a user with a unique email and return its id: ``new_user("admin")``."""
+
+    def create(role):
+        response = api("POST", "/api/users", json={
+            "email": f"{uuid.uuid4().hex}@example.com", "name": role, "role": role,
+        })
+        assert response.status_code == 201, response.text
+        return response.json()["id"]
+
+    return create
@@ -0,0 +1,27 @@
+"""Route classification for admission control."""
+import pytest
+
+from app.admission import ANALYTICS, INTERACTIVE, SUBMIT, AdmissionController
+
+SURVEY = "/api/surveys/5f0c6f4e-8a53-4d0c-9a55-1c0b1f1f2a3b"
+
+
+@pytest.mark.parametrize("method, path, expected", [
+    ("POST", f"{SURVEY}/responses", SUBMIT),
+    ("GET", f"{SURVEY}/responses", ANALYTICS),
+    ("GET", f"{SURVEY}/responses/aggregate", ANALYTICS),
+    ("GET", f"{SURVEY}/changes", ANALYTICS),
+    ("GET", "/api/changes", ANALYTICS),
+    ("POST", f"{SURVEY}/jobs", ANALYTICS),
+    ("GET", "/api/jobs/42/download", ANALYTICS),
+    ("POST", "/api/surveys/compare", ANALYTICS),
+    ("GET", "/api/surveys/portfolio", ANALYTICS),
+    ("POST", "/api/batch/surveys", ANALYTICS),
+    ("POST", "/api/batch/responses", ANALYTICS),
+    ("GET", SURVEY, INTERACTIVE),
+    ("GET", "/api/surveys", INTERACTIVE),
+    ("GET", f"{SURVEY}/responses/me", INTERACTIVE),
+    ("POST", "/api/surveys", INTERACTIVE),
+])
+def test_route_class(method, path, expected):
+    assert AdmissionController().classify(method, path) == expected
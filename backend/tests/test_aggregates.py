@@ -0,0 +1,26 @@
+"""Coalesced aggregates are only cached while the response counter is exact."""
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import response_service
+from app.services.response_service import ResponseService, get_aggregates_coalesced
+
+
+@pytest.mark.parametrize("sharded, computations", [(False, 1), (True, 2)])
+def test_aggregates_cached_only_without_shards(run, monkeypatch, sharded, computations):
+    calls = []
+
+    async def get_aggregates(self, survey_id):
+        calls.append(survey_id)
+        return len(calls)
+
+    monkeypatch.setattr(ResponseService, "get_aggregates", get_aggregates)
+    monkeypatch.setattr(response_service, "is_sharded", lambda: sharded)
+    # A sharded submission not flushed yet leaves the counter unchanged
+    survey = SimpleNamespace(id=uuid.uuid4(), response_count=3, archived_at=None)
+
+    run(get_aggregates_coalesced(survey))
+    run(get_aggregates_coalesced(survey))
+    assert len(calls) == computations
@@ -0,0 +1,144 @@
+"""Archived surveys read back exactly as they were stored, and purging or
+deleting them rewrites or removes their segment files."""
+import asyncio
+import os
+from uuid import UUID
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import async_session
+from app.models.archive import ArchiveSegment
+from app.services.archive_service import ArchiveService
+from app.services.purge_service import PurgeService
+
+QUESTIONS = [
+    {"text": "How likely?", "type": "rank", "rank_max": 5},
+    {"text": "Would you return?", "type": "true_false"},
+    {"text": "Anything else?", "type": "text"},
+]
+
+
+def _answers(questions, i):
+    return [
+        {"question_id": q["id"], "rank_value": 1 + i % 5} if q["type"] == "rank"
+        else {"question_id": q["id"], "bool_value": i % 3 == 0} if q["type"] == "true_false"
+        else {"question_id": q["id"], "text_value": f"note {i}"}
+        for q in questions
+    ]
+
+
+def _published(api, admin, survey_id):
+    api("PATCH", f"/api/surveys/{survey_id}/publish", admin)
+    return api("GET", f"/api/surveys/{survey_id}/questions", admin).json()
+
+
+def _normalized(response):
+    return {**response, "answers": sorted(response["answers"], key=lambda a: a["question_id"])}
+
+
+def _snapshot(api, admin, answerer, survey_id, other_id):
+    """Everything the read endpoints return for the survey."""
+    listing = api("GET", f"/api/surveys/{survey_id}/responses", admin).json()
+    return {
+        "list": sorted(listing, key=lambda r: r["id"]),
+        "one": [
+            _normalized(api("GET", f"/api/surveys/{survey_id}/responses/{r['id']}", admin).json())
+            for r in sorted(listing, key=lambda r: r["id"])
+        ],
+        "me": [_normalized(r) for r in api("GET", f"/api/surveys/{survey_id}/responses/me", answerer).json()],
+        "aggregate": api("GET", f"/api/surveys/{survey_id}/responses/aggregate", admin).json(),
+        "compare": api("POST", "/api/surveys/compare", admin, json={"survey_ids": [survey_id, other_id]}).json(),
+    }
+
+
+def _segment_paths(run, survey_id):
+    async def paths():
+        async with async_session() as db:
+            result = await db.execute(
+                select(ArchiveSegment.path).where(ArchiveSegment.survey_id == UUID(survey_id))
+            )
+            return [os.path.join(settings.archive_dir, p) for p in result.scalars()]
+
+    return run(paths())
+
+
+@pytest.fixture(params=["rows", "packed"])
+def archived(request, api, run, new_user):
+    """A survey and a live copy of it with responses, the survey then archived."""
+    admin = new_user("admin")
+    answerers = [new_user("answerer") for _ in range(6)]
+    survey = api("POST", "/api/surveys", admin, json={"title": "Archived", "answer_storage": request.param}).json()
+    for i, question in enumerate(QUESTIONS):
+        api("POST", f"/api/surveys/{survey['id']}/questions", admin, json={**question, "order_index": i})
+    copy = api("POST", f"/api/surveys/{survey['id']}/clone", admin, json={}).json()[0]
+    questions = _published(api, admin, survey["id"])
+    copy_questions = _published(api, admin, copy["id"])
+    for i, answerer in enumerate(answerers):
+        for survey_id, qs in ((survey["id"], questions), (copy["id"], copy_questions)):
+            response = api("POST", f"/api/surveys/{survey_id}/responses", answerer, json={"answers": _answers(qs, i)})
+            assert response.status_code == 201, response.text
+
+    before = _snapshot(api, admin, answerers[0], survey["id"], copy["id"])
+    api("PATCH", f"/api/surveys/{survey['id']}/close", admin)
+
+    async def archive():
+        async with async_session() as db:
+            return await ArchiveService(db).archive_survey(UUID(survey["id"]))
+
+    assert run(archive()) == len(answerers)
+    return admin, answerers, survey["id"], copy["id"], before
+
+
+def test_archived_reads_match_live_reads(api, run, archived):
+    admin, answerers, survey_id, copy_id, before = archived
+    assert _segment_paths(run, survey_id)
+    assert len(before["list"]) == len(answerers) and len(before["me"]) == 1
+    assert len(before["compare"]["questions"]) == 2
+    assert _snapshot(api, admin, answerers[0], survey_id, copy_id) == before
+
+
+def test_purge_rewrites_segments_and_rollup(api, run, archived):
+    admin, answerers, survey_id, copy_id, before = archived
+    old_paths = _segment_paths(run, survey_id)
+
+    async def purge():
+        async with async_session() as db:
+            return await PurgeService(db).purge_user_responses(UUID(answerers[0]))
+
+    # One response in the archive, one in the live copy
+    assert run(purge()) == 2
+    new_paths = _segment_paths(run, survey_id)
+    assert new_paths and not set(new_paths) & set(old_paths)
+    assert all(os.path.exists(p) for p in new_paths)
+    assert not any(os.path.exists(p) for p in old_paths)
+
+    listing = api("GET", f"/api/surveys/{survey_id}/responses", admin).json()
+    assert sorted(r["id"] for r in listing) == sorted(
+        r["id"] for r in before["list"] if r["answerer_id"] != answerers[0]
+    )
+    assert api("GET", f"/api/surveys/{survey_id}/responses/me", answerers[0]).json() == []
+
+    aggregate = api("GET", f"/api/surveys/{survey_id}/responses/aggregate", admin).json()
+    assert aggregate["total_responses"] == len(answerers) - 1
+    ranks = [1 + i % 5 for i in range(1, len(answerers))]
+    rank = next(q for q in aggregate["questions"] if q["question_type"] == "rank")
+    assert rank["average_rank"] == round(sum(ranks) / len(ranks), 2)
+
+
+def test_delete_removes_segments(api, run, archived):
+    admin, _, survey_id, _, _ = archived
+    paths = _segment_paths(run, survey_id)
+
+    job = api("DELETE", f"/api/surveys/{survey_id}", admin).json()
+    for _ in range(200):
+        job = api("GET", f"/api/jobs/{job['id']}", admin).json()
+        if job["status"] in ("succeeded", "failed"):
+            break
+        run(asyncio.sleep(0.02))
+    assert job["status"] == "succeeded", job
+
+    assert api("GET", f"/api/surveys/{survey_id}", admin).status_code == 404
+    assert _segment_paths(run, survey_id) == []
+    assert not any(os.path.exists(p) for p in paths)
@@ -0,0 +1,27 @@
+"""The answerer listing served from the catalog shows live response counts."""
+
+
+def _listed(api, answerer, survey_id, **params):
+    response = api("GET", "/api/surveys", answerer, params={"limit": 200, **params})
+    assert response.status_code == 200, response.text
+    return next(s for s in response.json() if s["id"] == survey_id)
+
+
+def test_listing_shows_submissions_without_a_rebuild(api, new_user):
+    admin, answerer = new_user("admin"), new_user("answerer")
+    survey = api("POST", "/api/surveys", admin, json={"title": "Counted"}).json()
+    question = api("POST", f"/api/surveys/{survey['id']}/questions", admin, json={
+        "text": "Agree?", "type": "true_false", "order_index": 0,
+    }).json()
+    api("PATCH", f"/api/surveys/{survey['id']}/publish", admin)
+    listed = _listed(api, answerer, survey["id"])
+    assert listed["response_count"] == 0 and listed["question_count"] == 1
+
+    for _ in range(3):
+        response = api("POST", f"/api/surveys/{survey['id']}/responses", new_user("answerer"), json={
+            "answers": [{"question_id": question["id"], "bool_value": True}],
+        })
+        assert response.status_code == 201
+
+    assert _listed(api, answerer, survey["id"])["response_count"] == 3
+    assert _listed(api, answerer, survey["id"], sort="-response_count")["response_count"] == 3
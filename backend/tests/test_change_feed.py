@@ -0,0 +1,45 @@
+"""Change feed seqs stay above every cursor handed out, whatever is deleted."""
+from uuid import UUID
+
+from app.database import async_session
+from app.services.purge_service import PurgeService
+
+
+def _published_survey(api, admin):
+    survey = api("POST", "/api/surveys", admin, json={"title": "Feed"}).json()
+    question = api("POST", f"/api/surveys/{survey['id']}/questions", admin, json={
+        "text": "Rate it", "type": "rank", "rank_max": 5, "order_index": 0,
+    }).json()
+    api("PATCH", f"/api/surveys/{survey['id']}/publish", admin)
+    return survey["id"], question["id"]
+
+
+def _submit(api, survey_id, question_id, answerer):
+    response = api("POST", f"/api/surveys/{survey_id}/responses", answerer, json={
+        "answers": [{"question_id": question_id, "rank_value": 3}],
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_seq_not_reused_after_newest_response_is_purged(api, run, new_user):
+    admin = new_user("admin")
+    answerers = [new_user("answerer") for _ in range(4)]
+    survey_id, question_id = _published_survey(api, admin)
+    for answerer in answerers[:3]:
+        _submit(api, survey_id, question_id, answerer)
+
+    feed = api("GET", f"/api/surveys/{survey_id}/changes", admin).json()
+    assert len(feed["changes"]) == 3
+    cursor = feed["next_cursor"]
+
+    async def purge_newest():
+        async with async_session() as db:
+            return await PurgeService(db).purge_user_responses(UUID(answerers[2]))
+
+    assert run(purge_newest()) == 1
+
+    response_id = _submit(api, survey_id, question_id, answerers[3])
+    feed = api("GET", f"/api/surveys/{survey_id}/changes", admin, params={"since": cursor}).json()
+    assert [c["id"] for c in feed["changes"]] == [response_id]
+    assert feed["changes"][0]["seq"] > cursor
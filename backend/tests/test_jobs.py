@@ -0,0 +1,63 @@
+"""Background jobs run once, and those of deleted surveys fail with a clear error."""
+import asyncio
+import uuid
+from uuid import UUID
+
+import pytest
+
+from app.config import settings
+from app.database import async_session
+from app.models.job import JobKind
+from app.services.job_runner import HANDLERS, job_runner
+from app.services.job_service import JobService
+
+
+def _wait(api, run, admin, job_id):
+    for _ in range(200):
+        job = api("GET", f"/api/jobs/{job_id}", admin).json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        run(asyncio.sleep(0.02))
+    raise AssertionError(job)
+
+
+@pytest.mark.parametrize("kind, params", [
+    (JobKind.EXPORT, {}),
+    (JobKind.AGGREGATE_REBUILD, {}),
+    (JobKind.CROSSTAB, {"question_a": str(uuid.uuid4()), "question_b": str(uuid.uuid4())}),
+    (JobKind.SURVEY_DELETE, {}),
+])
+def test_job_of_deleted_survey_fails(api, run, new_user, kind, params):
+    admin = new_user("admin")
+
+    async def queue():
+        async with async_session() as db:
+            # As deleting a survey leaves its queued jobs
+            job = await JobService(db).create_job(UUID(admin), None, kind, params)
+        job_runner.notify()
+        return job.id
+
+    job = _wait(api, run, admin, run(queue()))
+    assert job["status"] == "failed"
+    assert job["error"] == "Survey was deleted"
+
+
+def test_long_job_is_not_requeued(api, run, new_user, monkeypatch):
+    admin = new_user("admin")
+    survey_id = api("POST", "/api/surveys", admin, json={"title": "Slow"}).json()["id"]
+    monkeypatch.setattr(settings, "job_stale_after_seconds", 0.3)
+    monkeypatch.setattr(settings, "job_poll_interval_seconds", 0.02)
+    runs = []
+
+    async def slow(ctx):
+        runs.append(ctx.job.id)
+        # Several stale periods, while the idle worker keeps requeueing stale jobs
+        await asyncio.sleep(1.0)
+
+    monkeypatch.setitem(HANDLERS, JobKind.EXPORT, slow)
+    job = api("POST", f"/api/surveys/{survey_id}/jobs", admin, json={"kind": "export"})
+    assert job.status_code == 202, job.text
+
+    job = _wait(api, run, admin, job.json()["id"])
+    assert job["status"] == "succeeded", job
+    assert len(runs) == 1
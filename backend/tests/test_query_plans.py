@@ -0,0 +1,400 @@
+"""Query-plan regression suite.
+
+Every query issued by the dependencies, ``SurveyService``,
+``ResponseService``, ``UserService``, ``PortfolioService``, ``PurgeService``,
+the survey snapshots and the start-up warm-up is captured from the engine and explained against a
+seeded database: ``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN`` with
+sequential scans disabled on PostgreSQL. A test fails when a plan scans one
+of ``LARGE_TABLES`` instead of searching an index, or when an index a case
+depends on is no longer used.
+
+Run from ``backend/`` with ``python -m pytest tests``; set ``DATABASE_URL``
+to check against PostgreSQL.
+"""
+import re
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, NamedTuple
+
+import pytest
+from sqlalchemy import event, insert
+
+from app.database import Base, async_session, engine
+from app.dependencies import get_current_user, get_owned_survey, get_survey_with_access
+from app.models.question import Question, QuestionType
+from app.models.response import Answer, Response
+from app.models.survey import AnswerStorage, Survey, SurveyAccess
+from app.models.user import User, UserRole
+from app.schemas.response import ComparisonMatch
+from app.services.comparative import ComparisonService
+from app.services.portfolio import PortfolioService
+from app.services.purge_service import PurgeService
+from app.services.response_service import ResponseService
+from app.services.snapshots import get_snapshot, record_snapshot
+from app.services.survey_service import SurveyService
+from app.services.user_service import UserService
+from app.startup import warm_caches
+
+# Tables that grow with usage; scanning any of them is a regression
+LARGE_TABLES = {"users", "responses", "answers", "questions", "survey_access"}
+
+N_ADMINS = 5
+N_ANSWERERS = 60
+N_SURVEYS = 40
+N_QUESTIONS = 8
+
+_captured: list[tuple[str, object]] | None = None
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _capture(conn, cursor, statement, parameters, context, executemany):
+    if _captured is not None:
+        params = parameters
+        # Batched multi-row INSERTs come through as executemany with flat parameters
+        if executemany and parameters and isinstance(parameters[0], (tuple, list, dict)):
+            params = parameters[0]
+        _captured.append((statement, params))
+
+
+class Seed(NamedTuple):
+    owner: uuid.UUID
+    shared_admin: uuid.UUID
+    answerer: uuid.UUID
+    new_answerer: uuid.UUID
+    survey: uuid.UUID
+    packed_survey: uuid.UUID
+    draft: uuid.UUID
+    response: uuid.UUID
+
+
+@pytest.fixture(scope="session")
+def seed(run) -> Seed:
+    return run(_seed())
+
+
+async def _seed() -> Seed:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    admins = [uuid.uuid4() for _ in range(N_ADMINS)]
+    answerers = [uuid.uuid4() for _ in range(N_ANSWERERS + 1)]
+    surveys = [uuid.uuid4() for _ in range(N_SURVEYS)]
+    draft = uuid.uuid4()
+    now = datetime.utcnow()
+
+    users = [
+        {"id": a, "email": f"admin{i}@example.com", "name": f"Admin {i}", "role": UserRole.ADMIN}
+        for i, a in enumerate(admins)
+    ] + [
+        {"id": a, "email": f"user{i}@example.com", "name": f"User {i}", "role": UserRole.ANSWERER}
+        for i, a in enumerate(answerers)
+    ]
+    survey_rows = [
+        {
+            "id": s,
+            "owner_id": admins[i % N_ADMINS],
+            "title": f"Survey {i}",
+            "is_published": True,
+            "answer_storage": AnswerStorage.PACKED if i % 4 == 0 else AnswerStorage.ROWS,
+            "created_at": now - timedelta(minutes=i),
+            "response_count": N_ANSWERERS,
+            "last_response_at": now,
+        }
+        for i, s in enumerate(surveys)
+    ] + [{
+        "id": draft,
+        "owner_id": admins[0],
+        "title": "Draft",
+        "is_published": False,
+        "answer_storage": AnswerStorage.ROWS,
+        "created_at": now,
+        "response_count": 0,
+        "last_response_at": None,
+    }]
+    access = [
+        {"id": uuid.uuid4(), "survey_id": s, "admin_id": admins[(i + 1) % N_ADMINS]}
+        for i, s in enumerate(surveys)
+    ]
+    types = [QuestionType.RANK, QuestionType.TRUE_FALSE, QuestionType.TEXT]
+    questions = {
+        s: [
+            {
+                "id": uuid.uuid4(),
+                "survey_id": s,
+                "text": f"Question {j}",
+                "type": types[j % 3],
+                "rank_max": 5 if types[j % 3] == QuestionType.RANK else None,
+                "order_index": j,
+            }
+            for j in range(N_QUESTIONS)
+        ]
+        for s in surveys + [draft]
+    }
+
+    responses, answers = [], []
+    seq = 0
+    for s in surveys:
+        for answerer in answerers[:N_ANSWERERS]:
+            seq += 1
+            response_id = uuid.uuid4()
+            responses.append({
+                "id": response_id,
+                "survey_id": s,
+                "answerer_id": answerer,
+                "submitted_at": now,
+                "seq": seq,
+            })
+            for q in questions[s]:
+                answers.append({
+                    "id": uuid.uuid4(),
+                    "response_id": response_id,
+                    "question_id": q["id"],
+                    "rank_value": 3 if q["type"] == QuestionType.RANK else None,
+                    "bool_value": True if q["type"] == QuestionType.TRUE_FALSE else None,
+                    "text_value": "ok" if q["type"] == QuestionType.TEXT else None,
+                })
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), users)
+        await conn.execute(insert(Survey), survey_rows)
+        await conn.execute(insert(SurveyAccess), access)
+        await conn.execute(insert(Question), [q for qs in questions.values() for q in qs])
+        await conn.execute(insert(Response), responses)
+        await conn.execute(insert(Answer), answers)
+        # Plan with statistics for realistic table sizes
+        await conn.exec_driver_sql("ANALYZE")
+
+    return Seed(
+        owner=admins[1],
+        shared_admin=admins[2],
+        answerer=answerers[0],
+        new_answerer=answerers[N_ANSWERERS],
+        survey=surveys[1],
+        packed_survey=surveys[0],
+        draft=draft,
+        response=responses[N_ANSWERERS + 1]["id"],
+    )
+
+
+class Case(NamedTuple):
+    name: str
+    call: Callable[[object, Seed], Awaitable]
+    # Large tables this query legitimately reads in full
+    allowed_scans: frozenset = frozenset()
+    # Indexes that must show up in the plans
+    expected_indexes: tuple = ()
+
+
+async def _user(db, user_id):
+    return await db.get(User, user_id)
+
+
+async def _survey(db, survey_id):
+    return await db.get(Survey, survey_id)
+
+
+def _answers(seed_questions):
+    return [{"question_id": q.id, "rank_value": 2} if q.type == QuestionType.RANK
+            else {"question_id": q.id, "bool_value": False} if q.type == QuestionType.TRUE_FALSE
+            else {"question_id": q.id, "text_value": "new"} for q in seed_questions]
+
+
+async def _create_response(db, s):
+    questions = await SurveyService(db).get_questions(s.survey)
+    return await ResponseService(db).create_response(s.survey, s.new_answerer, _answers(questions))
+
+
+CASES = [
+    # Dependencies
+    Case("get_current_user", lambda db, s: get_current_user(str(s.owner), db)),
+    Case(
+        "get_survey_with_access",
+        lambda db, s: _call_with_user(db, s.shared_admin, lambda u: get_survey_with_access(s.survey, u, db)),
+        expected_indexes=("ix_survey_access_survey_admin",),
+    ),
+    Case(
+        "get_owned_survey",
+        lambda db, s: _call_with_user(db, s.owner, lambda u: get_owned_survey(s.survey, u, db)),
+    ),
+    # SurveyService
+    Case("get_survey_by_id", lambda db, s: SurveyService(db).get_survey_by_id(s.survey),
+         expected_indexes=("ix_questions_survey_id",)),
+    Case("admin_has_access", lambda db, s: SurveyService(db).admin_has_access(s.survey, s.shared_admin),
+         expected_indexes=("ix_survey_access_survey_admin",)),
+    Case(
+        "get_surveys_for_user_admin",
+        lambda db, s: _call_with_user(
+            db, s.shared_admin, lambda u: SurveyService(db).get_surveys_for_user([s.survey, s.packed_survey], u)
+        ),
+    ),
+    Case(
+        "get_surveys_for_user_answerer",
+        lambda db, s: _call_with_user(
+            db, s.answerer, lambda u: SurveyService(db).get_surveys_for_user([s.survey], u)
+        ),
+    ),
+    Case("response_counts", lambda db, s: SurveyService(db).response_counts([s.survey, s.packed_survey])),
+    Case("list_surveys_for_admin", lambda db, s: SurveyService(db).list_surveys_for_admin(s.owner)),
+    Case(
+        "list_surveys_page_admin",
+        lambda db, s: _call_with_user(db, s.owner, lambda u: SurveyService(db).list_surveys_page(u, 20, 0)),
+        expected_indexes=("ix_questions_survey_id",),
+    ),
+    Case(
+        "list_surveys_page_answerer",
+        lambda db, s: _call_with_user(
+            db, s.answerer, lambda u: SurveyService(db).list_surveys_page(u, 20, 20, "-response_count")
+        ),
+    ),
+    Case("list_published_surveys", lambda db, s: SurveyService(db).list_published_surveys()),
+    Case("get_questions", lambda db, s: SurveyService(db).get_questions(s.survey),
+         expected_indexes=("ix_questions_survey_id",)),
+    Case("survey_has_responses", lambda db, s: SurveyService(db).survey_has_responses(s.survey)),
+    Case(
+        "add_questions",
+        lambda db, s: SurveyService(db).add_questions(
+            s.draft, [{"text": "Extra", "type": QuestionType.TEXT, "rank_max": None, "order_index": None}]
+        ),
+    ),
+    Case("reorder_questions", lambda db, s: _reorder(db, s)),
+    Case(
+        "clone_survey",
+        lambda db, s: _call_with_survey(
+            db, s.survey, lambda survey: SurveyService(db).clone_survey(survey, [s.owner], include_access=True)
+        ),
+    ),
+    # ResponseService
+    Case("create_response", _create_response, expected_indexes=("ix_responses_seq",)),
+    Case("get_response_by_id", lambda db, s: ResponseService(db).get_response_by_id(s.response, s.survey),
+         expected_indexes=("ix_answers_response_id",)),
+    Case("get_responses_for_admin",
+         lambda db, s: ResponseService(db).get_responses_for_admin([s.response], s.shared_admin)),
+    # Either survey_id-prefixed index serves this one; the planner picks by statistics
+    Case("list_responses_for_survey", lambda db, s: ResponseService(db).list_responses_for_survey(s.survey),
+         expected_indexes=("ix_answers_response_id",)),
+    Case("list_responses_for_survey_packed",
+         lambda db, s: ResponseService(db).list_responses_for_survey(s.packed_survey)),
+    Case(
+        "list_user_responses_for_survey",
+        lambda db, s: ResponseService(db).list_user_responses_for_survey(s.survey, s.answerer),
+        expected_indexes=("ix_responses_survey_answerer",),
+    ),
+    Case("get_aggregates", lambda db, s: ResponseService(db).get_aggregates(s.survey)),
+    Case("load_survey_data", lambda db, s: ResponseService(db).load_survey_data(s.survey)),
+    Case("list_changes_survey", lambda db, s: ResponseService(db).list_changes(100, 50, survey_id=s.survey),
+         expected_indexes=("ix_responses_survey_seq",)),
+    Case("list_changes_admin", lambda db, s: ResponseService(db).list_changes(100, 50, admin_id=s.shared_admin),
+         expected_indexes=("ix_responses_seq",)),
+    # UserService (an unfiltered listing counts every user, so only filtered ones are checked)
+    Case("list_users_page_role", lambda db, s: UserService(db).list_users_page(20, 20, role=UserRole.ANSWERER),
+         expected_indexes=("ix_users_role_email",)),
+    Case("list_users_page_email_prefix", lambda db, s: UserService(db).list_users_page(20, 0, email_prefix="user1")),
+    Case(
+        "import_users",
+        lambda db, s: UserService(db).import_users(
+            [{"email": "user1@example.com", "name": "Again", "role": UserRole.ANSWERER},
+             {"email": "imported@example.com", "name": "New", "role": UserRole.ANSWERER}]
+        ),
+    ),
+    # PortfolioService
+    Case("portfolio_version", lambda db, s: PortfolioService(db).version(s.owner)),
+    Case("portfolio_build", lambda db, s: PortfolioService(db).build(s.owner, datetime.utcnow().date()),
+         expected_indexes=("ix_responses_survey_submitted",)),
+    # ComparisonService (the owner has the packed survey shared, so both layouts are read)
+    Case(
+        "compare_load_columns",
+        lambda db, s: ComparisonService(db).load_columns(
+            s.owner, [s.survey, s.packed_survey], ComparisonMatch.TEXT
+        ),
+        expected_indexes=("ix_questions_survey_id", "ix_answers_response_id"),
+    ),
+    # Survey snapshots
+    Case("record_snapshot", lambda db, s: record_snapshot(db, s.survey),
+         expected_indexes=("ix_questions_survey_id",)),
+    Case("get_snapshot", lambda db, s: get_snapshot(db, s.survey, "0" * 64)),
+    # Start-up warm-up
+    Case("warm_caches", lambda db, s: warm_caches(20),
+         expected_indexes=("ix_survey_access_survey_admin",)),
+    # PurgeService (last: these delete seeded rows)
+    Case("purge_responses_before",
+         lambda db, s: PurgeService(db).purge_responses_before(datetime.utcnow() - timedelta(minutes=1)),
+         expected_indexes=("ix_responses_survey_submitted",)),
+    Case("purge_user_responses", lambda db, s: PurgeService(db).purge_user_responses(s.answerer),
+         expected_indexes=("ix_responses_answerer", "ix_answers_response_id")),
+    # The survey has a copy from clone_survey, so this covers re-rooting too
+    Case("delete_survey", lambda db, s: PurgeService(db).delete_survey(s.survey, chunk_size=25),
+         expected_indexes=("ix_questions_template_question_id",)),
+]
+
+
+async def _call_with_user(db, user_id, fn):
+    return await fn(await _user(db, user_id))
+
+
+async def _call_with_survey(db, survey_id, fn):
+    return await fn(await _survey(db, survey_id))
+
+
+async def _reorder(db, s):
+    questions = await SurveyService(db).get_questions(s.draft)
+    return await SurveyService(db).reorder_questions(s.draft, [q.id for q in reversed(questions)])
+
+
+async def _capture_queries(case: Case, seed: Seed) -> list[tuple[str, object]]:
+    global _captured
+    async with async_session() as db:
+        _captured = []
+        try:
+            await case.call(db, seed)
+            return _captured
+        finally:
+            _captured = None
+
+
+async def _explain(statement: str, params) -> list[str]:
+    async with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            result = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params)
+            return [row[-1] for row in result]
+        # Without sequential scans, PostgreSQL shows whether an index is usable at all
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        result = await conn.exec_driver_sql("EXPLAIN " + statement, params)
+        return [row[0] for row in result]
+
+
+def _scanned_tables(plan: list[str]) -> set[str]:
+    if engine.dialect.name == "sqlite":
+        # An automatic index is built by scanning the table on every execution
+        pattern = re.compile(r"^(?:SCAN (\w+)|SEARCH (\w+) USING AUTOMATIC)")
+    else:
+        pattern = re.compile(r"Seq Scan on (\w+)")
+    tables = set()
+    for line in plan:
+        match = pattern.search(line.strip())
+        if match:
+            # Anonymous aliases (surveys_1) count as the table itself
+            table = match.group(1) or match.group(2)
+            tables.add(re.sub(r"_\d+$", "", table))
+    return tables
+
+
+@pytest.mark.parametrize("case", CASES, ids=[c.name for c in CASES])
+def test_query_plan(case: Case, seed: Seed, run):
+    queries = run(_capture_queries(case, seed))
+    assert queries, f"{case.name} issued no queries"
+
+    plans = []
+    for statement, params in queries:
+        if not statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")):
+            continue
+        plan = run(_explain(statement, params))
+        plans.append(plan)
+        scans = (_scanned_tables(plan) & LARGE_TABLES) - case.allowed_scans
+        assert not scans, (
+            f"{case.name} scans {sorted(scans)}:\n{statement}\n" + "\n".join(plan)
+        )
+
+    used = "\n".join(line for plan in plans for line in plan)
+    for index in case.expected_indexes:
+        assert index in used, f"{case.name} no longer uses {index}:\n{used}"
@@ -0,0 +1,16 @@
+"""Question listing access rules."""
+
+
+def test_admins_need_access_to_list_questions(api, new_user):
+    owner, shared, stranger = new_user("admin"), new_user("admin"), new_user("admin")
+    survey = api("POST", "/api/surveys", owner, json={"title": "Access"}).json()
+    api("POST", f"/api/surveys/{survey['id']}/questions", owner, json={
+        "text": "Agree?", "type": "true_false", "order_index": 0,
+    })
+    api("POST", f"/api/surveys/{survey['id']}/share", owner, json={"admin_id": shared})
+    url = f"/api/surveys/{survey['id']}/questions"
+
+    assert [q["text"] for q in api("GET", url, owner).json()] == ["Agree?"]
+    assert [q["text"] for q in api("GET", url, shared).json()] == ["Agree?"]
+    assert api("GET", url, stranger).status_code == 403
+    assert api("GET", url, new_user("answerer")).status_code == 403
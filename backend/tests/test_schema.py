@@ -0,0 +1,149 @@
+"""Databases created by an older schema are upgraded in place on start-up."""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401  (registers the tables)
+from app import database
+from app.database import Base, ensure_schema, schema_fingerprint, schema_version
+from app.models.response import Response
+from app.models.survey import AnswerStorage, Survey
+from app.shards import _shard_metadata
+
+# The tables as the first release created them
+BASELINE_DDL = [
+    """CREATE TABLE users (
+        id CHAR(32) NOT NULL, email VARCHAR(255) NOT NULL, name VARCHAR(255) NOT NULL,
+        role VARCHAR(8) NOT NULL, created_at DATETIME NOT NULL,
+        PRIMARY KEY (id), UNIQUE (email))""",
+    """CREATE TABLE surveys (
+        id CHAR(32) NOT NULL, owner_id CHAR(32) NOT NULL, title VARCHAR(255) NOT NULL,
+        description TEXT, is_published BOOLEAN NOT NULL, created_at DATETIME NOT NULL,
+        PRIMARY KEY (id), FOREIGN KEY(owner_id) REFERENCES users (id))""",
+    """CREATE TABLE survey_access (
+        id CHAR(32) NOT NULL, survey_id CHAR(32) NOT NULL, admin_id CHAR(32) NOT NULL,
+        granted_at DATETIME NOT NULL, PRIMARY KEY (id),
+        FOREIGN KEY(survey_id) REFERENCES surveys (id), FOREIGN KEY(admin_id) REFERENCES users (id))""",
+    """CREATE TABLE questions (
+        id CHAR(32) NOT NULL, survey_id CHAR(32) NOT NULL, text TEXT NOT NULL,
+        type VARCHAR(10) NOT NULL, rank_max INTEGER, order_index INTEGER NOT NULL,
+        PRIMARY KEY (id), FOREIGN KEY(survey_id) REFERENCES surveys (id))""",
+    """CREATE TABLE responses (
+        id CHAR(32) NOT NULL, survey_id CHAR(32) NOT NULL, answerer_id CHAR(32) NOT NULL,
+        submitted_at DATETIME NOT NULL, PRIMARY KEY (id),
+        FOREIGN KEY(survey_id) REFERENCES surveys (id), FOREIGN KEY(answerer_id) REFERENCES users (id))""",
+    """CREATE TABLE answers (
+        id CHAR(32) NOT NULL, response_id CHAR(32) NOT NULL, question_id CHAR(32) NOT NULL,
+        text_value TEXT, bool_value BOOLEAN, rank_value INTEGER, PRIMARY KEY (id),
+        FOREIGN KEY(response_id) REFERENCES responses (id), FOREIGN KEY(question_id) REFERENCES questions (id))""",
+]
+
+START = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def baseline(tmp_path, run):
+    """An engine on a baseline database with one survey and three responses,
+    and the ids of the survey and of the responses in submission order."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+    admin, survey = uuid.uuid4(), uuid.uuid4()
+    # Inserted out of submission order
+    responses = [uuid.uuid4() for _ in range(3)]
+    submitted = {responses[0]: START + timedelta(minutes=2), responses[1]: START, responses[2]: START + timedelta(minutes=1)}
+
+    async def create():
+        async with engine.begin() as conn:
+            for ddl in BASELINE_DDL:
+                await conn.exec_driver_sql(ddl)
+            await conn.execute(text(
+                "INSERT INTO users VALUES (:id, 'a@example.com', 'Admin', 'ADMIN', :at)"
+            ), {"id": admin.hex, "at": START})
+            await conn.execute(text(
+                "INSERT INTO surveys VALUES (:id, :owner, 'Old', NULL, 1, :at)"
+            ), {"id": survey.hex, "owner": admin.hex, "at": START})
+            for response_id, at in submitted.items():
+                answerer = uuid.uuid4()
+                await conn.execute(text(
+                    "INSERT INTO users VALUES (:id, :email, 'Answerer', 'ANSWERER', :at)"
+                ), {"id": answerer.hex, "email": f"{answerer.hex}@example.com", "at": START})
+                await conn.execute(text(
+                    "INSERT INTO responses VALUES (:id, :survey, :answerer, :at)"
+                ), {"id": response_id.hex, "survey": survey.hex, "answerer": answerer.hex, "at": at})
+
+    run(create())
+    yield engine, survey, sorted(responses, key=submitted.get)
+    run(engine.dispose())
+
+
+def test_old_database_is_upgraded(run, baseline):
+    engine, survey_id, in_order = baseline
+    assert run(ensure_schema(engine, Base.metadata)) is True
+
+    async def check():
+        async with engine.connect() as conn:
+            columns = await conn.run_sync(
+                lambda c: {t: {col["name"] for col in inspect(c).get_columns(t)} for t in ("surveys", "responses")}
+            )
+            indexes = await conn.run_sync(lambda c: {i["name"] for i in inspect(c).get_indexes("responses")})
+            fingerprint = (await conn.execute(select(schema_version.c.fingerprint))).scalar_one()
+        async with async_sessionmaker(engine, class_=AsyncSession)() as db:
+            survey = await db.get(Survey, survey_id)
+            seqs = (await db.execute(
+                select(Response.id, Response.seq).order_by(Response.seq)
+            )).all()
+            return columns, indexes, fingerprint, survey, seqs
+
+    columns, indexes, fingerprint, survey, seqs = run(check())
+    assert {c.name for c in Base.metadata.tables["surveys"].columns} <= columns["surveys"]
+    assert {c.name for c in Base.metadata.tables["responses"].columns} <= columns["responses"]
+    assert {i.name for i in Base.metadata.tables["responses"].indexes} <= indexes
+    assert fingerprint == schema_fingerprint(Base.metadata, engine.dialect)
+
+    assert survey.response_count == 3
+    assert survey.last_response_at == START + timedelta(minutes=2)
+    assert survey.answer_storage == AnswerStorage.ROWS
+    assert survey.archived_at is None
+    assert seqs == [(response_id, seq) for seq, response_id in enumerate(in_order, 1)]
+
+    # Up to date now
+    assert run(ensure_schema(engine, Base.metadata)) is False
+
+
+def test_failed_upgrade_changes_nothing(run, baseline, monkeypatch):
+    engine, _, _ = baseline
+
+    def fail(conn, tables):
+        raise RuntimeError("backfill failed")
+
+    monkeypatch.setitem(database._BACKFILLS, ("responses", "seq"), (("responses",), fail))
+    with pytest.raises(RuntimeError):
+        run(ensure_schema(engine, Base.metadata))
+
+    async def state():
+        async with engine.connect() as conn:
+            return await conn.run_sync(lambda c: (
+                set(inspect(c).get_table_names()),
+                {col["name"] for col in inspect(c).get_columns("surveys")},
+            ))
+
+    tables, columns = run(state())
+    assert "schema_version" not in tables
+    assert "response_count" not in columns
+
+    monkeypatch.undo()
+    assert run(ensure_schema(engine, Base.metadata)) is True
+
+
+def test_old_shard_is_upgraded(run, baseline):
+    engine, _, in_order = baseline
+    assert run(ensure_schema(engine, _shard_metadata())) is True
+
+    async def seqs():
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT id, seq FROM responses ORDER BY seq"))
+            return [(uuid.UUID(row.id), row.seq) for row in result]
+
+    assert run(seqs()) == [(response_id, seq) for seq, response_id in enumerate(in_order, 1)]
@@ -0,0 +1,28 @@
+"""Sharing a survey invalidates cached reads in every worker."""
+from sqlalchemy import select
+
+from app.database import async_session
+from app.models.invalidation import CacheInvalidation
+from app.services.invalidation import ACCESS_CHANNEL, SURVEY_CHANNEL
+
+
+def test_share_publishes_invalidations(api, run, new_user):
+    owner, grantee = new_user("admin"), new_user("admin")
+    survey = api("POST", "/api/surveys", owner, json={"title": "Shared"}).json()
+    assert api("GET", "/api/surveys/portfolio", grantee).json()["surveys"] == []
+
+    response = api("POST", f"/api/surveys/{survey['id']}/share", owner, json={"admin_id": grantee})
+    assert response.status_code in (200, 201), response.text
+
+    async def published():
+        async with async_session() as db:
+            result = await db.execute(
+                select(CacheInvalidation.channel, CacheInvalidation.key).where(
+                    CacheInvalidation.key.in_([survey["id"], grantee])
+                )
+            )
+            return set(result.all())
+
+    assert {(SURVEY_CHANNEL, survey["id"]), (ACCESS_CHANNEL, grantee)} <= run(published())
+    portfolio = api("GET", "/api/surveys/portfolio", grantee).json()
+    assert [s["id"] for s in portfolio["surveys"]] == [survey["id"]]
@@ -0,0 +1,87 @@
+"""Published surveys are sent from their pre-compressed snapshots with cache headers."""
+import asyncio
+from types import SimpleNamespace
+from uuid import UUID
+
+import pytest
+
+from app.routers import surveys as surveys_router
+from app.services.catalog import catalog
+
+
+@pytest.fixture
+def survey(api, new_user):
+    """A published survey: (owner, survey id)."""
+    admin = new_user("admin")
+    survey = api("POST", "/api/surveys", admin, json={"title": "Snapshot"}).json()
+    api("POST", f"/api/surveys/{survey['id']}/questions", admin, json={
+        "text": "Agree?", "type": "true_false", "order_index": 0,
+    })
+    assert api("PATCH", f"/api/surveys/{survey['id']}/publish", admin).status_code == 200
+    return admin, survey["id"]
+
+
+def _get(api, url, user, **headers):
+    return api("GET", url, user, headers=headers)
+
+
+@pytest.mark.parametrize("accept, encoding", [
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+])
+def test_encoding_follows_accept_encoding(api, new_user, survey, accept, encoding):
+    _, survey_id = survey
+    response = _get(api, f"/api/surveys/{survey_id}", new_user("answerer"), **{"Accept-Encoding": accept})
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") == encoding
+    assert response.json()["id"] == survey_id
+
+
+def test_survey_is_revalidated_and_snapshot_is_immutable(api, new_user, survey):
+    _, survey_id = survey
+    answerer = new_user("answerer")
+
+    response = _get(api, f"/api/surveys/{survey_id}", answerer)
+    assert response.headers["cache-control"] == "private, no-cache"
+    etag, location = response.headers["etag"], response.headers["content-location"]
+    assert location == f"/api/surveys/{survey_id}/snapshots/{etag.strip(chr(34))}"
+    assert _get(api, f"/api/surveys/{survey_id}", answerer, **{"If-None-Match": etag}).status_code == 304
+
+    snapshot = _get(api, location, answerer)
+    assert snapshot.status_code == 200
+    assert snapshot.headers["cache-control"].startswith("private, max-age=")
+    assert snapshot.headers["cache-control"].endswith(", immutable")
+    assert snapshot.headers["etag"] == etag
+    assert snapshot.json() == response.json()
+    not_modified = _get(api, location, answerer, **{"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+
+    assert _get(api, f"/api/surveys/{survey_id}/snapshots/{'0' * 64}", answerer).status_code == 404
+
+
+def test_snapshot_access_for_admins(api, new_user, survey):
+    owner, survey_id = survey
+    content_hash = catalog.get().survey_payload(UUID(survey_id)).content_hash
+    location = f"/api/surveys/{survey_id}/snapshots/{content_hash}"
+    assert _get(api, location, owner).status_code == 200
+    assert _get(api, location, new_user("admin")).status_code == 403
+
+
+def test_snapshot_of_deleted_survey_in_stale_catalog(api, run, monkeypatch, survey):
+    owner, survey_id = survey
+    payload = catalog.get().survey_payload(UUID(survey_id))
+    job = api("DELETE", f"/api/surveys/{survey_id}", owner).json()
+    for _ in range(200):
+        job = api("GET", f"/api/jobs/{job['id']}", owner).json()
+        if job["status"] in ("succeeded", "failed"):
+            break
+        run(asyncio.sleep(0.02))
+    assert job["status"] == "succeeded", job
+
+    # As in a worker that has not polled the deletion yet
+    stale = SimpleNamespace(survey_payload=lambda i: payload if i == UUID(survey_id) else None)
+    monkeypatch.setattr(surveys_router.catalog, "get", lambda: stale)
+    response = _get(api, f"/api/surveys/{survey_id}/snapshots/{payload.content_hash}", owner)
+    assert response.status_code == 404
@@ -0,0 +1,73 @@
+"""Response submission conflicts and seq allocation."""
+from datetime import datetime
+from uuid import UUID
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from app.database import async_session
+from app.models.response import Response, ResponseSeq
+from app.services.response_service import ResponseService
+
+
+@pytest.fixture
+def survey(api, new_user):
+    admin = new_user("admin")
+    survey = api("POST", "/api/surveys", admin, json={"title": "Submissions"}).json()
+    question = api("POST", f"/api/surveys/{survey['id']}/questions", admin, json={
+        "text": "Agree?", "type": "true_false", "order_index": 0,
+    }).json()
+    api("PATCH", f"/api/surveys/{survey['id']}/publish", admin)
+    return survey["id"], question["id"]
+
+
+def _submit(api, survey, answerer):
+    survey_id, question_id = survey
+    return api("POST", f"/api/surveys/{survey_id}/responses", answerer, json={
+        "answers": [{"question_id": question_id, "bool_value": True}],
+    })
+
+
+def test_second_submission_conflicts(api, new_user, survey):
+    answerer = new_user("answerer")
+    assert _submit(api, survey, answerer).status_code == 201
+    response = _submit(api, survey, answerer)
+    assert response.status_code == 409
+    assert "already submitted" in response.json()["detail"]
+
+
+def test_other_integrity_errors_are_not_reported_as_duplicates(api, run, new_user, survey):
+    answerer = new_user("answerer")
+    existing = UUID(_submit(api, survey, answerer).json()["id"])
+    other = UUID(new_user("answerer"))
+
+    async def insert_with_taken_id():
+        async with async_session() as db:
+            # Same response id, different answerer: not a duplicate submission
+            await ResponseService(db)._insert_response(
+                db, UUID(survey[0]), other, existing,
+                datetime.utcnow(), [], None,
+            )
+
+    with pytest.raises(IntegrityError):
+        run(insert_with_taken_id())
+
+
+def test_missing_seq_counter_continues_after_stored_seqs(api, run, new_user, survey):
+    _submit(api, survey, new_user("answerer"))
+
+    async def drop_counter():
+        async with async_session() as db:
+            await db.execute(delete(ResponseSeq))
+            await db.commit()
+            return (await db.execute(select(Response.seq).order_by(Response.seq.desc()))).scalars().first()
+
+    highest = run(drop_counter())
+    response_id = UUID(_submit(api, survey, new_user("answerer")).json()["id"])
+
+    async def seq_of(response_id):
+        async with async_session() as db:
+            return (await db.get(Response, response_id)).seq
+
+    assert run(seq_of(response_id)) == highest + 1
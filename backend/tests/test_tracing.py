@@ -0,0 +1,32 @@
+"""Kept traces reach the trace file without the caller writing it."""
+import json
+import threading
+
+from app import tracing
+from app.tracing import Trace, TraceBuffer
+
+
+def test_trace_file_is_written_by_the_writer_thread(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracing.settings, "trace_file", str(path))
+    monkeypatch.setattr(tracing.settings, "trace_sample_rate", 1.0)
+    buffer = TraceBuffer(10)
+
+    writers = []
+    real_open = open
+
+    def recording_open(file, *args, **kwargs):
+        if str(file) == str(path):
+            writers.append(threading.current_thread().name)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", recording_open)
+    traces = [Trace("GET", f"/api/surveys/{i}") for i in range(3)]
+    for trace in traces:
+        trace.root.finish()
+        assert buffer.offer(trace)
+    buffer.close()
+
+    assert writers == ["trace-writer"]
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["id"] for line in lines] == [t.id for t in traces]
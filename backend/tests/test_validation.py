@@ -0,0 +1,97 @@
+"""Submissions are checked against the survey's current questions."""
+import uuid
+from uuid import UUID
+
+import pytest
+
+from app.services import answer_validator
+
+
+@pytest.fixture
+def survey(api, new_user):
+    """A published survey with a rank and a true/false question: (admin, survey id, questions by type)."""
+    admin = new_user("admin")
+    survey = api("POST", "/api/surveys", admin, json={"title": "Validation"}).json()
+    rank = api("POST", f"/api/surveys/{survey['id']}/questions", admin, json={
+        "text": "How likely?", "type": "rank", "rank_max": 5, "order_index": 0,
+    }).json()
+    flag = api("POST", f"/api/surveys/{survey['id']}/questions", admin, json={
+        "text": "Would you return?", "type": "true_false", "order_index": 1,
+    }).json()
+    api("PATCH", f"/api/surveys/{survey['id']}/publish", admin)
+    return admin, survey["id"], {"rank": rank["id"], "true_false": flag["id"]}
+
+
+def _submit(api, survey_id, answerer, answers):
+    return api("POST", f"/api/surveys/{survey_id}/responses", answerer, json={"answers": answers})
+
+
+def _codes(response):
+    assert response.status_code == 400, response.text
+    return sorted(e["code"] for e in response.json()["detail"])
+
+
+@pytest.mark.parametrize("answers, codes", [
+    (lambda q: [{"question_id": q["rank"], "bool_value": True},
+                {"question_id": q["true_false"], "bool_value": True}], ["wrong_type"]),
+    (lambda q: [{"question_id": q["rank"], "rank_value": 6},
+                {"question_id": q["true_false"], "bool_value": True}], ["out_of_range"]),
+    (lambda q: [{"question_id": q["rank"], "rank_value": 2},
+                {"question_id": q["rank"], "rank_value": 3},
+                {"question_id": q["true_false"], "bool_value": True}], ["duplicate_answer"]),
+    (lambda q: [{"question_id": q["rank"], "rank_value": 2}], ["missing_answer"]),
+    (lambda q: [{"question_id": q["rank"], "rank_value": 2},
+                {"question_id": q["true_false"], "bool_value": True},
+                {"question_id": str(uuid.uuid4()), "bool_value": True}], ["unknown_question"]),
+])
+def test_invalid_answers_are_rejected(api, new_user, survey, answers, codes):
+    _, survey_id, questions = survey
+    assert _codes(_submit(api, survey_id, new_user("answerer"), answers(questions))) == codes
+
+
+def test_error_points_at_the_answer(api, new_user, survey):
+    _, survey_id, questions = survey
+    response = _submit(api, survey_id, new_user("answerer"), [
+        {"question_id": questions["true_false"], "bool_value": False},
+        {"question_id": questions["rank"], "rank_value": 0},
+    ])
+    assert _codes(response) == ["out_of_range"]
+    error = response.json()["detail"][0]
+    assert error["index"] == 1 and error["question_id"] == questions["rank"]
+
+
+@pytest.mark.parametrize("storage", ["rows", "packed"])
+def test_stale_cached_validator_is_recompiled(api, new_user, storage):
+    admin = new_user("admin")
+    survey_id = api("POST", "/api/surveys", admin, json={"title": "Stale", "answer_storage": storage}).json()["id"]
+    rank = api("POST", f"/api/surveys/{survey_id}/questions", admin, json={
+        "text": "How likely?", "type": "rank", "rank_max": 5, "order_index": 1,
+    }).json()["id"]
+    api("PATCH", f"/api/surveys/{survey_id}/publish", admin)
+    # A rejected submission compiles and caches the validator
+    assert _codes(_submit(api, survey_id, new_user("answerer"), [])) == ["missing_answer"]
+    stale = answer_validator.get_cached_validator(UUID(survey_id))
+    assert stale is not None
+
+    # Sorts before the first question, shifting its packed ordinal
+    added = api("POST", f"/api/surveys/{survey_id}/questions", admin, json={
+        "text": "Would you return?", "type": "true_false", "order_index": 0,
+    })
+    assert added.status_code == 201, added.text
+    added = added.json()["id"]
+    # As in a worker that has not polled the invalidation yet
+    answer_validator._validators[UUID(survey_id)] = stale
+
+    answerer = new_user("answerer")
+    assert _codes(_submit(api, survey_id, answerer, [{"question_id": rank, "rank_value": 4}])) == ["missing_answer"]
+    response = _submit(api, survey_id, answerer, [
+        {"question_id": rank, "rank_value": 4},
+        {"question_id": added, "bool_value": True},
+    ])
+    assert response.status_code == 201, response.text
+    assert answer_validator.get_cached_validator(UUID(survey_id)) is not stale
+
+    mine = api("GET", f"/api/surveys/{survey_id}/responses/me", answerer).json()
+    answers = {a["question_id"]: a for a in mine[0]["answers"]}
+    assert answers[rank]["rank_value"] == 4
+    assert answers[added]["bool_value"] is True
@@ -26,6 +26,8 @@ export interface Survey {
   description: string | null;
   is_published: boolean;
   created_at: string;
+  question_count?: number;
+  response_count?: number;
   questions?: Question[];
 }
 